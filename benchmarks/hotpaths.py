@@ -0,0 +1,269 @@
+"""
+Hot-path benchmark suite.
+
+Measures, offline and with seeded synthetic data:
+  - FuzzyValidator.validate / classify / classify_batch throughput across history_size and update_every
+  - ExecutionLogger.log records/s per log format
+  - per-call latency of every SystemMetrics method
+  - custom_shell sampling cost (spawn vs coprocess)
+  - export_log_to_excel / export_log_to_html time and peak traced memory on synthetic logs
+
+    python benchmarks/hotpaths.py --output hotpaths.json
+    python benchmarks/hotpaths.py --baseline hotpaths.json --tolerance 0.25
+    python benchmarks/hotpaths.py --only reporting --sizes 10000 100000 1000000
+
+Result keys ending in "_per_s" are throughputs (higher is better); all other
+numeric keys are times or memory (lower is better).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+SEED = 1234
+LABELS = ["LOW", "MED", "HIGH"]
+
+
+def _values(n, seed=SEED):
+    rng = np.random.default_rng(seed)
+    return np.round(rng.uniform(0, 100, n), 1).tolist()
+
+
+def _best_rate(func, n, repeat):
+    """
+    Run func() `repeat` times; return the best rate (n / elapsed) in operations per second.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = max(best, n / elapsed if elapsed > 0 else float("inf"))
+    return best
+
+
+def _latency(func, calls):
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "median_us": statistics.median(times) * 1e6,
+        "p95_us": times[int(len(times) * 0.95) - 1] * 1e6 if len(times) >= 20 else max(times) * 1e6
+    }
+
+
+def bench_validator(args):
+    from modules.fuzzy_validator import FuzzyValidator
+
+    n = 2000 if args.quick else 20000
+    values = _values(n)
+    results = {}
+    for history_size in (10, 100, 1000):
+        for update_every in (1, 2, 10):
+            step = {"history_size": history_size, "update_every": update_every}
+
+            def run():
+                it = iter(values)
+                validator = FuzzyValidator.from_step(step, lambda: next(it))
+                for _ in range(n):
+                    validator.validate()
+
+            def replay():
+                FuzzyValidator.from_step(step, None).replay(values)
+
+            key = f"h{history_size}_u{update_every}"
+            results[f"validate/{key}"] = {"samples_per_s": _best_rate(run, n, args.repeat)}
+            results[f"replay/{key}"] = {"samples_per_s": _best_rate(replay, n, args.repeat)}
+
+    validator = FuzzyValidator.from_step({}, None)
+    results["classify"] = {"samples_per_s": _best_rate(lambda: [validator.classify(v) for v in values], n, args.repeat)}
+    arr = np.array(values)
+    results["classify_batch"] = {"samples_per_s": _best_rate(lambda: validator.classify_batch(arr), n, args.repeat)}
+    return results
+
+
+def bench_logger(args):
+    from modules.logger import ExecutionLogger, LOG_FORMATS
+
+    n = 5000 if args.quick else 50000
+    record = {"step": "CPU load", "metric": "cpu_percent", "value": 12.5, "label": "LOW",
+              "fuzzy": [0.75, 0.25, 0.0]}
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in LOG_FORMATS:
+            for background in (True, False):
+                counter = iter(range(1 << 30))
+
+                def run():
+                    logger = ExecutionLogger(log_dir=tmp, run_id=f"{fmt}_{background}_{next(counter)}",
+                                             fmt=fmt, background=background)
+                    for _ in range(n):
+                        logger.log(record)
+                    logger.close()
+
+                mode = "background" if background else "inline"
+                results[f"{fmt}/{mode}"] = {"records_per_s": _best_rate(run, n, args.repeat)}
+    return results
+
+
+# Built-in psutil metrics only: plugins and saved --add-metric commands are user code,
+# so they would make the numbers machine-specific (and run arbitrary commands).
+BUILTIN_METRICS = ("cpu_percent", "ram_percent", "disk_percent", "swap_percent", "uptime",
+                   "network_stats", "disk_io", "load_avg", "processes")
+
+
+def bench_metrics(args):
+    from modules.system_metrics import SystemMetrics, RATE_METRICS
+
+    calls = 50 if args.quick else 500
+    results = {}
+    for name in BUILTIN_METRICS + tuple(RATE_METRICS):
+        func = SystemMetrics.get_metric_func(name)
+        results[name] = _latency(func, calls)
+    return results
+
+
+def bench_custom_shell(args):
+    from modules.utils import build_metric_func
+
+    calls = 20 if args.quick else 200
+    results = {}
+    for mode in ("spawn", "coprocess"):
+        func = build_metric_func({"metric_func": "custom_shell", "custom_command": "echo 42", "shell_mode": mode})
+        func()
+        results[mode] = _latency(func, calls)
+        if hasattr(func, "close"):
+            func.close()
+    return results
+
+
+def write_synthetic_log(path, records, steps=4):
+    """
+    Write a text-format run log with `records` records, shaped like a real fuzzy pipeline run.
+    """
+    rng = np.random.default_rng(SEED)
+    values = np.round(rng.uniform(0, 100, records), 1)
+    t0 = datetime(2025, 1, 1)
+    with open(path, "w") as f:
+        def write(i, rec):
+            f.write(f"{(t0 + timedelta(milliseconds=i)).isoformat()} | {json.dumps(rec)}\n")
+        write(0, {"event": "start_pipeline", "test_case": "synthetic", "metadata": {}})
+        per_step = max(1, (records - 2) // steps)
+        i = 1
+        for s in range(steps):
+            desc = f"Fuzzy step {s + 1}"
+            write(i, {"step": desc, "type": "fuzzy", "timestamp": t0.isoformat(), "required": True})
+            for _ in range(per_step):
+                if i >= records - 1:
+                    break
+                v = float(values[i])
+                label = LABELS[min(2, int(v // 34))]
+                write(i, {"step": desc, "metric": "cpu_percent", "value": v, "label": label,
+                          "fuzzy": [round(1 - v / 100, 3), 0.5, round(v / 100, 3)]})
+                i += 1
+            write(i, {"step": desc, "eval": "[EVAL][PASSED]"})
+        write(i, {"event": "end_pipeline", "global_pass": True})
+
+
+def bench_reporting(args):
+    from modules.reporting import export_log_to_excel, export_log_to_html
+
+    sizes = args.sizes or ([10000] if args.quick else [10000, 100000])
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            log_path = os.path.join(tmp, f"synthetic_{size}.log")
+            write_synthetic_log(log_path, size)
+            for name, func, out in (
+                ("excel", export_log_to_excel, os.path.join(tmp, "report.xlsx")),
+                ("html", export_log_to_html, os.path.join(tmp, "report.html")),
+            ):
+                start = time.perf_counter()
+                func(log_path, out)
+                elapsed = time.perf_counter() - start
+                # Separate pass: tracing slows the export down several times
+                tracemalloc.start()
+                func(log_path, out)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results[f"{name}/{size}"] = {"time_s": elapsed, "peak_mb": peak / 2 ** 20}
+    return results
+
+
+BENCHMARKS = {
+    "validator": bench_validator,
+    "logger": bench_logger,
+    "metrics": bench_metrics,
+    "custom_shell": bench_custom_shell,
+    "reporting": bench_reporting,
+}
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for group, entries in results.items():
+        for name, res in entries.items():
+            base = baseline.get(group, {}).get(name)
+            if not base:
+                continue
+            for key, value in res.items():
+                old = base.get(key)
+                if not old:
+                    continue
+                if key.endswith("_per_s"):
+                    if value < old / (1 + tolerance):
+                        regressions.append(f"{group}/{name}: {key} {old:.4g} -> {value:.4g} ({(value / old - 1) * 100:.0f}%)")
+                elif value > old * (1 + tolerance):
+                    regressions.append(f"{group}/{name}: {key} {old:.4g} -> {value:.4g} (+{(value / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyFuzzyFlow hot-path benchmarks")
+    parser.add_argument("--only", nargs="*", default=list(BENCHMARKS), choices=list(BENCHMARKS), help="Benchmark groups to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per throughput benchmark (best is reported)")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads, for smoke runs")
+    parser.add_argument("--sizes", nargs="*", type=int, help="Synthetic log sizes (records) for the reporting benchmark")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for group in args.only:
+        print(f"[{group}]")
+        results[group] = BENCHMARKS[group](args)
+        for name, res in results[group].items():
+            print(f"  {name:28s} " + " | ".join(f"{k} {v:,.1f}" for k, v in res.items()))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "seed": SEED, **results}, f, indent=2)
+        print(f"[INFO] Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"[REGRESSION] {r}")
+        if regressions:
+            sys.exit(1)
+        print("[INFO] No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+CLI startup benchmark.
+
+Runs main.py in each CLI mode under `python -X importtime`, records wall time and
+total import time, and optionally compares against a stored baseline.
+
+    python benchmarks/startup.py --output startup.json
+    python benchmarks/startup.py --baseline startup.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+MODES = {
+    "help": ["--help"],
+    "list-metrics": ["--list-metrics"],
+    "dry-run": ["--testcase", os.path.join(ROOT, "test_case_examples", "test_case_cwd.json"), "--dry-run"],
+    "generate-example": ["--generate-example"],
+    "shell-pipeline": ["--testcase", os.path.join(ROOT, "test_case_examples", "test_case_cwd.json"), "--logdir", "{tmp}"],
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output. Returns (total self time in us, {top-level module: cumulative us}).
+    """
+    total = 0
+    top = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|", 2)
+        total += int(self_us)
+        # Top-level imports are indented by one level (" " + 2 spaces)
+        if len(name) - len(name.lstrip()) == 3:
+            top[name.strip()] = int(cumulative)
+    return total, top
+
+
+def run_mode(mode, argv, repeat):
+    walls, imports = [], []
+    top = {}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "testcases"))
+            args = [a.replace("{tmp}", tmp) for a in argv]
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", MAIN] + args,
+                cwd=tmp, capture_output=True, text=True
+            )
+            walls.append(time.perf_counter() - start)
+        total, top = parse_importtime(proc.stderr)
+        imports.append(total)
+    heaviest = dict(sorted(top.items(), key=lambda kv: kv[1], reverse=True)[:10])
+    return {
+        "wall_s": statistics.median(walls),
+        "import_us": statistics.median(imports),
+        "returncode": proc.returncode,
+        "heaviest_imports_us": heaviest
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for mode, res in results.items():
+        base = baseline.get(mode)
+        if not base:
+            continue
+        for key in ("wall_s", "import_us"):
+            if base[key] and res[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{mode}: {key} {base[key]:.4g} -> {res[key]:.4g} (+{(res[key] / base[key] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyFuzzyFlow CLI startup benchmark")
+    parser.add_argument("--modes", nargs="*", default=list(MODES), help="CLI modes to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per mode (median is reported)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging a regression")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes:
+        results[mode] = run_mode(mode, MODES[mode], args.repeat)
+        r = results[mode]
+        print(f"{mode:18s} wall {r['wall_s'] * 1000:8.1f} ms | imports {r['import_us'] / 1000:8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"[REGRESSION] {r}")
+        if regressions:
+            sys.exit(1)
+        print("[INFO] No startup regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,158 +5,146 @@ from datetime import datetime
 import os
 import hashlib
 
-from modules.fuzzy_validator import FuzzyValidator
+from modules.scheduler import resolve_dependencies, run_dag, FixedRateTicker
 from modules.logger import ExecutionLogger
-from modules.system_metrics import get_extended_system_info
+from modules.system_metrics import SystemMetrics, SystemInfoCollector, SnapshotSampler
+from modules.timing import PhaseTimer, StepProfiler, PROFILE_MODES, format_timing_table
 from modules.utils import (
     command_exists,
     build_metric_func,
     list_available_metrics,
     generate_example_testcase,
     check_command_safety,
-    register_cli_metric
+    register_cli_metric,
+    unregister_cli_metric
 )
-from modules.reporting import export_log_to_excel, export_log_to_html
 
-def evaluate_shell(output, eval_contains):
-    if eval_contains and eval_contains in output:
-        return True
-    elif eval_contains:
-        return False
+# Heavy dependencies (numpy, skfuzzy, pandas, pyarrow) are imported lazily on the
+# code paths that need them, so --list-metrics, --dry-run and shell-only pipelines start fast.
+
+def make_aggregator(step, duration, interval):
+    from modules.evaluation import LabelAggregator, expected_samples
+    return LabelAggregator(
+        step.get("eval_label"),
+        policy=step.get("eval_policy", "any"),
+        expected_samples=expected_samples(duration, interval),
+        dwell_samples=step.get("dwell_samples"),
+        dwell_fraction=step.get("dwell_fraction")
+    )
+
+def report_fuzzy_eval(desc, eval_label, aggregator, logger):
+    passed = aggregator.result()
+    tag = "[EVAL][PASSED]" if passed else "[EVAL][FAILED]"
+    if aggregator.policy in ("any", "first_match"):
+        msg = f"Label '{eval_label}' {'was' if passed else 'was NOT'} found during validation"
     else:
+        msg = f"Label '{eval_label}' {aggregator.policy} policy {'met' if passed else 'NOT met'} ({aggregator.matches}/{aggregator.n} samples)"
+    print(f"{tag} {msg}")
+    logger.log({"step": desc, "eval": tag, **aggregator.summary()})
+    return passed
+
+def report_sampling(desc, ticker, logger, timer=None):
+    stats = ticker.stats()
+    logger.log({"step": desc, "event": "sampling", **stats})
+    if timer is not None and stats["samples"] > 1:
+        timer.add("sleep", stats["sleep_s"], count=stats["samples"] - 1)
+    if stats["skipped_ticks"]:
+        print(f"[WARNING] {desc}: {stats['overruns']} sampling overruns, {stats['skipped_ticks']} ticks skipped (interval {stats['interval']}s).")
+    return stats
+
+def open_sample_store(args, logger, idx, desc, label_names, metric):
+    if not args.sample_store:
+        return None
+    from modules.sample_store import SampleStore, arrow_available, sample_file_name
+    if not arrow_available():
+        print("[WARNING] --sample-store requires pyarrow (pip install pyarrow). Samples are only logged.")
+        return None
+    path = os.path.join(logger.base_dir, "samples", sample_file_name(idx, desc))
+    return SampleStore(path, label_names, step=desc, metric=metric)
+
+def run_step(idx, step, args, logger, snapshot=None, validators=None, registry=None):
+    """
+    Execute a single pipeline step (with retries and on_fail hook).
+    Returns the step summary dict, or None if the step was skipped.
+
+    If a `validators` dict is given (watch mode), fuzzy validators are kept in it
+    by step index and reused, so their adaptive state carries over between runs.
+    If a MetricsRegistry is given, live values and the step state are published to it.
+    """
+    if step.get("skip"):
+        print(f"[SKIPPED] Step '{step.get('description')}' skipped due to missing command.")
+        logger.log({"step": step.get('description'), "eval": "[SKIPPED]", "reason": "missing command"})
+        if registry is not None:
+            registry.step_state(step.get("description", f"Step {idx+1}"), "skipped", index=idx+1)
         return None
 
-def evaluate_fuzzy(all_labels, eval_label):
-    return eval_label in all_labels if eval_label else None
-
-def main():
-    parser = argparse.ArgumentParser(description="Industrial Fuzzy Test Pipeline Runner")
-    parser.add_argument("--testcase", type=str, required=False, help="Path to test_case.json")
-    parser.add_argument("--logdir", type=str, default="logs", help="Log directory")
-    parser.add_argument("--interval", type=float, default=1.0, help="Interval between fuzzy samples (seconds)")
-    parser.add_argument("--list-metrics", action="store_true", help="List all available metrics and exit")
-    parser.add_argument("--dry-run", action="store_true", help="Show pipeline steps without executing")
-    parser.add_argument("--step", type=int, help="Run only step N (1-based)")
-    parser.add_argument("--generate-example", action="store_true", help="Generate an example testcase and exit")
-    parser.add_argument("--add-metric", nargs=2, metavar=('NAME', 'COMMAND'), help="Register a new shell-based metric: NAME COMMAND")
-    args = parser.parse_args()
-
-    if args.add_metric:
-        name, command = args.add_metric
-        register_cli_metric(name, command)
-
-    if args.generate_example:
-        generate_example_testcase()
-        return
-
-    if args.list_metrics:
-        list_available_metrics()
-        return
-
-    if not args.testcase:
-        print("ERROR: --testcase argument is required unless --list-metrics or --generate-example is used.")
-        return
-
-    with open(args.testcase) as f:
-        test_case = json.load(f)
-
-    if args.dry_run:
-        print("\n[DRY-RUN] Steps to execute:")
-        for idx, step in enumerate(test_case.get("steps", [])):
-            print(f"[{idx+1}] {step.get('description')} (type: {step.get('type')})")
-        return
-
-    steps = test_case.get("steps", [])
-    if args.step:
-        idx = args.step - 1
-        if idx < 0 or idx >= len(steps):
-            print(f"Invalid --step {args.step}, there are only {len(steps)} steps.")
-            return
-        steps = [steps[idx]]
-
-    # --- Pre-Validation: check for missing commands and whitelist ---
-    for step in steps:
-        typ = step.get("type")
-        if typ in ["boolean", "shell"]:
-            cmd = step.get("command")
-            if not cmd or not command_exists(cmd):
-                print(f"[WARNING] Command '{cmd}' not found for step '{step.get('description')}'. Step will be skipped.")
-                step['skip'] = True
-            else:
-                check_command_safety(cmd)
-        elif typ == "fuzzy" and step.get("metric_func") == "custom_shell":
-            cmd = step.get("custom_command")
-            if not cmd or not command_exists(cmd):
-                print(f"[WARNING] Custom shell command '{cmd}' not found for step '{step.get('description')}'. Step will be skipped.")
-                step['skip'] = True
-            else:
-                check_command_safety(cmd)
-
-    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-    run_dir = os.path.join(args.logdir, f"run_{run_id}")
-    os.makedirs(run_dir, exist_ok=True)
-
-    logger = ExecutionLogger(log_dir=args.logdir, run_id=run_id)
-    print(f"\n=== Running Pipeline: {test_case.get('name', '')} ===\n")
-
-    # --- Extended system info ---
-    sysinfo = get_extended_system_info()
-    run_hash = hashlib.sha256((test_case.get("name", "") + datetime.now().isoformat()).encode()).hexdigest()[:10]
-    logger.log({"event": "run_id", "run_id": run_hash})
-
-    logger.log({
-        "event": "start_pipeline",
-        "test_case": test_case.get("name", ""),
-        "start_time": datetime.now().isoformat(),
-        "system_info": sysinfo,
-        "metadata": test_case.get("metadata", {})
-    })
-
-    pipeline_eval_summary = []
-
-    for idx, step in enumerate(steps):
-        if step.get("skip"):
-            print(f"[SKIPPED] Step '{step.get('description')}' skipped due to missing command.")
-            logger.log({"step": step.get('description'), "eval": "[SKIPPED]", "reason": "missing command"})
-            continue
-
-        desc = step.get("description", f"Step {idx+1}")
-        typ = step.get("type", "shell")
-        required = step.get("required", True)
-        retries = step.get("retries", 1)
-        attempt = 0
-        passed = False
+    desc = step.get("description", f"Step {idx+1}")
+    typ = step.get("type", "shell")
+    required = step.get("required", True)
+    retries = step.get("retries", 1)
+    attempt = 0
+    passed = False
+    started = time.perf_counter()
+    timer = PhaseTimer()
+    profiler = None
+    if args.profile:
+        profiler = StepProfiler(args.profile, os.path.join(logger.base_dir, "profiles"), f"step{idx+1:02d}")
 
+    try:
+        if profiler is not None:
+            profiler.start()
         logger.log({"step": desc, "type": typ, "timestamp": datetime.now().isoformat(), "required": required})
+        if registry is not None:
+            registry.step_state(desc, "running", index=idx+1)
 
         print(f"\n[STEP {idx+1}] {desc}")
 
         while attempt < retries:
             attempt += 1
+            attempt_started = time.perf_counter()
             try:
                 if typ == "shell":
-                    import subprocess
+                    from modules.shell_stream import run_streaming
                     cmd = step["command"]
                     check_command_safety(cmd)
-                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
+                    eval_contains = step.get("eval_contains", "")
+                    eval_regex = step.get("eval_regex")
+                    result = run_streaming(
+                        cmd,
+                        contains=eval_contains,
+                        regex=eval_regex,
+                        timeout=step.get("timeout", 30),
+                        terminate_on_match=step.get("terminate_on_match", False),
+                        head=step.get("output_head", 2000),
+                        tail=step.get("output_tail", 2000)
+                    )
+                    timer.add("spawn", result.spawn_s)
+                    timer.add("subprocess_wait", result.wait_s)
                     output = result.stdout.strip() + "\n" + result.stderr.strip()
-                    logger.log({
+                    timer.timed("log_write", logger.log, {
                         "step": desc,
                         "command": cmd,
                         "stdout": result.stdout,
                         "stderr": result.stderr,
-                        "returncode": result.returncode
+                        "stdout_chars": result.stdout_chars,
+                        "stderr_chars": result.stderr_chars,
+                        "returncode": result.returncode,
+                        "matches": result.matches,
+                        "terminated": result.terminated
                     })
                     print(output)
-                    eval_contains = step.get("eval_contains", "")
-                    eval_result = evaluate_shell(output, eval_contains)
+                    # With both eval_contains and eval_regex, both have to be found
+                    patterns = {"contains": eval_contains, "regex": eval_regex}
+                    report = "; ".join(f"'{patterns[kind]}' {'found' if found else 'NOT found'}"
+                                       for kind, found in result.matches.items())
+                    eval_result = result.matched if result.matches else None
                     passed = eval_result is True
                     if passed:
                         tag = "[EVAL][PASSED]"
-                        print(f"{tag} '{eval_contains}' found in output.")
+                        print(f"{tag} {report} in output.")
                     elif eval_result is False:
                         tag = "[EVAL][FAILED]"
-                        print(f"{tag} '{eval_contains}' NOT found in output.")
+                        print(f"{tag} {report} in output.")
                     else:
                         tag = "[EVAL][SKIPPED]"
                         print(tag)
@@ -167,14 +155,22 @@ def main():
                     import subprocess
                     cmd = step["command"]
                     check_command_safety(cmd)
-                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
-                    passed = result.returncode == 0
+                    with timer.phase("spawn"):
+                        proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                    with timer.phase("subprocess_wait"):
+                        try:
+                            returncode = proc.wait(timeout=10)
+                        except subprocess.TimeoutExpired:
+                            proc.kill()
+                            proc.wait()
+                            raise
+                    passed = returncode == 0
                     tag = "[EVAL][PASSED]" if passed else "[EVAL][FAILED]"
-                    print(f"{tag} Command returned code {result.returncode}")
-                    logger.log({
+                    print(f"{tag} Command returned code {returncode}")
+                    timer.timed("log_write", logger.log, {
                         "step": desc,
                         "command": cmd,
-                        "returncode": result.returncode,
+                        "returncode": returncode,
                         "eval": tag
                     })
                     if passed:
@@ -186,40 +182,102 @@ def main():
                     if not fuzzy_mode:
                         fuzzy_mode = "classic" if typ == "fuzzy" else "neuro-fuzzy"
 
-                    validator = FuzzyValidator(
-                        metric_func=build_metric_func(step),
-                        thresholds=step.get("thresholds", [10, 30, 70]),
-                        min_thresholds=step.get("min_thresholds", [10, 30, 70]),
-                        history_size=step.get("history_size", 10),
-                        update_every=step.get("update_every", 2),
-                        label_names=step.get("label_names", ["LOW", "MED", "HIGH"]),
-                        mode=fuzzy_mode
-                    )
+                    validator = validators.get(idx) if validators is not None else None
+                    if validator is None:
+                        from modules.fuzzy_validator import FuzzyValidator
+                        validator = FuzzyValidator.from_step(step, build_metric_func(step, snapshot), mode=fuzzy_mode)
+                        if validators is not None:
+                            validators[idx] = validator
+                    label_names = validator.label_names
 
-                    duration = int(step.get("duration", 5))
+                    duration = float(step.get("duration", 5))
+                    ticker = FixedRateTicker(step.get("interval", args.interval), duration)
                     eval_label = step.get("eval_label")
-                    all_labels = []
-                    print(f"Fuzzy validation on {step.get('metric_func')} for {duration}s (mode: {fuzzy_mode})")
-                    end = time.time() + duration
-                    while time.time() < end:
-                        value, label, vals = validator.validate()
-                        all_labels.append(label)
-                        logger.log({
+                    aggregator = make_aggregator(step, duration, ticker.interval)
+                    store = open_sample_store(args, logger, idx, desc, label_names, step.get("metric_func"))
+                    print(f"Fuzzy validation on {step.get('metric_func')} for {duration}s every {ticker.interval}s (mode: {fuzzy_mode})")
+                    for _ in ticker:
+                        value = timer.timed("metric_read", validator.metric_func)
+                        value, label, vals = timer.timed("classify", validator.observe, value)
+                        aggregator.update(label)
+                        if registry is not None:
+                            timer.timed("exporter", registry.observe_fuzzy, desc, step.get("metric_func"), value, label,
+                                        label_names, vals, validator.thresholds, index=idx+1)
+                        if store:
+                            timer.timed("sample_store", store.append, time.time(), value, label_names.index(label), vals)
+                        timer.timed("log_write", logger.log, {
                             "step": desc,
                             "metric": step.get('metric_func'),
                             "value": value,
                             "label": label,
                             "fuzzy": vals
                         })
-                        print(f"{step.get('metric_func')}: {value:.1f} | {label} | {vals}")
-                        time.sleep(args.interval)
+                        timer.timed("console", print, f"{step.get('metric_func')}: {value:.1f} | {label} | {vals}")
                         if value == -1:
                             print(f"[WARNING] {desc} metric could not be evaluated. Is the device and command present?")
-                    passed = evaluate_fuzzy(all_labels, eval_label)
-                    tag = "[EVAL][PASSED]" if passed else "[EVAL][FAILED]"
-                    msg = f"Label '{eval_label}' {'was' if passed else 'was NOT'} found during validation"
-                    print(f"{tag} {msg}")
-                    logger.log({"step": desc, "eval": tag, "labels": all_labels})
+                        if aggregator.early_exit():
+                            print(f"[INFO] {aggregator.policy}: outcome decided after {aggregator.n} samples, stopping early.")
+                            break
+                    report_sampling(desc, ticker, logger, timer)
+                    if store:
+                        store.close()
+                    if validators is None and hasattr(validator.metric_func, "close"):
+                        validator.metric_func.close()
+                    if fuzzy_mode == "neuro-fuzzy" and step.get("nf_model"):
+                        validator.save_neuro_fuzzy_model(step["nf_model"])
+                    passed = report_fuzzy_eval(desc, eval_label, aggregator, logger)
+                    break
+
+                elif typ == "rules":
+                    inputs = step.get("inputs", {})
+                    from modules.rule_engine import FuzzyRuleEngine, SampleFrame, NO_FIRE
+                    engine = FuzzyRuleEngine(
+                        inputs=inputs,
+                        output=step.get("output", {}),
+                        rules=step.get("rules", []),
+                        inference=step.get("inference", "mamdani")
+                    )
+                    frame = SampleFrame({
+                        name: build_metric_func(dict(cfg, metric_func=cfg.get("metric_func", name)), snapshot)
+                        for name, cfg in inputs.items()
+                    })
+                    duration = float(step.get("duration", 5))
+                    ticker = FixedRateTicker(step.get("interval", args.interval), duration)
+                    eval_label = step.get("eval_label")
+                    aggregator = make_aggregator(step, duration, ticker.interval)
+                    store = open_sample_store(args, logger, idx, desc, engine.output_labels, engine.output_name)
+                    print(f"Fuzzy rules on {', '.join(inputs)} for {duration}s every {ticker.interval}s (inference: {engine.inference})")
+                    for _ in ticker:
+                        values = timer.timed("metric_read", frame.sample)
+                        label, strengths, crisp = timer.timed("classify", engine.classify, values)
+                        aggregator.update(label)
+                        if registry is not None:
+                            timer.timed("exporter", registry.observe_fuzzy, desc, engine.output_name, crisp, label,
+                                        engine.output_labels, strengths, inputs=values, index=idx+1)
+                        if store:
+                            label_index = NO_FIRE if label is None else engine.output_labels.index(label)
+                            timer.timed("sample_store", store.append, time.time(), crisp, label_index, strengths)
+                        record = {
+                            "step": desc,
+                            "frame": values,
+                            "output": engine.output_name,
+                            "value": crisp,
+                            "label": label,
+                            "fuzzy": strengths
+                        }
+                        if label is None:
+                            record["no_rule_fired"] = True
+                        timer.timed("log_write", logger.log, record)
+                        outcome = "no rule fired" if label is None else f"{crisp:.1f} | {label}"
+                        timer.timed("console", print, f"{values} -> {engine.output_name}: {outcome} | {strengths}")
+                        if aggregator.early_exit():
+                            print(f"[INFO] {aggregator.policy}: outcome decided after {aggregator.n} samples, stopping early.")
+                            break
+                    report_sampling(desc, ticker, logger, timer)
+                    if store:
+                        store.close()
+                    frame.close()
+                    passed = report_fuzzy_eval(desc, eval_label, aggregator, logger)
                     break
 
                 else:
@@ -229,21 +287,181 @@ def main():
             except Exception as e:
                 print(f"[EVAL][FAILED] Exception: {e}")
                 logger.log({"step": desc, "error": str(e)})
+            finally:
+                timer.add("attempt", time.perf_counter() - attempt_started)
 
         if not passed and step.get("on_fail"):
             of_cmd = step["on_fail"].get("command")
             if of_cmd:
                 import subprocess
                 check_command_safety(of_cmd)
-                result = subprocess.run(of_cmd, shell=True, capture_output=True, text=True)
+                with timer.phase("on_fail"):
+                    result = subprocess.run(of_cmd, shell=True, capture_output=True, text=True)
                 print(f"[ON-FAIL] Output: {result.stdout.strip()}")
                 logger.log({"step": desc, "on_fail_output": result.stdout.strip()})
+    finally:
+        # Taken before the profiler stops: collecting the profile is not part of the step
+        duration = round(time.perf_counter() - started, 3)
+        profile = profiler.stop() if profiler is not None else None
+
+    if registry is not None:
+        registry.step_state(desc, "passed" if passed else "failed", duration, index=idx+1)
+    phases = timer.summary()
+    timing = {"step": desc, "event": "timing", "attempts": attempt, "duration_s": duration, "phases": phases}
+    if profiler is not None:
+        timing["profile"] = profile
+        if profile and profile.get("cpu_profile"):
+            print(f"[INFO] CPU profile of '{desc}' written to {profile['cpu_profile']}")
+        if profile and "memory_peak_kb" in profile:
+            print(f"[INFO] Peak traced memory of '{desc}': {profile['memory_peak_kb']} KiB")
+    logger.log(timing)
+
+    return {
+        "step": desc,
+        "passed": passed,
+        "required": required,
+        "duration_s": duration,
+        "attempts": attempt,
+        "phases": phases
+    }
+
+def run_steps(steps, args, logger, max_workers=None, snapshot=None, registry=None):
+    """
+    Run all steps and return the pipeline summary (skipped steps excluded).
+    Steps run sequentially unless a step declares "depends_on" or more than one
+    worker is requested, in which case independent steps run concurrently.
+    """
+    concurrent = max_workers and max_workers > 1 or any(step.get("depends_on") for step in steps)
+    if not concurrent:
+        results = [run_step(idx, step, args, logger, snapshot, registry=registry) for idx, step in enumerate(steps)]
+    else:
+        deps = resolve_dependencies(steps)
+        workers = max_workers or len(steps)
+        print(f"[INFO] Running steps concurrently (max {workers} workers)")
+        results = run_dag(steps, deps, lambda idx, step: run_step(idx, step, args, logger, snapshot, registry=registry), workers)
+    return [r for r in results if r is not None]
+
+def prevalidate_steps(steps):
+    """
+    Check for missing commands and the whitelist. Steps whose command is missing are marked "skip".
+    Metric names are checked against the known metrics (plugin names come from the manifest,
+    no plugin is imported); steps with unknown metrics are reported and will fail.
+    """
+    known_metrics = None
+    for step in steps:
+        typ = step.get("type")
+        if typ in ["boolean", "shell"]:
+            cmd = step.get("command")
+            if not cmd or not command_exists(cmd):
+                print(f"[WARNING] Command '{cmd}' not found for step '{step.get('description')}'. Step will be skipped.")
+                step['skip'] = True
+            else:
+                check_command_safety(cmd)
+        elif typ == "fuzzy" and step.get("metric_func") == "custom_shell":
+            cmd = step.get("custom_command")
+            if not cmd or not command_exists(cmd):
+                print(f"[WARNING] Custom shell command '{cmd}' not found for step '{step.get('description')}'. Step will be skipped.")
+                step['skip'] = True
+            else:
+                check_command_safety(cmd)
 
-        pipeline_eval_summary.append({
-            "step": desc,
-            "passed": passed,
-            "required": required
-        })
+        if typ in ("fuzzy", "neuro_fuzzy"):
+            metrics = [step.get("metric_func")]
+        elif typ == "rules":
+            metrics = [cfg.get("metric_func", name) for name, cfg in step.get("inputs", {}).items()]
+        else:
+            continue
+        if known_metrics is None:
+            known_metrics = set(SystemMetrics.list_metrics())
+        missing = [m for m in metrics if m and m != "custom_shell" and m not in known_metrics]
+        if missing:
+            print(f"[WARNING] Metric(s) {', '.join(missing)} of step '{step.get('description')}' not available "
+                  f"(see --list-metrics). The step will fail.")
+
+def start_exporter(args, test_case, run_id):
+    """
+    Start the OpenMetrics endpoint if --metrics-port is given. Returns (registry, exporter) or (None, None).
+    """
+    if args.metrics_port is None:
+        return None, None
+    from modules.exporter import MetricsRegistry, MetricsExporter
+    registry = MetricsRegistry()
+    registry.set_info(pipeline=test_case.get("name", ""), run_id=run_id)
+    try:
+        exporter = MetricsExporter(registry, host=args.metrics_host, port=args.metrics_port).start()
+    except OSError as e:
+        print(f"[WARNING] Metrics endpoint could not be started on {args.metrics_host}:{args.metrics_port}: {e}")
+        return None, None
+    print(f"[INFO] Serving live metrics at {exporter.url}")
+    return registry, exporter
+
+def run_pipeline(test_case, steps, args, log_dir=None, run_id=None, system_info=None, export=True):
+    """
+    Run one (pre-validated) pipeline: log, execute the steps, evaluate and export the reports.
+
+    :param test_case: Parsed testcase dict.
+    :param steps: Steps to run.
+    :param args: Parsed CLI arguments.
+    :param log_dir: Log directory (default: args.logdir).
+    :param run_id: Run id (default: current timestamp).
+    :param system_info: Already collected system info to log instead of collecting it for this run.
+    :param export: Write report.xlsx/report.html for this run.
+    :return: Pipeline summary dict.
+    """
+    started = time.perf_counter()
+    log_dir = log_dir or args.logdir
+    run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    logger = ExecutionLogger(
+        log_dir=log_dir,
+        run_id=run_id,
+        fmt=args.log_format,
+        flush_records=args.log_flush_records,
+        flush_bytes=args.log_flush_bytes,
+        flush_ms=args.log_flush_ms
+    )
+    print(f"\n=== Running Pipeline: {test_case.get('name', '')} ===\n")
+
+    # --- Extended system info ---
+    metadata = test_case.get("metadata", {})
+    sysinfo_collector = None
+    if system_info is None:
+        sysinfo_collector = SystemInfoCollector(
+            sections=metadata.get("system_info_sections"),
+            cache_dir=False if args.no_sysinfo_cache else None
+        ).start()
+    run_hash = hashlib.sha256((test_case.get("name", "") + datetime.now().isoformat()).encode()).hexdigest()[:10]
+    logger.log({"event": "run_id", "run_id": run_hash})
+
+    logger.log({
+        "event": "start_pipeline",
+        "test_case": test_case.get("name", ""),
+        "start_time": datetime.now().isoformat(),
+        "metadata": metadata
+    })
+
+    snapshot_ttl = args.snapshot_ttl if args.snapshot_ttl is not None else test_case.get("snapshot_ttl", 0)
+    snapshot = SnapshotSampler(ttl=snapshot_ttl) if snapshot_ttl > 0 else None
+    registry, exporter = start_exporter(args, test_case, logger.run_id)
+
+    pipeline_eval_summary = run_steps(
+        steps, args, logger,
+        max_workers=args.max_workers or test_case.get("max_workers"),
+        snapshot=snapshot,
+        registry=registry
+    )
+
+    if snapshot is not None:
+        logger.log({"event": "metric_snapshot", **snapshot.stats()})
+
+    if pipeline_eval_summary:
+        print("\n[TIMING] Per-step phase totals:")
+        for line in format_timing_table([(r["step"], r["duration_s"], r["phases"]) for r in pipeline_eval_summary]):
+            print(f"  {line}")
+
+    if sysinfo_collector is not None:
+        system_info = sysinfo_collector.result()
+    logger.log({"event": "system_info", "system_info": system_info})
 
     min_passed = test_case.get("min_passed", None)
     total_required = sum(1 for pf in pipeline_eval_summary if pf.get("required", True))
@@ -269,20 +487,469 @@ def main():
         "global_pass": global_pass
     })
     logger.close()
+    if registry is not None:
+        registry.set("pipeline_passed", (), int(global_pass))
+    update_run_index(args, logger.base_dir)
 
     print("\n=== PIPELINE FINISHED ===")
     print(f"[PIPELINE] {'PASSED' if global_pass else 'FAILED'}")
 
+    report_export_s = None
+    if export:
+        try:
+            logfile = logger.log_file
+            report_dir = logger.base_dir
+            excel_path = os.path.join(report_dir, "report.xlsx")
+            html_path = os.path.join(report_dir, "report.html")
+            from modules.reporting import export_reports
+            export_started = time.perf_counter()
+            export_reports(logfile, excel_path=excel_path, html_path=html_path)
+            report_export_s = round(time.perf_counter() - export_started, 3)
+            print(f"Reports generated: {excel_path} and {html_path} ({report_export_s:.2f}s)")
+        except Exception as e:
+            print(f"[WARNING] Report export failed: {e}")
+
+    if exporter is not None:
+        if args.metrics_linger:
+            print(f"[INFO] Serving final metrics for {args.metrics_linger}s...")
+        exporter.stop(linger=args.metrics_linger)
+
+    return {
+        "name": test_case.get("name", ""),
+        "passed": global_pass,
+        "num_passed": num_passed,
+        "total_required": total_required,
+        "min_passed": min_passed,
+        "steps": pipeline_eval_summary,
+        "skipped": [step.get("description") for step in steps if step.get("skip")],
+        "duration_s": round(time.perf_counter() - started, 3),
+        "report_export_s": report_export_s,
+        "run_dir": logger.base_dir,
+        "log_file": logger.log_file
+    }
+
+def index_path(args):
+    from modules.run_index import INDEX_FILE
+    return args.index or os.path.join(args.logdir, INDEX_FILE)
+
+def update_run_index(args, run_dir):
+    """
+    Add the summary of a finished run to the SQLite run index (unless --no-index).
+    """
+    if args.no_index:
+        return
+    try:
+        from modules.run_index import RunIndex
+        index = RunIndex(index_path(args))
+        try:
+            index.index_run(run_dir)
+        finally:
+            index.close()
+    except Exception as e:
+        print(f"[WARNING] Run index update failed: {e}")
+
+def run_index_command(args):
+    """
+    --index-backfill / --query / --query-sql.
+    """
+    from modules.run_index import RunIndex, parse_filters, format_rows
+    path = index_path(args)
+    if args.index_backfill is not None:
+        roots = args.index_backfill or [args.logdir]
+        started = time.perf_counter()
+        index = RunIndex(path)
+        try:
+            indexed, unchanged, failed = index.backfill(roots, force=args.reindex)
+        finally:
+            index.close()
+        print(f"[INFO] Indexed {indexed} run(s), {unchanged} unchanged, {failed} failed "
+              f"in {time.perf_counter() - started:.2f}s -> {path}")
+    if not (args.query or args.query_sql):
+        return
+    if not os.path.exists(path):
+        print(f"ERROR: Run index '{path}' not found. Create it with --index-backfill.")
+        return
+    import sqlite3
+    index = RunIndex(path, readonly=True)
+    try:
+        if args.query_sql:
+            columns, rows = index.execute(args.query_sql)
+        else:
+            columns, rows = index.query(args.query, parse_filters(args.filter), limit=args.limit)
+    except sqlite3.Error as e:
+        print(f"ERROR: Query failed: {e}")
+        return
+    finally:
+        index.close()
+    for line in format_rows(columns, rows):
+        print(line)
+    print(f"({len(rows)} row(s))")
+
+def load_watch_state(path):
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Could not read watch state '{path}': {e}. Starting fresh.")
+        return {}
+
+def save_watch_state(path, steps, states):
+    """
+    Write the adaptive state of every fuzzy validator, keyed by step description (atomic replace).
+
+    :param states: Dict step index -> FuzzyValidator.get_state().
+    """
+    state = {steps[idx].get("description", f"Step {idx+1}"): s for idx, s in states.items()}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+def run_watch(test_case, steps, args):
+    """
+    --watch: keep running, each step on its own period ("period" in the step, or the --watch value).
+
+    Fuzzy validators (history and adaptive thresholds) live for the whole process and can be
+    persisted to --watch-state across restarts. The run log is rotated by size/age and only
+    per-step counters are kept in memory, so memory use does not grow with uptime.
+    """
+    import signal
+    from modules.fuzzy_validator import FuzzyValidator
+    from modules.scheduler import PeriodicScheduler
+
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    logger = ExecutionLogger(
+        log_dir=args.logdir,
+        run_id=f"watch_{run_id}",
+        fmt=args.log_format,
+        flush_records=args.log_flush_records,
+        flush_bytes=args.log_flush_bytes,
+        flush_ms=args.log_flush_ms,
+        max_bytes=args.log_max_bytes,
+        max_age_s=args.log_rotate_s,
+        backup_count=args.log_backups
+    )
+    metadata = test_case.get("metadata", {})
+    logger.log({
+        "event": "start_watch",
+        "test_case": test_case.get("name", ""),
+        "start_time": datetime.now().isoformat(),
+        "metadata": metadata
+    })
+    # Logged from the collector thread when ready, so the first steps are not delayed
+    sysinfo_collector = SystemInfoCollector(
+        sections=metadata.get("system_info_sections"),
+        cache_dir=False if args.no_sysinfo_cache else None
+    ).start(on_done=lambda info: logger.log({"event": "system_info", "system_info": info}))
+
+    snapshot_ttl = args.snapshot_ttl if args.snapshot_ttl is not None else test_case.get("snapshot_ttl", 0)
+    snapshot = SnapshotSampler(ttl=snapshot_ttl) if snapshot_ttl > 0 else None
+
+    registry, exporter = start_exporter(args, test_case, logger.run_id)
+    saved = load_watch_state(args.watch_state)
+    validators = {}
+    for idx, step in enumerate(steps):
+        if step.get("type") not in ("fuzzy", "neuro_fuzzy") or step.get("skip"):
+            continue
+        validator = FuzzyValidator.from_step(step, build_metric_func(step, snapshot))
+        desc = step.get("description", f"Step {idx+1}")
+        if desc in saved:
+            try:
+                validator.set_state(saved[desc])
+                print(f"[INFO] Restored state of '{desc}' (thresholds {validator.thresholds.tolist()}, {len(validator.history)} samples).")
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"[WARNING] Saved state of '{desc}' ignored: {e}")
+        validators[idx] = validator
+
+    # Validator states are copied by the step's own job after each run (a job never overlaps
+    # itself), so the "save state" job does not read validators that other threads are updating
+    states = {idx: v.get_state() for idx, v in validators.items()}
+    counters = {}
+
+    def run_scheduled(idx, step):
+        try:
+            res = run_step(idx, step, args, logger, snapshot, validators, registry)
+        finally:
+            if idx in validators:
+                states[idx] = validators[idx].get_state()
+        if res is None:
+            return
+        c = counters.setdefault(res["step"], {"runs": 0, "passed": 0, "failed": 0})
+        c["runs"] += 1
+        c["passed" if res["passed"] else "failed"] += 1
+        logger.log({"event": "watch_cycle", **res})
+
+    scheduler = PeriodicScheduler(max_workers=args.max_workers or test_case.get("max_workers") or 1)
+    for idx, step in enumerate(steps):
+        if step.get("skip"):
+            continue
+        period = float(step.get("period", args.watch))
+        scheduler.add(step.get("description", f"Step {idx+1}"), period,
+                      lambda idx=idx, step=step: run_scheduled(idx, step))
+    if args.watch_state and validators:
+        scheduler.add("save state", args.watch_state_every,
+                      lambda: save_watch_state(args.watch_state, steps, dict(states)), delay=args.watch_state_every)
+
+    if scheduler.max_workers < len(scheduler.jobs):
+        print(f"[INFO] {len(scheduler.jobs)} jobs share {scheduler.max_workers} worker(s): a slow job delays the others. "
+              f"Use --max-workers {len(scheduler.jobs)} to keep every period.")
+
+    def request_stop(signum, frame):
+        print("\n[INFO] Stopping watch mode after the running step...")
+        scheduler.stop()
+
+    previous = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+    print(f"\n=== Watching Pipeline: {test_case.get('name', '')} ({len(scheduler.jobs)} scheduled jobs, Ctrl-C to stop) ===\n")
+    try:
+        scheduler.run(duration=args.watch_for)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        if args.watch_state and validators:
+            # All jobs have finished here, so the validators can be read directly
+            save_watch_state(args.watch_state, steps, {idx: v.get_state() for idx, v in validators.items()})
+            print(f"[INFO] Watch state saved to {args.watch_state}")
+        for validator in validators.values():
+            if hasattr(validator.metric_func, "close"):
+                validator.metric_func.close()
+        if snapshot is not None:
+            logger.log({"event": "metric_snapshot", **snapshot.stats()})
+        sysinfo_collector.result()
+        logger.log({
+            "event": "end_watch",
+            "end_time": datetime.now().isoformat(),
+            "steps": counters,
+            "scheduler": scheduler.stats(),
+            "log_rotations": logger.rotations
+        })
+        logger.close()
+        update_run_index(args, logger.base_dir)
+        if exporter is not None:
+            exporter.stop()
+
+    print("\n=== WATCH STOPPED ===")
+    for desc, c in counters.items():
+        print(f"[WATCH] {desc}: {c['passed']}/{c['runs']} runs passed")
+
     try:
-        logfile = logger.log_file
-        report_dir = logger.base_dir
-        excel_path = os.path.join(report_dir, "report.xlsx")
-        html_path = os.path.join(report_dir, "report.html")
-        export_log_to_excel(logfile, excel_path)
-        export_log_to_html(logfile, html_path)
-        print(f"Reports generated: {excel_path} and {html_path}")
+        excel_path = os.path.join(logger.base_dir, "report.xlsx")
+        html_path = os.path.join(logger.base_dir, "report.html")
+        from modules.reporting import export_reports
+        export_reports(logger.log_file, excel_path=excel_path, html_path=html_path)
+        print(f"Reports generated for the current log file: {excel_path} and {html_path}")
     except Exception as e:
         print(f"[WARNING] Report export failed: {e}")
 
+def run_batch_pipeline(task):
+    """
+    Pool worker of --testcases: run one pipeline, with its console output written
+    to console.log in its run directory instead of the shared terminal.
+    """
+    import contextlib
+    path, test_case, args, log_dir, run_id, system_info = task
+    run_dir = os.path.join(log_dir, f"run_{run_id}")
+    os.makedirs(run_dir, exist_ok=True)
+    started = time.perf_counter()
+    with open(os.path.join(run_dir, "console.log"), "w") as out, contextlib.redirect_stdout(out):
+        try:
+            result = run_pipeline(test_case, test_case.get("steps", []), args,
+                                  log_dir=log_dir, run_id=run_id, system_info=system_info,
+                                  export=args.pipeline_reports)
+        except Exception as e:
+            print(f"[ERROR] Pipeline failed: {e}")
+            result = {"error": str(e), "run_dir": run_dir, "duration_s": round(time.perf_counter() - started, 3)}
+    result["testcase"] = path
+    return result
+
+def run_batch(args):
+    """
+    --testcases: parse and validate all testcases once, collect system info once,
+    run the pipelines on a process pool and write one aggregated report.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from modules.batch import discover_testcases, load_testcases, batch_run_id, print_batch_summary
+
+    paths = discover_testcases(args.testcases)
+    testcases, errors = load_testcases(paths)
+    for path, message in errors:
+        print(f"[WARNING] Invalid testcase '{path}': {message}. It will not be run.")
+    if not testcases:
+        print("ERROR: No valid testcases found.")
+        return
+
+    if args.dry_run:
+        for path, test_case in testcases:
+            print(f"\n[DRY-RUN] {path}: {test_case.get('name', '')}")
+            for idx, step in enumerate(test_case.get("steps", [])):
+                print(f"[{idx+1}] {step.get('description')} (type: {step.get('type')})")
+        return
+
+    if args.metrics_port is not None:
+        print("[WARNING] --metrics-port is not supported with --testcases (pipelines run in separate processes). Ignored.")
+        args.metrics_port = None
+
+    for path, test_case in testcases:
+        print(f"[INFO] Validating {path}")
+        prevalidate_steps(test_case.get("steps", []))
+
+    requested = [tc.get("metadata", {}).get("system_info_sections") for _, tc in testcases]
+    sections = None if any(r is None for r in requested) else sorted({s for r in requested for s in r})
+    collector = SystemInfoCollector(sections=sections, cache_dir=False if args.no_sysinfo_cache else None).start()
+
+    batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    batch_dir = os.path.join(args.logdir, f"batch_{batch_id}")
+    os.makedirs(batch_dir, exist_ok=True)
+    system_info = collector.result()
+
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(testcases)))
+    print(f"\n=== Running {len(testcases)} pipelines ({jobs} at a time) ===")
+    started = time.perf_counter()
+    results = [{"testcase": path, "error": message} for path, message in errors]
+    tasks = [(path, tc, args, batch_dir, batch_run_id(i, path), system_info) for i, (path, tc) in enumerate(testcases)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_batch_pipeline, task) for task in tasks]
+        for future in as_completed(futures):
+            res = future.result()
+            verdict = "ERROR" if res.get("error") else ("PASSED" if res["passed"] else "FAILED")
+            print(f"[{verdict}] {res['testcase']} ({res['duration_s']:.1f}s) -> {res['run_dir']}")
+            results.append(res)
+    order = {path: i for i, path in enumerate(paths)}
+    results.sort(key=lambda r: order.get(r["testcase"], len(order)))
+
+    print_batch_summary(results)
+    total_passed = sum(1 for r in results if r.get("passed"))
+    print(f"\n=== BATCH FINISHED: {total_passed}/{len(results)} pipelines passed in {time.perf_counter() - started:.1f}s ===")
+
+    try:
+        excel_path = os.path.join(batch_dir, "batch_report.xlsx")
+        html_path = os.path.join(batch_dir, "batch_report.html")
+        from modules.reporting import export_batch_report
+        export_batch_report(results, system_info=system_info, excel_path=excel_path, html_path=html_path)
+        print(f"Batch reports generated: {excel_path} and {html_path}")
+    except Exception as e:
+        print(f"[WARNING] Batch report export failed: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Industrial Fuzzy Test Pipeline Runner")
+    parser.add_argument("--testcase", type=str, required=False, help="Path to test_case.json")
+    parser.add_argument("--testcases", nargs="+", metavar="PATH", help="Run many testcases (files, directories or globs) as one batch with an aggregated report")
+    parser.add_argument("--pipeline-reports", action="store_true", help="With --testcases: also write report.xlsx/report.html for every pipeline")
+    parser.add_argument("--jobs", type=int, help="With --testcases: number of pipelines run concurrently (default: CPU count)")
+    parser.add_argument("--logdir", type=str, default="logs", help="Log directory")
+    parser.add_argument("--log-format", choices=["text", "jsonl", "binary"], default="text", help="Run log format")
+    parser.add_argument("--log-flush-records", type=int, default=256, help="Flush the log after N buffered records")
+    parser.add_argument("--log-flush-bytes", type=int, default=65536, help="Flush the log after N buffered bytes")
+    parser.add_argument("--log-flush-ms", type=int, default=500, help="Flush the log at least every N milliseconds")
+    parser.add_argument("--sample-store", action="store_true", help="Also write fuzzy samples to columnar Arrow files (requires pyarrow)")
+    parser.add_argument("--no-sysinfo-cache", action="store_true", help="Do not use the on-disk cache for pip/hardware system info")
+    parser.add_argument("--interval", type=float, default=1.0, help="Interval between fuzzy samples (seconds)")
+    parser.add_argument("--list-metrics", action="store_true", help="List all available metrics and exit")
+    parser.add_argument("--dry-run", action="store_true", help="Show pipeline steps without executing")
+    parser.add_argument("--step", type=int, help="Run only step N (1-based)")
+    parser.add_argument("--generate-example", action="store_true", help="Generate an example testcase and exit")
+    parser.add_argument("--max-workers", type=int, help="Run independent steps concurrently with up to N workers")
+    parser.add_argument("--snapshot-ttl", type=float, help="Share built-in metric reads through a snapshot refreshed at most every N seconds")
+    parser.add_argument("--replay", nargs="+", metavar="LOG", help="Re-score recorded fuzzy samples from run logs/run dirs (globs allowed) with the testcase's step configs")
+    parser.add_argument("--sweep", type=str, metavar="GRID_JSON", help="With --replay: parameter grid to sweep (thresholds, min_thresholds, history_size, update_every)")
+    parser.add_argument("--sweep-top", type=int, default=5, help="With --sweep: number of best configurations to print per step")
+    parser.add_argument("--replay-output", type=str, help="With --replay: write the replay/sweep results to this JSON file")
+    parser.add_argument("--watch", type=float, nargs="?", const=60.0, metavar="PERIOD", help="Keep running and repeat each step every PERIOD seconds (default 60, per step: \"period\")")
+    parser.add_argument("--watch-for", type=float, metavar="SECONDS", help="With --watch: stop after this many seconds")
+    parser.add_argument("--watch-state", type=str, metavar="PATH", help="With --watch: load/save fuzzy validator state (history, thresholds) to this JSON file")
+    parser.add_argument("--watch-state-every", type=float, default=300.0, help="With --watch-state: save the state every N seconds")
+    parser.add_argument("--log-max-bytes", type=int, help="With --watch: rotate the run log at this size (default 10 MiB)")
+    parser.add_argument("--log-rotate-s", type=float, help="With --watch: rotate the run log after this many seconds (default 86400)")
+    parser.add_argument("--log-backups", type=int, help="With --watch: number of rotated log files to keep (default 10)")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="Profile each step: cProfile (cpu), tracemalloc (memory) or both (all)")
+    parser.add_argument("--metrics-port", type=int, help="Serve live values, memberships, thresholds, labels and step states in OpenMetrics format on this port (0: any free port)")
+    parser.add_argument("--metrics-host", default="127.0.0.1", help="Bind address of the metrics endpoint")
+    parser.add_argument("--metrics-linger", type=float, default=0.0, help="Keep serving metrics for N seconds after the pipeline finished")
+    parser.add_argument("--index", type=str, metavar="PATH", help="SQLite run index (default: <logdir>/index.sqlite)")
+    parser.add_argument("--no-index", action="store_true", help="Do not add finished runs to the run index")
+    parser.add_argument("--index-backfill", nargs="*", metavar="DIR", help="Index existing run directories below DIR (default: --logdir) and exit")
+    parser.add_argument("--reindex", action="store_true", help="With --index-backfill: re-index runs whose logs did not change")
+    parser.add_argument("--query", choices=["runs", "steps", "labels"], help="Query the run index: latest runs, per-step failure rates or label histograms")
+    parser.add_argument("--query-sql", type=str, metavar="SQL", help="Run a read-only SQL query on the run index (tables runs, steps, labels)")
+    parser.add_argument("--filter", nargs="+", metavar="KEY=VALUE", help="With --query: pipeline, step, host (wildcards allowed), since/until (30d, 12h or ISO date), passed")
+    parser.add_argument("--limit", type=int, default=50, help="With --query: maximum number of rows")
+    parser.add_argument("--add-metric", nargs=2, metavar=('NAME', 'COMMAND'), help="Register a new shell-based metric: NAME COMMAND (kept for later runs)")
+    parser.add_argument("--remove-metric", metavar="NAME", help="Remove a metric registered with --add-metric")
+    args = parser.parse_args()
+
+    if args.add_metric:
+        name, command = args.add_metric
+        register_cli_metric(name, command)
+
+    if args.remove_metric:
+        unregister_cli_metric(args.remove_metric)
+        return
+
+    if args.generate_example:
+        generate_example_testcase()
+        return
+
+    if args.list_metrics:
+        list_available_metrics()
+        return
+
+    if args.index_backfill is not None or args.query or args.query_sql:
+        try:
+            run_index_command(args)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+        return
+
+    if args.testcases:
+        run_batch(args)
+        return
+
+    if not args.testcase:
+        print("ERROR: --testcase argument is required unless --testcases, --query, --index-backfill, --list-metrics or --generate-example is used.")
+        return
+
+    with open(args.testcase) as f:
+        test_case = json.load(f)
+
+    if args.dry_run:
+        print("\n[DRY-RUN] Steps to execute:")
+        for idx, step in enumerate(test_case.get("steps", [])):
+            print(f"[{idx+1}] {step.get('description')} (type: {step.get('type')})")
+        return
+
+    steps = test_case.get("steps", [])
+    if args.step:
+        idx = args.step - 1
+        if idx < 0 or idx >= len(steps):
+            print(f"Invalid --step {args.step}, there are only {len(steps)} steps.")
+            return
+        steps = [dict(steps[idx], depends_on=[])]
+
+    if args.replay:
+        from modules.replay import run_replay
+        sweep = None
+        if args.sweep:
+            with open(args.sweep) as f:
+                sweep = json.load(f)
+        results = run_replay(args.replay, steps, sweep=sweep, max_workers=args.max_workers, top=args.sweep_top)
+        if args.replay_output:
+            with open(args.replay_output, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"[INFO] Replay results written to {args.replay_output}")
+        return
+
+    prevalidate_steps(steps)
+    if args.watch is not None:
+        if args.log_max_bytes is None:
+            args.log_max_bytes = 10 << 20
+        if args.log_rotate_s is None:
+            args.log_rotate_s = 86400
+        if args.log_backups is None:
+            args.log_backups = 10
+        run_watch(test_case, steps, args)
+        return
+    run_pipeline(test_case, steps, args)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+import glob
+import json
+import os
+import re
+
+STEP_TYPES = ("shell", "boolean", "fuzzy", "neuro_fuzzy", "rules")
+
+
+def discover_testcases(patterns):
+    """
+    Expand testcase globs and directories (all *.json files inside) into a sorted, de-duplicated list.
+    """
+    paths = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if os.path.isdir(path):
+                paths.extend(sorted(glob.glob(os.path.join(path, "*.json"))))
+            else:
+                paths.append(path)
+    seen = set()
+    return [p for p in paths if not (os.path.abspath(p) in seen or seen.add(os.path.abspath(p)))]
+
+
+def validate_testcase(test_case):
+    """
+    Structural checks of a parsed testcase. Returns a list of error messages (empty if valid).
+    """
+    if not isinstance(test_case, dict):
+        return ["top level must be a JSON object"]
+    steps = test_case.get("steps")
+    if not isinstance(steps, list):
+        return ["'steps' must be a list"]
+    errors = []
+    for idx, step in enumerate(steps):
+        if not isinstance(step, dict):
+            errors.append(f"step {idx + 1} must be a JSON object")
+            continue
+        typ = step.get("type", "shell")
+        if typ not in STEP_TYPES:
+            errors.append(f"step {idx + 1} has unknown type '{typ}'")
+        elif typ in ("fuzzy", "neuro_fuzzy") and not step.get("metric_func"):
+            errors.append(f"step {idx + 1} has no 'metric_func'")
+    return errors
+
+
+def load_testcases(paths):
+    """
+    Parse and validate every testcase file once.
+
+    :return: (testcases, errors) where testcases is a list of (path, test_case)
+             and errors a list of (path, message) for files that cannot be run.
+    """
+    testcases, errors = [], []
+    for path in paths:
+        try:
+            with open(path) as f:
+                test_case = json.load(f)
+        except (OSError, ValueError) as e:
+            errors.append((path, str(e)))
+            continue
+        problems = validate_testcase(test_case)
+        if problems:
+            errors.append((path, "; ".join(problems)))
+        else:
+            testcases.append((path, test_case))
+    return testcases, errors
+
+
+def batch_run_id(idx, path):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", os.path.splitext(os.path.basename(path))[0]).strip("_").lower()[:40]
+    return f"{idx + 1:02d}_{slug}"
+
+
+def pass_fail_matrix(results):
+    """
+    Pipelines x steps matrix of PASS / FAIL / SKIP cells.
+
+    :param results: Pipeline summaries (as returned by run_pipeline, plus "testcase").
+    :return: (step_columns, rows) where each row is a dict with "testcase" and one cell per step.
+    """
+    columns = []
+    rows = []
+    for res in results:
+        row = {"testcase": res["testcase"]}
+        for step in res.get("steps", []):
+            if step["step"] not in columns:
+                columns.append(step["step"])
+            row[step["step"]] = "PASS" if step["passed"] else ("FAIL" if step["required"] else "FAIL (optional)")
+        for desc in res.get("skipped", []):
+            if desc not in columns:
+                columns.append(desc)
+            row[desc] = "SKIP"
+        rows.append(row)
+    return columns, rows
+
+
+def print_batch_summary(results):
+    width = max([len(r["testcase"]) for r in results] + [8])
+    print(f"\n{'TESTCASE'.ljust(width)}  RESULT  STEPS    TIME")
+    for res in results:
+        if res.get("error"):
+            print(f"{res['testcase'].ljust(width)}  ERROR   {'-':7}  {'-':>6}  {res['error']}")
+            continue
+        verdict = "PASSED" if res["passed"] else "FAILED"
+        steps = f"{res['num_passed']}/{res['total_required']}"
+        print(f"{res['testcase'].ljust(width)}  {verdict}  {steps:7}  {res['duration_s']:6.1f}s")
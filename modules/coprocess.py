@@ -0,0 +1,122 @@
+import atexit
+import os
+import select
+import signal
+import subprocess
+import threading
+import time
+import uuid
+import weakref
+
+_live = weakref.WeakSet()
+
+# The coprocess frames output with select() on pipes and kills its process group: POSIX only.
+SUPPORTED = os.name == "posix"
+
+
+class ShellCoprocess:
+    def __init__(self, shell="/bin/sh"):
+        """
+        Long-lived shell used to run many commands without a fork/exec of the shell per call.
+
+        Each command is written to the shell's stdin followed by a unique sentinel
+        line carrying the exit code, so its output can be framed on stdout.
+        Commands run in a ( ... ) subshell, so cd, variable assignments, set -e or exit
+        do not leak into later commands. The shell is (re)started lazily and restarted
+        after a timeout or exit; on timeout its whole process group is killed.
+
+        One coprocess may be shared by several threads (e.g. concurrent steps using the
+        same --add-metric metric): run() and close() are serialized by a lock.
+
+        :param shell: Shell executable.
+        """
+        self.shell = shell
+        self.proc = None
+        self._buf = b""
+        self._sentinel = f"__PYFUZZYFLOW_{uuid.uuid4().hex}__".encode()
+        self._lock = threading.Lock()
+        _live.add(self)
+
+    def _start(self):
+        self.proc = subprocess.Popen(
+            [self.shell],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+            start_new_session=True
+        )
+        self._buf = b""
+
+    def run(self, cmd, timeout=15):
+        """
+        Run a command in the coprocess.
+
+        :return: (returncode, stdout) or (None, "") on timeout / shell failure.
+        """
+        with self._lock:
+            return self._run(cmd, timeout)
+
+    def _run(self, cmd, timeout):
+        if self.proc is None or self.proc.poll() is not None:
+            self._start()
+        script = f"( {cmd}\n) </dev/null 2>/dev/null\nprintf '\\n%s %d\\n' '{self._sentinel.decode()}' $?\n"
+        try:
+            self.proc.stdin.write(script.encode())
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            self._close()
+            return None, ""
+        marker = b"\n" + self._sentinel + b" "
+        fd = self.proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        while True:
+            pos = self._buf.find(marker)
+            if pos != -1:
+                end = self._buf.find(b"\n", pos + len(marker))
+                if end != -1:
+                    out = self._buf[:pos]
+                    code = int(self._buf[pos + len(marker):end])
+                    self._buf = self._buf[end + 1:]
+                    return code, out.decode(errors="replace")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._close()
+                return None, ""
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                self._close()
+                return None, ""
+            self._buf += chunk
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self.proc is None:
+            return
+        try:
+            # The shell leads its own session: this also kills a command still running in it
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1)
+        except Exception:
+            pass
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        self.proc = None
+
+
+@atexit.register
+def _close_all():
+    for coproc in list(_live):
+        coproc.close()
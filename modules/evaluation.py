@@ -0,0 +1,126 @@
+import math
+
+EVAL_POLICIES = ("any", "first_match", "fail_fast", "dwell", "majority")
+
+
+class LabelAggregator:
+    def __init__(self, eval_label, policy="any", expected_samples=None, dwell_samples=None, dwell_fraction=None):
+        """
+        Constant-memory streaming evaluation of the labels produced by a fuzzy step.
+
+        Policies:
+          - "any": passes if eval_label is seen at least once (runs the full duration).
+          - "first_match": same criterion, but stops as soon as the label is seen.
+          - "fail_fast": every sample must be eval_label; stops at the first other label.
+          - "dwell": eval_label held for dwell_samples consecutive samples, or for
+            dwell_fraction (0-1) of the window. Stops once decided either way.
+          - "majority": eval_label on more than half of the samples. Stops once decided.
+
+        :param eval_label: Label being evaluated.
+        :param policy: One of EVAL_POLICIES.
+        :param expected_samples: Samples in the full window, used to stop early when the
+                                 outcome can no longer change.
+        :param dwell_samples: Consecutive samples required by "dwell".
+        :param dwell_fraction: Fraction of the window required by "dwell".
+        """
+        if policy not in EVAL_POLICIES:
+            raise ValueError(f"Unknown eval_policy: {policy}. Use one of {', '.join(EVAL_POLICIES)}.")
+        if policy == "dwell" and not (dwell_samples or dwell_fraction):
+            raise ValueError("The 'dwell' policy needs 'dwell_samples' or 'dwell_fraction'.")
+        self.eval_label = eval_label
+        self.policy = policy
+        self.expected = expected_samples
+        self.dwell_samples = dwell_samples
+        self.dwell_fraction = dwell_fraction
+        self.counts = {}
+        self.n = 0
+        self.matches = 0
+        self.run = 0
+        self.longest_run = 0
+        self.decision = None
+
+    def _remaining(self):
+        return None if self.expected is None else max(0, self.expected - self.n)
+
+    def update(self, label):
+        """
+        Add one label. Returns True/False once the outcome is decided, else None.
+        """
+        self.n += 1
+        self.counts[label] = self.counts.get(label, 0) + 1
+        if label == self.eval_label:
+            self.matches += 1
+            self.run += 1
+            self.longest_run = max(self.longest_run, self.run)
+        else:
+            self.run = 0
+        if self.decision is None:
+            self.decision = self._decide()
+        return self.decision
+
+    def _decide(self):
+        remaining = self._remaining()
+        if self.policy == "first_match":
+            return True if self.matches else None
+        if self.policy == "fail_fast":
+            return False if self.matches < self.n else None
+        if self.policy == "majority":
+            if self.expected is None:
+                return None
+            if self.matches > self.expected / 2:
+                return True
+            if self.matches + remaining <= self.expected / 2:
+                return False
+            return None
+        if self.policy == "dwell":
+            if self.dwell_samples:
+                if self.longest_run >= self.dwell_samples:
+                    return True
+                if remaining is not None and self.run + remaining < self.dwell_samples:
+                    return False
+                return None
+            if self.expected is None:
+                return None
+            needed = math.ceil(self.dwell_fraction * self.expected)
+            if self.matches >= needed:
+                return True
+            if self.matches + remaining < needed:
+                return False
+        return None
+
+    def result(self):
+        """
+        Final outcome over the samples seen.
+        """
+        if self.eval_label is None:
+            return None
+        if self.decision is not None:
+            return self.decision
+        if self.policy in ("any", "first_match"):
+            return self.matches > 0
+        if self.policy == "fail_fast":
+            return self.n > 0 and self.matches == self.n
+        if self.policy == "majority":
+            return self.matches > self.n / 2
+        if self.dwell_samples:
+            return self.longest_run >= self.dwell_samples
+        return self.n > 0 and self.matches >= self.dwell_fraction * self.n
+
+    def early_exit(self):
+        """
+        True if sampling can stop now.
+        """
+        return self.eval_label is not None and self.policy != "any" and self.decision is not None
+
+    def summary(self):
+        return {
+            "policy": self.policy,
+            "samples": self.n,
+            "matches": self.matches,
+            "longest_run": self.longest_run,
+            "label_counts": self.counts
+        }
+
+
+def expected_samples(duration, interval):
+    return max(1, math.ceil(duration / interval))
@@ -0,0 +1,175 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "pyfuzzyflow_"
+STEP_STATES = ("running", "passed", "failed", "skipped")
+
+# family -> (type, help)
+FAMILIES = {
+    "pipeline": ("info", "Pipeline being run"),
+    "metric_value": ("gauge", "Last sampled metric value"),
+    "membership": ("gauge", "Fuzzy membership degree of the last sample per label"),
+    "threshold": ("gauge", "Current adaptive threshold"),
+    "current_label": ("gauge", "1 for the label of the last sample, 0 for the others"),
+    "samples": ("counter", "Samples taken"),
+    "step_state": ("stateset", "Step state"),
+    "step_duration_seconds": ("gauge", "Duration of the last run of the step"),
+    "step_runs": ("counter", "Completed runs of the step"),
+    "pipeline_passed": ("gauge", "1 if the last pipeline evaluation passed, 0 if it failed"),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _step_labels(step, index):
+    labels = (("step", step),)
+    return labels if index is None else labels + (("step_index", str(index)),)
+
+
+def _format_value(value):
+    if value is None or value != value:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """
+        In-memory registry of the latest values, one entry per series.
+
+        Gauges are plain dict assignments (atomic under the GIL), so the sampling
+        loops never take a lock for them; counters are incremented under a lock.
+        Step series carry a step_index label next to the description, so steps with
+        the same description do not overwrite each other. A scrape copies the items
+        in one C-level call and renders them, so its cost depends on the number of
+        series (steps x labels), not on how long the run has been going.
+        """
+        self._series = {}
+        self._inc_lock = threading.Lock()
+
+    def set(self, family, labels, value):
+        """
+        :param family: Family name from FAMILIES (without prefix).
+        :param labels: Tuple of (name, value) label pairs.
+        :param value: Sample value.
+        """
+        self._series[(family, labels)] = value
+
+    def inc(self, family, labels, amount=1):
+        with self._inc_lock:
+            self._series[(family, labels)] = self._series.get((family, labels), 0) + amount
+
+    def set_info(self, **labels):
+        self.set("pipeline", tuple(sorted(labels.items())), 1)
+
+    def observe_fuzzy(self, step, metric, value, label, label_names, memberships, thresholds=None, inputs=None, index=None):
+        """
+        Record one fuzzy sample: value, memberships, current label, thresholds and input values.
+
+        :param index: Step number, added as the step_index label (optional).
+        """
+        step = _step_labels(step, index)
+        self.set("metric_value", (("metric", metric),) + step, value if isinstance(value, (int, float)) else None)
+        for name, degree in zip(label_names, memberships):
+            self.set("membership", (("label", name),) + step, float(degree))
+            self.set("current_label", (("label", name),) + step, 1 if name == label else 0)
+        if thresholds is not None:
+            for i, threshold in enumerate(thresholds):
+                self.set("threshold", (("index", str(i)),) + step, float(threshold))
+        for name, v in (inputs or {}).items():
+            self.set("metric_value", (("metric", name),) + step, v if isinstance(v, (int, float)) else None)
+        self.inc("samples", step)
+
+    def step_state(self, step, state, duration=None, index=None):
+        step = _step_labels(step, index)
+        for s in STEP_STATES:
+            self.set("step_state", step + ((PREFIX + "step_state", s),), 1 if s == state else 0)
+        if duration is not None:
+            self.set("step_duration_seconds", step, duration)
+            self.inc("step_runs", step)
+
+    def render(self):
+        """
+        Render all series in OpenMetrics text format.
+        """
+        items = list(self._series.items())
+        by_family = {}
+        for (family, labels), value in items:
+            by_family.setdefault(family, []).append((labels, value))
+        lines = []
+        for family in FAMILIES:
+            series = by_family.get(family)
+            if not series:
+                continue
+            typ, help_text = FAMILIES[family]
+            name = PREFIX + family
+            lines.append(f"# TYPE {name} {typ}")
+            lines.append(f"# HELP {name} {help_text}")
+            suffix = {"counter": "_total", "info": "_info"}.get(typ, "")
+            for labels, value in sorted(series, key=lambda s: s[0]):
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{name}{suffix} {_format_value(value)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    def __init__(self, registry, host="127.0.0.1", port=9464):
+        """
+        Serves the registry at http://<host>:<port>/metrics on a daemon thread.
+
+        :param registry: MetricsRegistry to expose.
+        :param host: Bind address (localhost by default).
+        :param port: TCP port, 0 picks a free one (see .port after start()).
+        """
+        self.registry = registry
+        handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsExporter", daemon=True)
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, linger=0.0):
+        """
+        Shut the server down, optionally after serving for `linger` more seconds
+        (so a final scrape can pick up the end-of-run values).
+        """
+        if linger:
+            time.sleep(linger)
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,5 +1,10 @@
+import os
+
 import numpy as np
-import skfuzzy as fuzz
+
+from modules.membership import MembershipEngine
+from modules.neuro_fuzzy import AnfisModel, load_training_samples, model_path
+from modules.streaming import RingBuffer, SlidingQuantiles
 
 class FuzzyValidator:
     def __init__(
@@ -10,75 +15,259 @@ class FuzzyValidator:
         history_size,
         update_every,
         label_names,
-        mode="classic"
+        mode="classic",
+        shape="trapezoid",
+        domain=(0, 100),
+        lut_resolution=None,
+        nf_model_path=None,
+        nf_rules=5,
+        nf_train_logs=None,
+        nf_metric=None,
+        nf_online=True
     ):
         """
         Initialize the FuzzyValidator.
 
         :param metric_func: Function that returns the metric value to classify.
         :param thresholds: List/array with main thresholds (will be updated dynamically).
-        :param min_thresholds: Minimum thresholds (lower bound for dynamic updates).
+        :param min_thresholds: Minimum thresholds (lower bound for dynamic updates), or None for no bound.
         :param history_size: Number of samples to keep for threshold updates.
         :param update_every: How often to update thresholds, in number of samples.
         :param label_names: List of string labels, e.g. ["LOW", "MED", "HIGH"].
         :param mode: "classic" for rule-based fuzzy, "neuro-fuzzy" for neuro-fuzzy (experimental).
+        :param shape: Membership function shape: "trapezoid", "triangle" or "gaussian".
+        :param domain: (low, high) bounds of the metric.
+        :param lut_resolution: Optional step of the precomputed membership lookup table.
+        :param nf_model_path: Neuro-fuzzy only. Saved ANFIS model (.npz) to load if it exists.
+        :param nf_rules: Neuro-fuzzy only. Number of ANFIS rules for a new model.
+        :param nf_train_logs: Neuro-fuzzy only. Run logs to train a new model from.
+        :param nf_metric: Neuro-fuzzy only. Metric name used to filter samples in nf_train_logs.
+        :param nf_online: Neuro-fuzzy only. Refit the model from history on every threshold update.
         """
         self.mode = mode
         self.metric_func = metric_func
         self.thresholds = np.array(thresholds)
+        if min_thresholds is None:
+            min_thresholds = np.full(len(self.thresholds), -np.inf)
         self.min_thresholds = np.array(min_thresholds)
+        if len(self.min_thresholds) != len(self.thresholds):
+            raise ValueError("'min_thresholds' must have the same length as 'thresholds'.")
         self.history_size = history_size
         self.update_every = update_every
         self.label_names = label_names
-        self.history = []
+        self.history = RingBuffer(history_size)
+        self.quantiles = SlidingQuantiles(history_size)
         self.iter = 0
+        if len(self.label_names) == 3:
+            self.percentiles = [30, 60, 85]
+        else:
+            self.percentiles = list(np.linspace(0, 100, len(self.label_names) + 2)[1:-1])
+        self.engine = MembershipEngine(
+            self.thresholds,
+            n_labels=len(self.label_names),
+            shape=shape,
+            domain=domain,
+            lut_resolution=lut_resolution
+        )
 
+        self.nf_model = None
         if self.mode == "neuro-fuzzy":
-            # Placeholder for future neuro-fuzzy model (e.g. ANFIS)
-            # You could load or initialize your neural model here
-            self.nf_model = None
+            self.nf_online = nf_online
+            if nf_model_path and os.path.exists(model_path(nf_model_path)):
+                self.nf_model = AnfisModel.load(nf_model_path)
+                if self.nf_model.n_outputs != len(self.label_names):
+                    print(f"[WARNING] Neuro-fuzzy model '{nf_model_path}' has {self.nf_model.n_outputs} outputs, expected {len(self.label_names)}. Ignoring it.")
+                    self.nf_model = None
+            if self.nf_model is None:
+                self.nf_model = AnfisModel(n_rules=nf_rules, n_outputs=len(self.label_names))
+                if nf_train_logs:
+                    # Log samples are fitted once here; online updates only use the history window
+                    log_x, log_t = load_training_samples(nf_train_logs, self.label_names, metric=nf_metric)
+                    if len(log_x):
+                        self.nf_model.fit(log_x, log_t)
+
+    @classmethod
+    def from_step(cls, step, metric_func, mode=None):
+        """
+        Build a validator from a fuzzy step definition (testcase JSON).
+
+        :param step: Step dict.
+        :param metric_func: Callable returning the metric value.
+        :param mode: Fuzzy mode; defaults to step["mode"] or is inferred from the step type.
+        """
+        if mode is None:
+            mode = step.get("mode") or ("neuro-fuzzy" if step.get("type") == "neuro_fuzzy" else "classic")
+        label_names = step.get("label_names", ["LOW", "MED", "HIGH"])
+        default_min = [10, 30, 70] if len(label_names) == 3 else None
+        return cls(
+            metric_func=metric_func,
+            thresholds=step.get("thresholds", [10, 30, 70]),
+            min_thresholds=step.get("min_thresholds", default_min),
+            history_size=step.get("history_size", 10),
+            update_every=step.get("update_every", 2),
+            label_names=label_names,
+            mode=mode,
+            shape=step.get("membership_shape", "trapezoid"),
+            domain=step.get("domain", [0, 100]),
+            lut_resolution=step.get("lut_resolution"),
+            nf_model_path=step.get("nf_model"),
+            nf_rules=step.get("nf_rules", 5),
+            nf_train_logs=step.get("nf_train_logs"),
+            nf_metric=step.get("metric_func"),
+            nf_online=step.get("nf_online", True)
+        )
+
+    def get_state(self):
+        """
+        Adaptive state (thresholds, history, sample counter) as a JSON-serializable dict.
+        """
+        return {
+            "thresholds": self.thresholds.tolist(),
+            "history": self.history.to_array().tolist(),
+            "iter": self.iter
+        }
+
+    def set_state(self, state):
+        """
+        Restore a state saved with get_state() into a freshly created validator.
+        Extra history beyond history_size is dropped (oldest first).
+        """
+        thresholds = np.array(state["thresholds"], dtype=float)
+        if len(thresholds) != len(self.thresholds):
+            raise ValueError("Saved thresholds do not match the number of labels.")
+        self.history.clear()
+        self.quantiles = SlidingQuantiles(self.history_size)
+        history = [v for v in state.get("history", []) if v is not None and np.isfinite(v)]
+        for value in history[-self.history_size:]:
+            evicted = self.history.append(value)
+            self.quantiles.update(value, evicted)
+        self.iter = int(state.get("iter", len(self.history)))
+        self.thresholds = thresholds
+        self.engine.set_thresholds(self.thresholds)
 
     def update_thresholds(self):
         """
-        Dynamically update thresholds using percentiles of the history.
+        Dynamically update thresholds using percentiles of the history,
+        read from the incrementally maintained sorted window.
+        Membership parameters (and lookup table) are only rebuilt if the thresholds actually changed.
+        The previous thresholds are kept if the window has no finite values.
+        """
+        if not len(self.quantiles):
+            return
+        percentiles = self.quantiles.percentiles(self.percentiles)
+        new_thresholds = np.maximum(percentiles, self.min_thresholds)
+        if not np.isfinite(new_thresholds).all():
+            return
+        if not np.array_equal(new_thresholds, self.thresholds):
+            self.thresholds = new_thresholds
+            self.engine.set_thresholds(self.thresholds)
+
+    def classify_batch(self, values):
+        """
+        Fuzzy membership for many samples in one vectorized pass.
+
+        :param values: 1-D array-like of metric values.
+        :return: (label_indices, memberships) where label_indices has shape (N,)
+                 and memberships has shape (N, k), one column per label.
         """
-        percentiles = np.percentile(self.history, [30, 60, 85])
-        self.thresholds = np.maximum(percentiles, self.min_thresholds)
+        memberships = self.engine.evaluate(values)
+        return np.argmax(memberships, axis=1), memberships
 
     def classify(self, value):
         """
-        Classic fuzzy logic membership using trapezoidal functions.
-        """
-        low, med, high = np.sort(self.thresholds)
-        arr = np.array([value])
-        # Trapezoidal membership parameters for each class
-        a1, b1 = 0, 0
-        c1, d1 = low * 0.8, low
-        a2, b2 = low * 0.8, low
-        c2, d2 = med, high * 0.8
-        a3, b3 = med, high * 0.8
-        c3, d3 = 100, 100
-        low_pts = sorted([a1, b1, c1, d1])
-        med_pts = sorted([a2, b2, c2, d2])
-        high_pts = sorted([a3, b3, c3, d3])
-        # Membership degrees
-        low_val = fuzz.trapmf(arr, low_pts)[0]
-        med_val = fuzz.trapmf(arr, med_pts)[0]
-        high_val = fuzz.trapmf(arr, high_pts)[0]
-        vals = [low_val, med_val, high_val]
-        idx = np.argmax(vals)
-        return self.label_names[idx], vals
+        Classic fuzzy logic membership for a single value.
+        """
+        idx, memberships = self.classify_batch([value])
+        return self.label_names[idx[0]], list(memberships[0])
+
+    def train_neuro_fuzzy(self, epochs=10, prior=0.5):
+        """
+        Update the ANFIS model from the current history window (targets are the classic
+        memberships under the current adaptive thresholds).
+
+        An untrained model is fitted from scratch. A trained one (from the training logs,
+        a saved model or earlier windows) keeps its premise and only re-solves its
+        consequents on the window, pulled toward their current values, so the cost of an
+        update depends on history_size only and earlier training is not discarded.
+
+        :param epochs: Hybrid passes of the first fit.
+        :param prior: Weight of the current consequents, per history sample.
+        """
+        x = self.history.to_array()
+        x = x[x != -1]
+        if not len(x):
+            return
+        t = self.classify_batch(x)[1]
+        if self.nf_model.trained:
+            self.nf_model.fit(x, t, epochs=0, prior=prior * len(x))
+        else:
+            self.nf_model.fit(x, t, epochs=epochs)
+
+    def save_neuro_fuzzy_model(self, path):
+        """
+        Persist the trained ANFIS model so later runs can load it instead of retraining.
+        """
+        if self.nf_model is not None and self.nf_model.trained:
+            self.nf_model.save(path)
+
+    def classify_neuro_fuzzy_batch(self, values):
+        """
+        Batched neuro-fuzzy inference. Falls back to classic memberships until the model is trained.
+
+        :return: (label_indices, memberships), same shapes as classify_batch.
+        """
+        if not self.nf_model.trained:
+            return self.classify_batch(values)
+        memberships = self.nf_model.forward(values)
+        return np.argmax(memberships, axis=1), memberships
 
     def classify_neuro_fuzzy(self, value):
         """
-        Neuro-fuzzy membership.
-        Here, as a placeholder, output is randomized to simulate a neural network softmax output.
-        Replace with real neuro-fuzzy model inference when available.
+        Neuro-fuzzy membership for a single value using the ANFIS model.
+        """
+        idx, memberships = self.classify_neuro_fuzzy_batch([value])
+        return self.label_names[idx[0]], list(memberships[0])
+
+    def replay(self, values):
+        """
+        Feed recorded samples through the validator without calling metric_func.
+
+        Produces the same labels as calling validate() once per value, but since
+        thresholds only change every `update_every` samples, each run of samples
+        between two updates is classified in a single batch.
+
+        :param values: 1-D array-like of recorded metric values.
+        :return: (label_indices, memberships), same shapes as classify_batch.
         """
-        import numpy as np
-        vals = np.random.dirichlet(np.ones(len(self.label_names)), size=1)[0]
-        idx = np.argmax(vals)
-        return self.label_names[idx], vals
+        values = np.asarray(values, dtype=float).ravel()
+        n = len(values)
+        labels = np.empty(n, dtype=int)
+        memberships = np.empty((n, len(self.label_names)))
+        if self.mode == "classic":
+            classify_batch = self.classify_batch
+        elif self.mode == "neuro-fuzzy":
+            classify_batch = self.classify_neuro_fuzzy_batch
+        else:
+            raise ValueError(f"Unknown fuzzy mode: {self.mode}")
+        start = 0
+        for i in range(n):
+            value = values[i]
+            if not np.isfinite(value):
+                # Like observe(): classified with the current thresholds, not added to the history
+                continue
+            evicted = self.history.append(value)
+            self.quantiles.update(value, evicted)
+            self.iter += 1
+            if self.iter % self.update_every == 0 and len(self.history) >= self.update_every:
+                if i > start:
+                    labels[start:i], memberships[start:i] = classify_batch(values[start:i])
+                start = i
+                self.update_thresholds()
+                if self.mode == "neuro-fuzzy" and self.nf_online:
+                    self.train_neuro_fuzzy()
+        if n > start:
+            labels[start:], memberships[start:] = classify_batch(values[start:])
+        return labels, memberships
 
     def validate(self):
         """
@@ -86,18 +275,27 @@ class FuzzyValidator:
         and classify using the selected mode.
         Returns: (value, label, membership_values)
         """
-        value = self.metric_func()
-        self.history.append(value)
-        if len(self.history) > self.history_size:
-            self.history.pop(0)
-        self.iter += 1
-        if self.iter % self.update_every == 0 and len(self.history) >= self.update_every:
-            self.update_thresholds()
+        return self.observe(self.metric_func())
+
+    def observe(self, value):
+        """
+        validate() for a value that was already read: update history/thresholds and classify.
+        Non-finite values (e.g. NaN from a failed read) are classified but not added to the
+        history, so they do not affect the adaptive thresholds.
+        Returns: (value, label, membership_values)
+        """
+        if np.isfinite(value):
+            evicted = self.history.append(value)
+            self.quantiles.update(value, evicted)
+            self.iter += 1
+            if self.iter % self.update_every == 0 and len(self.history) >= self.update_every:
+                self.update_thresholds()
+                if self.mode == "neuro-fuzzy" and self.nf_online:
+                    self.train_neuro_fuzzy()
 
         if self.mode == "classic":
             label, vals = self.classify(value)
         elif self.mode == "neuro-fuzzy":
-            print("[INFO] Neuro-fuzzy inference (experimental, random output)")
             label, vals = self.classify_neuro_fuzzy(value)
         else:
             raise ValueError(f"Unknown fuzzy mode: {self.mode}")
@@ -1,20 +1,214 @@
 import os
 import json
+import queue
+import struct
+import atexit
+import threading
+import time
+import weakref
 from datetime import datetime
 
+LOG_FORMATS = {
+    "text": ".log",      # "timestamp | json" lines (legacy)
+    "jsonl": ".jsonl",   # one JSON object per line, timestamp in the "timestamp" field
+    "binary": ".bin",    # 4-byte big-endian length prefix + UTF-8 JSON object
+}
+
+_open_loggers = weakref.WeakSet()
+_STOP = object()
+
+
 class ExecutionLogger:
-    def __init__(self, log_dir="logs", run_id=None):
+    def __init__(self, log_dir="logs", run_id=None, fmt="text", flush_records=256, flush_bytes=1 << 16, flush_ms=500, background=True,
+                 max_bytes=None, max_age_s=None, backup_count=None):
+        """
+        Run logger with an optional queue-backed background writer.
+
+        Records are serialized and written by a writer thread and flushed in batches,
+        whichever limit is reached first: flush_records records, flush_bytes bytes or
+        flush_ms milliseconds since the last flush. close() (or interpreter exit) drains
+        the queue; records logged after it are dropped with a warning. Records must not
+        be mutated after being passed to log().
+
+        :param log_dir: Base log directory.
+        :param run_id: Run identifier (defaults to the current timestamp).
+        :param fmt: Sink format: "text", "jsonl" or "binary".
+        :param flush_records: Flush after this many records.
+        :param flush_bytes: Flush after this many bytes.
+        :param flush_ms: Flush at least this often, in milliseconds.
+        :param background: Use the writer thread; if False every record is written and flushed inline.
+        :param max_bytes: Rotate the log file once it reaches this size (optional).
+        :param max_age_s: Rotate the log file once it is this many seconds old (optional).
+        :param backup_count: Number of rotated files to keep, oldest are deleted (default: keep all).
+                             Rotated files are named run_<id>.<n><ext>, so they sort before the live file.
+        """
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f"Unknown log format: {fmt}. Use one of {', '.join(LOG_FORMATS)}.")
         now = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.run_id = run_id or now
+        self.fmt = fmt
         self.base_dir = os.path.join(log_dir, f"run_{self.run_id}")
         os.makedirs(self.base_dir, exist_ok=True)
-        self.log_file = os.path.join(self.base_dir, f"run_{self.run_id}.log")
-        self.f = open(self.log_file, 'a')
+        self.log_file = os.path.join(self.base_dir, f"run_{self.run_id}{LOG_FORMATS[fmt]}")
+        self.f = open(self.log_file, 'ab')
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.backup_count = backup_count
+        self.rotations = 0
+        self._size = self.f.tell()
+        self._opened = time.monotonic()
+        self.flush_records = flush_records
+        self.flush_bytes = flush_bytes
+        self.flush_ms = flush_ms
+        self._lock = threading.Lock()
+        self._closed = False
+        self.dropped = 0
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._writer, name="ExecutionLogger", daemon=True)
+            self._thread.start()
+        _open_loggers.add(self)
 
-    def log(self, data):
-        line = f"{datetime.now().isoformat()} | {json.dumps(data, default=str)}"
-        self.f.write(line + '\n')
+    def _encode(self, timestamp, data):
+        if self.fmt == "text":
+            return f"{timestamp} | {json.dumps(data, default=str)}\n".encode()
+        if self.fmt == "jsonl":
+            return (json.dumps({"timestamp": timestamp, **data}, default=str) + "\n").encode()
+        payload = json.dumps({"timestamp": timestamp, **data}, default=str).encode()
+        return struct.pack(">I", len(payload)) + payload
+
+    def _writer(self):
+        pending_records = 0
+        pending_bytes = 0
+        last_flush = time.monotonic()
+        timeout = self.flush_ms / 1000.0
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, timeout - (time.monotonic() - last_flush)) if pending_records else None)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                chunk = self._encode(*item)
+                if self._write(chunk):
+                    pending_records = pending_bytes = 0
+                    last_flush = time.monotonic()
+                pending_records += 1
+                pending_bytes += len(chunk)
+            if pending_records and (
+                pending_records >= self.flush_records
+                or pending_bytes >= self.flush_bytes
+                or (time.monotonic() - last_flush) * 1000 >= self.flush_ms
+            ):
+                self.f.flush()
+                pending_records = pending_bytes = 0
+                last_flush = time.monotonic()
         self.f.flush()
 
+    def _write(self, chunk):
+        """
+        Write one encoded record, rotating the file first if a limit is reached.
+        Returns True if the file was rotated (and therefore flushed).
+        """
+        rotated = False
+        if self._size and (
+            (self.max_bytes and self._size + len(chunk) > self.max_bytes)
+            or (self.max_age_s and time.monotonic() - self._opened >= self.max_age_s)
+        ):
+            self._rotate()
+            rotated = True
+        self.f.write(chunk)
+        self._size += len(chunk)
+        return rotated
+
+    def _rotate(self):
+        self.f.close()
+        self.rotations += 1
+        stem, ext = os.path.splitext(self.log_file)
+        existing = sorted(
+            int(name[len(os.path.basename(stem)) + 1:-len(ext)])
+            for name in os.listdir(self.base_dir)
+            if name.startswith(os.path.basename(stem) + ".") and name.endswith(ext)
+            and name[len(os.path.basename(stem)) + 1:-len(ext)].isdigit()
+        )
+        seq = (existing[-1] + 1) if existing else 1
+        os.replace(self.log_file, f"{stem}.{seq:06d}{ext}")
+        if self.backup_count is not None:
+            backups = existing + [seq]
+            for old in backups[:max(0, len(backups) - self.backup_count)]:
+                try:
+                    os.remove(f"{stem}.{old:06d}{ext}")
+                except FileNotFoundError:
+                    pass
+        self.f = open(self.log_file, 'ab')
+        self._size = 0
+        self._opened = time.monotonic()
+
+    def log(self, data):
+        """
+        Queue (or write) one record. Records logged after close() are dropped and
+        counted in `dropped`, with a warning on the first one.
+        """
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            if self._closed:
+                self.dropped += 1
+                if self.dropped == 1:
+                    print(f"[WARNING] Logger of run {self.run_id} is closed. Records logged after close() are dropped.")
+                return
+            if self._queue is not None:
+                self._queue.put((timestamp, data))
+                return
+            self._write(self._encode(timestamp, data))
+            self.f.flush()
+
     def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
         self.f.close()
+
+
+@atexit.register
+def _drain_open_loggers():
+    for logger in list(_open_loggers):
+        logger.close()
+
+
+def read_log_records(path):
+    """
+    Yield (timestamp, record) for every record of a run log, whatever its format
+    (detected from the file extension).
+    """
+    if path.endswith(LOG_FORMATS["binary"]):
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(4)
+                if len(header) < 4:
+                    return
+                (size,) = struct.unpack(">I", header)
+                payload = f.read(size)
+                if len(payload) < size:
+                    return
+                rec = json.loads(payload)
+                yield rec.pop("timestamp", None), rec
+    elif path.endswith(LOG_FORMATS["jsonl"]):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    rec = json.loads(line)
+                    yield rec.pop("timestamp", None), rec
+    else:
+        with open(path) as f:
+            for line in f:
+                if "{" not in line:
+                    continue
+                timestamp, _, payload = line.partition(" | ")
+                yield timestamp, json.loads(payload)
@@ -0,0 +1,134 @@
+import numpy as np
+import skfuzzy as fuzz
+
+SHAPES = ("trapezoid", "triangle", "gaussian")
+
+
+class MembershipEngine:
+    def __init__(self, thresholds, n_labels, shape="trapezoid", domain=(0, 100), lut_resolution=None, sigma=None):
+        """
+        Generic N-label membership engine.
+
+        One membership function is built per label, anchored on the sorted thresholds
+        (one threshold per label). The first and last labels act as shoulders so the
+        whole domain is covered.
+
+        :param thresholds: One threshold per label, used as anchors for the functions.
+        :param n_labels: Number of labels (must match len(thresholds)).
+        :param shape: "trapezoid", "triangle" or "gaussian".
+        :param domain: (low, high) bounds of the metric, e.g. (0, 100) for percentages.
+        :param lut_resolution: If set, memberships inside the domain are read from a
+                               precomputed table with this step instead of evaluated.
+        :param sigma: Fixed gaussian width. Derived from threshold spacing when None.
+        """
+        if shape not in SHAPES:
+            raise ValueError(f"Unknown membership shape: {shape}. Use one of {', '.join(SHAPES)}.")
+        if n_labels < 1:
+            raise ValueError("At least one label is required.")
+        if lut_resolution is not None and lut_resolution <= 0:
+            raise ValueError("'lut_resolution' must be positive.")
+        self.shape = shape
+        self.n_labels = n_labels
+        self.domain = (float(domain[0]), float(domain[1]))
+        self.lut_resolution = lut_resolution
+        self.sigma = sigma
+        self.params = None
+        self._lut = None
+        self.set_thresholds(thresholds)
+
+    def set_thresholds(self, thresholds):
+        """
+        Rebuild the membership parameters and invalidate the lookup table.
+        """
+        anchors = np.sort(np.asarray(thresholds, dtype=float))
+        if len(anchors) != self.n_labels:
+            raise ValueError(f"Expected {self.n_labels} thresholds (one per label), got {len(anchors)}.")
+        if not np.isfinite(anchors).all():
+            raise ValueError(f"Thresholds must be finite, got {anchors.tolist()}.")
+        if self.shape == "trapezoid":
+            self.params = self._trapezoid_params(anchors)
+        elif self.shape == "triangle":
+            self.params = self._triangle_params(anchors)
+        else:
+            self.params = self._gaussian_params(anchors)
+        self._lut = None
+
+    def _trapezoid_params(self, t):
+        lo, hi = self.domain
+        k = self.n_labels
+        if k == 1:
+            return [np.array([lo, lo, hi, hi])]
+        params = [np.sort([lo, lo, t[0] * 0.8, t[0]])]
+        for i in range(1, k - 1):
+            params.append(np.sort([t[i - 1] * 0.8, t[i - 1], t[i], t[i + 1] * 0.8]))
+        params.append(np.sort([t[k - 2], t[k - 1] * 0.8, hi, hi]))
+        return params
+
+    def _triangle_params(self, t):
+        lo, hi = self.domain
+        centers = np.concatenate(([lo], t, [hi]))
+        return [np.sort(centers[i:i + 3]) for i in range(self.n_labels)]
+
+    def _gaussian_params(self, t):
+        if self.sigma is not None:
+            return [(c, float(self.sigma)) for c in t]
+        gaps = np.diff(t)
+        params = []
+        for i, c in enumerate(t):
+            neighbours = [g for g in (gaps[i - 1] if i > 0 else None, gaps[i] if i < len(gaps) else None) if g]
+            width = min(neighbours) / 2 if neighbours else (self.domain[1] - self.domain[0]) / 4
+            params.append((c, max(width, 1e-9)))
+        return params
+
+    def _evaluate(self, arr):
+        """
+        Evaluate all membership functions on a 1-D array. Returns an (N, k) matrix.
+        """
+        if self.shape == "trapezoid":
+            cols = [fuzz.trapmf(arr, pts) for pts in self.params]
+        elif self.shape == "triangle":
+            cols = [fuzz.trimf(arr, pts) for pts in self.params]
+        else:
+            cols = [fuzz.gaussmf(arr, mean, sigma) for mean, sigma in self.params]
+        memberships = np.column_stack(cols)
+        if self.shape != "trapezoid" and self.n_labels > 1:
+            # Shoulders: first/last labels stay at full membership beyond their anchor
+            first, last = self._anchor(0), self._anchor(self.n_labels - 1)
+            memberships[arr <= first, 0] = 1.0
+            memberships[arr >= last, -1] = 1.0
+        # NaN (e.g. a failed metric read) belongs to no label
+        memberships[np.isnan(arr)] = 0.0
+        return memberships
+
+    def _anchor(self, i):
+        if self.shape == "gaussian":
+            return self.params[i][0]
+        return self.params[i][1]
+
+    def _build_lut(self):
+        lo, hi = self.domain
+        n = int(round((hi - lo) / self.lut_resolution)) + 1
+        grid = lo + np.arange(n) * self.lut_resolution
+        self._lut = self._evaluate(grid)
+
+    def evaluate(self, values):
+        """
+        Membership degrees for many samples. Values outside the domain (including
+        +/-inf) are evaluated analytically; NaN gets zero membership in every label.
+
+        :param values: 1-D array-like of metric values.
+        :return: (N, k) membership matrix, one column per label.
+        """
+        arr = np.asarray(values, dtype=float).ravel()
+        if self.lut_resolution is None:
+            return self._evaluate(arr)
+        if self._lut is None:
+            self._build_lut()
+        lo, hi = self.domain
+        inside = (arr >= lo) & (arr <= hi)  # False for NaN
+        idx = np.rint((np.where(inside, arr, lo) - lo) / self.lut_resolution)
+        idx = np.clip(idx, 0, len(self._lut) - 1).astype(np.intp)
+        memberships = self._lut[idx]
+        if not inside.all():
+            memberships[~inside] = self._evaluate(arr[~inside])
+        return memberships
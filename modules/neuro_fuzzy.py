@@ -0,0 +1,182 @@
+import os
+
+import numpy as np
+
+from modules.logger import read_log_records
+
+
+class AnfisModel:
+    def __init__(self, n_rules=5, n_outputs=3):
+        """
+        Single-input, first-order Sugeno ANFIS written with NumPy only.
+
+        Layer 1: one gaussian membership function per rule on the (normalized) input.
+        Layer 2-3: normalized firing strengths.
+        Layer 4-5: per-rule linear consequents, one column per output label.
+
+        :param n_rules: Number of gaussian membership functions / rules.
+        :param n_outputs: Number of outputs (one membership degree per label).
+        """
+        self.n_rules = n_rules
+        self.n_outputs = n_outputs
+        self.centers = np.linspace(-1.5, 1.5, n_rules)
+        self.sigmas = np.ones(n_rules)
+        self.theta = np.zeros((2 * n_rules, n_outputs))
+        self.x_mean = 0.0
+        self.x_std = 1.0
+        self.trained = False
+
+    def _normalize(self, values):
+        return (np.asarray(values, dtype=float).ravel() - self.x_mean) / self.x_std
+
+    def _firing(self, xn):
+        diff = xn[:, None] - self.centers[None, :]
+        w = np.exp(-(diff ** 2) / (2 * self.sigmas ** 2))
+        s = w.sum(axis=1, keepdims=True) + 1e-12
+        return diff, w, s, w / s
+
+    def _design(self, xn, wbar):
+        return np.hstack((wbar * xn[:, None], wbar))
+
+    def forward(self, values):
+        """
+        Batched inference.
+
+        :param values: 1-D array-like of metric values.
+        :return: (N, n_outputs) membership matrix clipped to [0, 1].
+        """
+        xn = self._normalize(values)
+        _, _, _, wbar = self._firing(xn)
+        return np.clip(self._design(xn, wbar) @ self.theta, 0.0, 1.0)
+
+    def fit(self, values, targets, epochs=20, lr=0.05, ridge=1e-6, prior=0.0):
+        """
+        Hybrid ANFIS training: consequents by ridge least squares, premise
+        (centers/sigmas) by gradient descent on the squared error.
+
+        A trained model is updated in place (warm start from its current parameters);
+        the normalization and initial premise are only derived from the first fit.
+
+        :param values: 1-D array-like of metric values.
+        :param targets: (N, n_outputs) target membership degrees.
+        :param epochs: Number of hybrid passes.
+        :param lr: Learning rate of the premise parameters.
+        :param ridge: L2 regularization of the least-squares step.
+        :param prior: Weight pulling the consequents toward their current values, so an
+                      incremental update on a small window does not discard earlier training.
+        """
+        x = np.asarray(values, dtype=float).ravel()
+        t = np.asarray(targets, dtype=float).reshape(len(x), self.n_outputs)
+        if len(x) == 0:
+            return self
+        if not self.trained:
+            self.x_mean = float(x.mean())
+            self.x_std = float(x.std()) or 1.0
+            xn = self._normalize(x)
+            self.centers = np.percentile(xn, np.linspace(0, 100, self.n_rules))
+            spacing = np.diff(self.centers).mean() if self.n_rules > 1 else 1.0
+            self.sigmas = np.full(self.n_rules, max(spacing, 0.1))
+        xn = self._normalize(x)
+        prior = prior if self.trained else 0.0
+        eye = (ridge + prior) * np.eye(2 * self.n_rules)
+        anchor = prior * self.theta
+        for _ in range(epochs):
+            diff, w, s, wbar = self._firing(xn)
+            phi = self._design(xn, wbar)
+            self.theta = np.linalg.solve(phi.T @ phi + eye, phi.T @ t + anchor)
+            err = (phi @ self.theta - t) / len(x)
+            # f[n, r, k]: output of rule r for label k
+            f = xn[:, None, None] * self.theta[None, :self.n_rules, :] + self.theta[None, self.n_rules:, :]
+            d_wbar = np.einsum("nk,nrk->nr", err, f)
+            d_w = (d_wbar - (d_wbar * wbar).sum(axis=1, keepdims=True)) / s
+            self.centers -= lr * (d_w * w * diff / self.sigmas ** 2).sum(axis=0)
+            self.sigmas -= lr * (d_w * w * diff ** 2 / self.sigmas ** 3).sum(axis=0)
+            self.sigmas = np.maximum(self.sigmas, 1e-3)
+        diff, w, s, wbar = self._firing(xn)
+        phi = self._design(xn, wbar)
+        self.theta = np.linalg.solve(phi.T @ phi + eye, phi.T @ t + anchor)
+        self.trained = True
+        return self
+
+    def save(self, path):
+        """
+        Save the model as a compressed .npz file (".npz" is appended to `path` if missing).
+        """
+        np.savez_compressed(
+            model_path(path),
+            centers=self.centers,
+            sigmas=self.sigmas,
+            theta=self.theta,
+            norm=np.array([self.x_mean, self.x_std])
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a model saved with save() (".npz" is appended to `path` if missing).
+        """
+        with np.load(model_path(path)) as data:
+            model = cls(n_rules=len(data["centers"]), n_outputs=data["theta"].shape[1])
+            model.centers = data["centers"]
+            model.sigmas = data["sigmas"]
+            model.theta = data["theta"]
+            model.x_mean, model.x_std = (float(v) for v in data["norm"])
+        model.trained = True
+        return model
+
+
+def model_path(path):
+    """
+    Model file name as written by np.savez_compressed, which appends ".npz" when missing.
+    """
+    return path if path.endswith(".npz") else path + ".npz"
+
+
+def _parse_membership(raw, n_outputs):
+    if isinstance(raw, str):
+        raw = raw.strip("[]").replace(",", " ").split()
+    try:
+        vals = np.array([float(v) for v in raw], dtype=float)
+    except (TypeError, ValueError):
+        return None
+    return vals if len(vals) == n_outputs else None
+
+
+def load_training_samples(log_paths, label_names, step=None, metric=None):
+    """
+    Collect (values, target memberships) from recorded run logs.
+
+    Fuzzy sample records carry "value", "label" and "fuzzy" fields. The logged
+    memberships are used as targets; if they cannot be parsed the label is one-hot encoded.
+
+    :param log_paths: Iterable of run log files.
+    :param label_names: Label names of the step being trained.
+    :param step: Only use samples from this step description (optional).
+    :param metric: Only use samples from this metric (optional).
+    :return: (values, targets) arrays.
+    """
+    values, targets = [], []
+    k = len(label_names)
+    for path in log_paths:
+        if not os.path.exists(path):
+            print(f"[WARNING] Training log '{path}' not found.")
+            continue
+        for _, rec in read_log_records(path):
+            if "value" not in rec or "label" not in rec:
+                continue
+            if step and rec.get("step") != step:
+                continue
+            if metric and rec.get("metric") != metric:
+                continue
+            if rec["value"] is None or rec["value"] == -1:
+                continue
+            target = _parse_membership(rec.get("fuzzy"), k)
+            if target is None:
+                if rec["label"] not in label_names:
+                    continue
+                target = np.eye(k)[label_names.index(rec["label"])]
+            values.append(float(rec["value"]))
+            targets.append(target)
+    if not values:
+        return np.empty(0), np.empty((0, k))
+    return np.array(values), np.vstack(targets)
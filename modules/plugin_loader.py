@@ -0,0 +1,261 @@
+import hashlib
+import importlib
+import json
+import os
+import threading
+
+from modules.system_metrics import default_cache_dir, _site_packages_key
+
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
+PLUGIN_PACKAGE = "modules.plugins"
+ENTRY_POINT_GROUP = "pyfuzzyflow.metrics"
+MANIFEST_VERSION = 1
+
+
+def default_config_dir():
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "pyfuzzyflow")
+
+
+def cli_metrics_path():
+    return os.path.join(default_config_dir(), "cli_metrics.json")
+
+
+def load_cli_metrics(path=None):
+    """
+    Persisted --add-metric registrations: dict name -> shell command.
+    """
+    try:
+        with open(path or cli_metrics_path()) as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def save_cli_metric(name, command, path=None):
+    path = path or cli_metrics_path()
+    metrics = load_cli_metrics(path)
+    metrics[name] = command
+    _write_json(path, metrics)
+    return path
+
+
+def remove_cli_metric(name, path=None):
+    """
+    Forget a persisted --add-metric registration. Returns False if it was not registered.
+    """
+    path = path or cli_metrics_path()
+    metrics = load_cli_metrics(path)
+    if name not in metrics:
+        return False
+    del metrics[name]
+    _write_json(path, metrics)
+    return True
+
+
+def scan_plugin_source(source, filename="<plugin>"):
+    """
+    Metric names of a provider module, read from its source without importing it.
+
+    A provider defines a top-level METRICS dict mapping metric names to zero-argument callables.
+
+    :return: List of names ([] if the module defines no METRICS), or None if METRICS is not a
+             dict literal with string keys or is changed by other top-level statements
+             (the module has to be imported to know).
+    """
+    import ast
+    tree = ast.parse(source, filename=filename)
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            targets, value = [], None
+        if any(isinstance(t, ast.Name) and t.id == "METRICS" for t in targets):
+            if not (isinstance(value, ast.Dict) and all(isinstance(k, ast.Constant) and isinstance(k.value, str)
+                                                        for k in value.keys)):
+                return None
+            names = [k.value for k in value.keys]
+            continue
+        # METRICS["x"] = ..., METRICS.update(...) and the like change the names at import time
+        for sub in ast.walk(node):
+            if isinstance(sub, ast.Subscript) and isinstance(sub.ctx, ast.Store) \
+                    and isinstance(sub.value, ast.Name) and sub.value.id == "METRICS":
+                return None
+            if isinstance(sub, ast.Attribute) and isinstance(sub.value, ast.Name) and sub.value.id == "METRICS":
+                return None
+    return names
+
+
+def _entry_points():
+    from importlib.metadata import entry_points
+    return {ep.name: ep.value for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+class PluginRegistry:
+    def __init__(self, plugin_dir=PLUGIN_DIR, package=PLUGIN_PACKAGE, cache_dir=None, cli_path=None,
+                 use_entry_points=True):
+        """
+        Metric providers outside SystemMetrics, resolved by name:
+          - persisted --add-metric shell commands
+          - modules in the plugins package that define METRICS = {"name": func, ...}
+          - installed packages exposing callables in the "pyfuzzyflow.metrics" entry point group
+            (entry point name = metric name)
+
+        Which names each provider offers is kept in a manifest under the cache directory.
+        A plugin file is re-scanned only when its mtime/size changed and its SHA-256 differs;
+        entry points are re-enumerated only when site-packages changed. Listing and
+        validating metric names therefore imports no provider; a provider is imported
+        on the first get() of one of its metrics.
+
+        :param plugin_dir: Directory of provider modules.
+        :param package: Import package of plugin_dir.
+        :param cache_dir: Manifest directory (default: the system info cache directory), False to disable.
+        :param cli_path: Persisted --add-metric registrations (default: cli_metrics.json in the config directory).
+        :param use_entry_points: Also discover entry points.
+        """
+        self.plugin_dir = plugin_dir
+        self.package = package
+        self.cli_path = cli_path
+        self.use_entry_points = use_entry_points
+        self.manifest_path = None
+        if cache_dir is not False:
+            key = hashlib.sha256(os.path.abspath(plugin_dir).encode()).hexdigest()[:12]
+            self.manifest_path = os.path.join(cache_dir or default_cache_dir(), f"plugin_manifest_{key}.json")
+        self._providers = None
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def providers(self):
+        """
+        Dict metric name -> (kind, target): ("cli", command), ("module", module name) or
+        ("entry_point", "module:attr"). The first provider of a name wins, in that order.
+        """
+        if self._providers is None:
+            self._providers = self._build()
+        return self._providers
+
+    def names(self):
+        return list(self.providers())
+
+    def refresh(self):
+        with self._lock:
+            self._providers = None
+            self._loaded.clear()
+
+    def _read_manifest(self):
+        if self.manifest_path is None:
+            return {}
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+    def _scan_plugins(self, known):
+        modules = {}
+        try:
+            files = sorted(f for f in os.listdir(self.plugin_dir) if f.endswith(".py") and not f.startswith("_"))
+        except OSError:
+            return modules
+        for fname in files:
+            path = os.path.join(self.plugin_dir, fname)
+            st = os.stat(path)
+            entry = known.get(fname)
+            if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                modules[fname] = entry
+                continue
+            with open(path, "rb") as f:
+                source = f.read()
+            digest = hashlib.sha256(source).hexdigest()
+            if entry and entry["sha256"] == digest:
+                metrics = entry["metrics"]
+            else:
+                module_name = f"{self.package}.{fname[:-3]}"
+                try:
+                    metrics = scan_plugin_source(source, filename=path)
+                    if metrics is None:
+                        metrics = [str(name) for name in importlib.import_module(module_name).METRICS]
+                except Exception as e:
+                    print(f"[WARNING] Metric plugin '{path}' could not be scanned: {e}")
+                    metrics = []
+            modules[fname] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest, "metrics": metrics}
+        return modules
+
+    def _scan_entry_points(self, known):
+        key = hashlib.sha256(_site_packages_key().encode()).hexdigest()[:16]
+        if known.get("key") == key:
+            return known
+        try:
+            metrics = _entry_points()
+        except Exception as e:
+            print(f"[WARNING] Metric entry points could not be read: {e}")
+            metrics = {}
+        return {"key": key, "metrics": metrics}
+
+    def _build(self):
+        manifest = self._read_manifest()
+        plugins = self._scan_plugins(manifest.get("plugins", {}))
+        entry_points = self._scan_entry_points(manifest.get("entry_points", {})) if self.use_entry_points else {}
+        updated = {"version": MANIFEST_VERSION, "plugins": plugins, "entry_points": entry_points}
+        if self.manifest_path is not None and updated != manifest:
+            try:
+                _write_json(self.manifest_path, updated)
+            except OSError:
+                pass
+
+        providers = {}
+        for name, command in load_cli_metrics(self.cli_path).items():
+            providers[name] = ("cli", command)
+        for fname, entry in plugins.items():
+            for name in entry["metrics"]:
+                if name in providers:
+                    print(f"[WARNING] Metric '{name}' of plugin '{fname}' is already provided ({providers[name][0]}: {providers[name][1]}). Ignored.")
+                    continue
+                providers[name] = ("module", f"{self.package}.{fname[:-3]}")
+        for name, value in entry_points.get("metrics", {}).items():
+            providers.setdefault(name, ("entry_point", value))
+        return providers
+
+    def get(self, name):
+        """
+        Metric function of a provider, importing/loading the provider on first use. None if unknown.
+        """
+        provider = self.providers().get(name)
+        if provider is None:
+            return None
+        with self._lock:
+            if name not in self._loaded:
+                kind, target = provider
+                if kind == "cli":
+                    from modules.utils import make_cli_metric
+                    func = make_cli_metric(name, target)
+                elif kind == "module":
+                    func = importlib.import_module(target).METRICS[name]
+                else:
+                    from importlib.metadata import EntryPoint
+                    func = EntryPoint(name=name, value=target, group=ENTRY_POINT_GROUP).load()
+                self._loaded[name] = func
+            return self._loaded[name]
+
+
+_REGISTRY = None
+
+
+def get_registry():
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = PluginRegistry()
+    return _REGISTRY
@@ -0,0 +1,29 @@
+"""
+Example metric provider.
+
+Every module in modules/plugins/ that defines a METRICS dict (metric name -> zero-argument
+callable returning a number) is a provider. Its metric names are read from the source and
+cached, so the module is only imported when a step uses one of them.
+"""
+import psutil
+
+
+def cpu_freq_mhz():
+    freq = psutil.cpu_freq()
+    return freq.current if freq else -1
+
+
+def logged_in_users():
+    return len(psutil.users())
+
+
+def open_fds():
+    proc = psutil.Process()
+    return proc.num_fds() if hasattr(proc, "num_fds") else proc.num_handles()
+
+
+METRICS = {
+    "cpu_freq_mhz": cpu_freq_mhz,
+    "logged_in_users": logged_in_users,
+    "open_fds": open_fds,
+}
@@ -0,0 +1,256 @@
+import glob
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from modules.evaluation import LabelAggregator
+from modules.fuzzy_validator import FuzzyValidator
+from modules.logger import read_log_records
+
+SWEEP_PARAMS = ("thresholds", "min_thresholds", "history_size", "update_every")
+
+
+def expand_log_paths(paths):
+    """
+    Expand globs and run directories (logs/run_<id>) into a sorted list of run log files.
+    """
+    result = []
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            if os.path.isdir(path):
+                result.extend(sorted(p for p in glob.glob(os.path.join(path, "*"))
+                                     if p.endswith((".log", ".jsonl", ".bin"))))
+            else:
+                result.append(path)
+    return result
+
+
+def load_recorded_samples(log_paths, steps=None):
+    """
+    Collect recorded fuzzy samples per step, in log order.
+
+    :param log_paths: Run log files, concatenated in the given order.
+    :param steps: Only keep samples of these step descriptions (optional).
+    :return: Dict step description -> {"metric", "values" (array), "labels" (list),
+             "runs" (number of samples per log, each log is replayed with a fresh validator)}.
+    """
+    recorded = {}
+    for path in log_paths:
+        if not os.path.exists(path):
+            print(f"[WARNING] Replay log '{path}' not found.")
+            continue
+        for entry in recorded.values():
+            entry["runs"].append(0)
+        for _, rec in read_log_records(path):
+            if "metric" not in rec or "value" not in rec or "label" not in rec:
+                continue
+            step = rec.get("step")
+            if steps is not None and step not in steps:
+                continue
+            if not isinstance(rec["value"], (int, float)):
+                continue
+            if step not in recorded:
+                recorded[step] = {"metric": rec["metric"], "values": [], "labels": [], "runs": [0]}
+            entry = recorded[step]
+            entry["runs"][-1] += 1
+            entry["values"].append(float(rec["value"]))
+            entry["labels"].append(rec["label"])
+    for entry in recorded.values():
+        entry["values"] = np.array(entry["values"])
+        entry["runs"] = [n for n in entry["runs"] if n]
+    return recorded
+
+
+def replay_step(step, values, overrides=None, runs=None):
+    """
+    Re-score recorded values with a step's validator configuration.
+
+    :param step: Fuzzy step dict from the testcase.
+    :param values: Recorded metric values.
+    :param overrides: Step keys to replace, e.g. {"history_size": 50}.
+    :param runs: Samples per recorded run; each run starts from a fresh validator,
+                 like the live pipeline. Default: one run.
+    :return: (label_names, label_indices, memberships).
+    """
+    config = dict(step, **(overrides or {}))
+    labels, memberships = [], []
+    for chunk in np.split(np.asarray(values, dtype=float), np.cumsum(runs or [])[:-1]):
+        validator = FuzzyValidator.from_step(config, metric_func=None)
+        idx, m = validator.replay(chunk)
+        labels.append(idx)
+        memberships.append(m)
+    return validator.label_names, np.concatenate(labels), np.vstack(memberships)
+
+
+def agreement_stats(reference, predicted, label_names):
+    """
+    Label agreement between two label sequences.
+
+    :param reference: Reference label indices (N,); negative entries (unknown labels) are ignored.
+    :param predicted: Predicted label indices (N,).
+    :param label_names: Label names, indexed by the label indices.
+    :return: Dict with samples, agreement, Cohen's kappa, per-label counts/recall/precision
+             and the confusion matrix (rows: reference, columns: predicted).
+    """
+    k = len(label_names)
+    reference = np.asarray(reference)
+    valid = reference >= 0
+    n = int(valid.sum())
+    confusion = np.bincount(reference[valid] * k + np.asarray(predicted)[valid], minlength=k * k).reshape(k, k)
+    agreement = float(np.trace(confusion) / n) if n else None
+    expected = float((confusion.sum(axis=1) * confusion.sum(axis=0)).sum() / n ** 2) if n else None
+    kappa = None
+    if n:
+        kappa = 1.0 if expected == 1 else (agreement - expected) / (1 - expected)
+    per_label = {}
+    for i, label in enumerate(label_names):
+        ref_count = int(confusion[i].sum())
+        pred_count = int(confusion[:, i].sum())
+        per_label[label] = {
+            "reference": ref_count,
+            "predicted": pred_count,
+            "recall": float(confusion[i, i] / ref_count) if ref_count else None,
+            "precision": float(confusion[i, i] / pred_count) if pred_count else None
+        }
+    return {
+        "samples": n,
+        "agreement": agreement,
+        "kappa": kappa,
+        "labels": per_label,
+        "confusion": confusion.tolist()
+    }
+
+
+def evaluate_labels(step, labels, label_names):
+    """
+    Pass/fail of a label sequence under the step's eval_label / eval_policy,
+    taken over all replayed samples as one window.
+    """
+    eval_label = step.get("eval_label")
+    if eval_label is None:
+        return None
+    aggregator = LabelAggregator(
+        eval_label,
+        policy=step.get("eval_policy", "any"),
+        expected_samples=len(labels),
+        dwell_samples=step.get("dwell_samples"),
+        dwell_fraction=step.get("dwell_fraction")
+    )
+    for i in labels:
+        if aggregator.update(label_names[i]) is not None and aggregator.early_exit():
+            break
+    return aggregator.result()
+
+
+def expand_grid(grid):
+    """
+    Cartesian product of a sweep grid.
+
+    :param grid: Dict param -> list of candidate values, params from SWEEP_PARAMS.
+    :return: List of override dicts.
+    """
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameter(s): {', '.join(sorted(unknown))}. Use {', '.join(SWEEP_PARAMS)}.")
+    keys = [k for k in SWEEP_PARAMS if k in grid]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+# Per-worker sweep data, set once by the pool initializer instead of pickled per task.
+_SWEEP_DATA = {}
+
+
+def _init_sweep_worker(data):
+    _SWEEP_DATA.update(data)
+
+
+def _sweep_task(task):
+    desc, overrides = task
+    step, values, runs, reference = _SWEEP_DATA[desc]
+    label_names, labels, _ = replay_step(step, values, overrides, runs)
+    stats = agreement_stats(reference, labels, label_names)
+    return {
+        "step": desc,
+        "params": overrides,
+        "agreement": stats["agreement"],
+        "kappa": stats["kappa"],
+        "labels": {label: s["predicted"] for label, s in stats["labels"].items()},
+        "passed": evaluate_labels(step, labels, label_names)
+    }
+
+
+def _reference_labels(step, entry, reference):
+    label_names = step.get("label_names", ["LOW", "MED", "HIGH"])
+    if reference in (None, "recorded"):
+        index = {label: i for i, label in enumerate(label_names)}
+        ref = np.array([index.get(label, -1) for label in entry["labels"]], dtype=int)
+        unknown = int((ref < 0).sum())
+        if unknown:
+            print(f"[WARNING] {step.get('description')}: {unknown} recorded label(s) not in the step's label_names "
+                  f"are left out of the agreement statistics.")
+        return ref
+    return replay_step(step, entry["values"], reference, entry["runs"])[1]
+
+
+def run_replay(log_paths, steps, sweep=None, max_workers=None, top=5):
+    """
+    Replay recorded fuzzy samples through each step's validator and optionally sweep its parameters.
+
+    :param log_paths: Run log files / run directories / globs.
+    :param steps: Testcase steps; fuzzy steps are matched to recorded samples by description.
+    :param sweep: Optional sweep spec: {param: [candidates], "step": description (optional),
+                  "reference": "recorded" (default) or a dict of step overrides}.
+    :param max_workers: Process pool size of the sweep (default: CPU count).
+    :param top: Number of best configurations to print per step.
+    :return: Dict step description -> {"replay": stats, "sweep": ranked results}.
+    """
+    fuzzy_steps = {s.get("description"): s for s in steps
+                   if s.get("type") in ("fuzzy", "neuro_fuzzy")}
+    recorded = load_recorded_samples(expand_log_paths(log_paths), steps=set(fuzzy_steps))
+    if not recorded:
+        print("[WARNING] No recorded fuzzy samples found for the testcase steps.")
+        return {}
+
+    sweep = dict(sweep or {})
+    sweep_step = sweep.pop("step", None)
+    reference = sweep.pop("reference", "recorded")
+    candidates = expand_grid(sweep) if sweep else []
+
+    results = {}
+    sweep_data = {}
+    for desc, entry in recorded.items():
+        step = fuzzy_steps[desc]
+        ref = _reference_labels(step, entry, reference)
+        if not (ref >= 0).any():
+            continue
+        label_names, labels, _ = replay_step(step, entry["values"], runs=entry["runs"])
+        stats = agreement_stats(ref, labels, label_names)
+        stats["passed"] = evaluate_labels(step, labels, label_names)
+        results[desc] = {"metric": entry["metric"], "replay": stats}
+        verdict = "" if stats["passed"] is None else (" | eval PASSED" if stats["passed"] else " | eval FAILED")
+        print(f"[REPLAY] {desc}: {stats['samples']} samples | agreement {stats['agreement']:.1%} "
+              f"| kappa {stats['kappa']:.3f}{verdict}")
+        if candidates and (sweep_step is None or sweep_step == desc):
+            sweep_data[desc] = (step, entry["values"], entry["runs"], ref)
+
+    if sweep_data:
+        tasks = [(desc, overrides) for desc in sweep_data for overrides in candidates]
+        print(f"[INFO] Sweeping {len(candidates)} configuration(s) over {len(sweep_data)} step(s) "
+              f"({len(tasks)} replays)...")
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker,
+                                 initargs=(sweep_data,)) as pool:
+            outcomes = list(pool.map(_sweep_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+        for desc in sweep_data:
+            ranked = sorted((o for o in outcomes if o["step"] == desc),
+                            key=lambda o: (-o["agreement"], -o["kappa"]))
+            results[desc]["sweep"] = ranked
+            print(f"\n[SWEEP] {desc}: top {min(top, len(ranked))} of {len(ranked)}")
+            for o in ranked[:top]:
+                verdict = "" if o["passed"] is None else (" PASS" if o["passed"] else " FAIL")
+                print(f"  agreement {o['agreement']:.1%} | kappa {o['kappa']:.3f}{verdict} | "
+                      f"{json.dumps(o['params'])} | {json.dumps(o['labels'])}")
+    return results
@@ -1,20 +1,249 @@
 import json
+import random
+
+import numpy as np
 import pandas as pd
+from openpyxl import Workbook
+
+from modules.logger import read_log_records
+
+TABLE_STYLES = [
+    {'selector': 'th', 'props': [('background-color', '#101d86'), ('color', 'white'), ('font-weight', 'bold')]},
+    {'selector': 'td', 'props': [('padding', '5px')]},
+    {'selector': 'tr:nth-child(even)', 'props': [('background-color', '#f2f2f2')]}
+]
+
+EXCEL_MAX_ROWS = 1_048_575
+TEXT_EXCERPT = 2000
+
+
+def _excerpt(text, limit=TEXT_EXCERPT):
+    text = "" if text is None else str(text)
+    return text if len(text) <= limit else text[:limit] + f"... [{len(text) - limit} chars truncated]"
+
+
+class SampleSummary:
+    def __init__(self, reservoir_size=4096, seed=0):
+        """
+        Constant-memory summary of one step's fuzzy samples: exact count/min/max/mean,
+        label histogram, and percentiles from a fixed-size reservoir sample.
+        """
+        self.metric = None
+        self.count = 0
+        self.invalid = 0
+        self.min = None
+        self.max = None
+        self.total = 0.0
+        self.labels = {}
+        self.reservoir = []
+        self.reservoir_size = reservoir_size
+        self._rng = random.Random(seed)
+
+    def add(self, value, label, metric=None):
+        self.metric = self.metric or metric
+        self.labels[label] = self.labels.get(label, 0) + 1
+        if not isinstance(value, (int, float)) or value == -1 or value != value:
+            self.invalid += 1
+            return
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.reservoir) < self.reservoir_size:
+            self.reservoir.append(value)
+        else:
+            j = self._rng.randrange(self.count)
+            if j < self.reservoir_size:
+                self.reservoir[j] = value
+
+    def row(self, step):
+        p50 = p90 = p99 = None
+        if self.reservoir:
+            p50, p90, p99 = (float(v) for v in np.percentile(self.reservoir, [50, 90, 99]))
+        return {
+            "step": step,
+            "metric": self.metric,
+            "samples": self.count,
+            "invalid": self.invalid,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "labels": json.dumps(self.labels)
+        }
+
+
+class ReportBuilder:
+    def __init__(self, excel_path=None):
+        """
+        Single-pass report pipeline. Records are routed into per-type tables:
+        steps, per-step sample summaries, shell results and pipeline events.
+        Raw fuzzy samples are streamed straight into a write-only Excel sheet.
+        """
+        self.steps = {}
+        self.samples = {}
+        self.shell = []
+        self.events = []
+        self.system_info = {}
+        self.timings = []
+        self._wb = None
+        self._sample_rows = 0
+        if excel_path:
+            self._wb = Workbook(write_only=True)
+            self._sample_sheet = self._wb.create_sheet("Samples")
+            self._sample_sheet.append(["timestamp", "step", "metric", "value", "label", "fuzzy"])
+
+    def _step(self, name):
+        if name not in self.steps:
+            self.steps[name] = {"step": name, "type": None, "required": None, "started": None, "eval": None, "error": None}
+        return self.steps[name]
+
+    def add(self, timestamp, rec):
+        step = rec.get("step")
+        if rec.get("event") == "timing":
+            for phase, stats in (rec.get("phases") or {}).items():
+                self.timings.append({"step": step, "phase": phase, **stats})
+            self.timings.append({"step": step, "phase": "step total", "count": rec.get("attempts"),
+                                 "total_s": rec.get("duration_s"), "mean_ms": None, "min_ms": None, "max_ms": None})
+        elif "event" in rec:
+            if "system_info" in rec:
+                self.system_info = rec.get("system_info", {}) or {}
+                rec = {k: v for k, v in rec.items() if k != "system_info"}
+            self.events.append({"timestamp": timestamp, "event": rec.get("event"), "step": step,
+                                "details": json.dumps({k: v for k, v in rec.items() if k not in ("event", "step")}, default=str)})
+        elif "value" in rec and "label" in rec:
+            summary = self.samples.setdefault(step, SampleSummary())
+            summary.add(rec["value"], rec["label"], rec.get("metric") or rec.get("output"))
+            if self._wb is not None and self._sample_rows < EXCEL_MAX_ROWS:
+                value = rec["value"] if isinstance(rec["value"], (int, float)) else str(rec["value"])
+                self._sample_sheet.append([timestamp, step, rec.get("metric") or rec.get("output"),
+                                           value, rec["label"], json.dumps(rec.get("fuzzy"), default=str)])
+                self._sample_rows += 1
+        elif "command" in rec or "on_fail_output" in rec:
+            self.shell.append({
+                "timestamp": timestamp,
+                "step": step,
+                "command": rec.get("command", "on_fail"),
+                "returncode": rec.get("returncode"),
+                "stdout": _excerpt(rec.get("stdout", rec.get("on_fail_output"))),
+                "stderr": _excerpt(rec.get("stderr"))
+            })
+            if "eval" in rec:
+                self._step(step)["eval"] = rec["eval"]
+        elif "type" in rec and "required" in rec:
+            row = self._step(step)
+            row.update(type=rec["type"], required=rec["required"], started=rec.get("timestamp", timestamp))
+        elif "eval" in rec:
+            self._step(step)["eval"] = rec["eval"]
+        elif "error" in rec:
+            self._step(step)["error"] = rec["error"]
+            self.events.append({"timestamp": timestamp, "event": "error", "step": step, "details": rec["error"]})
+        else:
+            self.events.append({"timestamp": timestamp, "event": None, "step": step, "details": json.dumps(rec, default=str)})
+
+    def tables(self):
+        return {
+            "Steps": pd.DataFrame(list(self.steps.values())),
+            "Sample Summary": pd.DataFrame([s.row(step) for step, s in self.samples.items()]),
+            "Shell": pd.DataFrame(self.shell),
+            "Events": pd.DataFrame(self.events),
+            "Timings": pd.DataFrame(self.timings),
+            "System Info": pd.DataFrame(
+                [{"key": k, "value": json.dumps(v, default=str) if isinstance(v, (dict, list)) else v}
+                 for k, v in self.system_info.items()]
+            )
+        }
+
+    def write_excel(self, excel_path, tables):
+        write_excel_tables(self._wb, excel_path, tables)
+
+    def write_html(self, html_path, tables):
+        write_html_tables(html_path, tables)
+
+
+def write_excel_tables(wb, excel_path, tables):
+    """
+    Append one sheet per table to a write-only workbook and save it.
+    """
+    for name, df in tables.items():
+        ws = wb.create_sheet(name)
+        ws.append(list(df.columns))
+        for row in df.itertuples(index=False):
+            ws.append([None if (isinstance(v, float) and np.isnan(v)) else v for v in row])
+    wb.save(excel_path)
+
+
+def write_html_tables(html_path, tables, title="PyFuzzyFlow Test Report"):
+    parts = [f"<html><head><meta charset='utf-8'><title>{title}</title></head><body>",
+             f"<h1>{title}</h1>"]
+    for name, df in tables.items():
+        if df.empty:
+            continue
+        styled = df.style.set_table_styles(TABLE_STYLES).set_caption(name).hide(axis="index")
+        parts.append(styled.to_html())
+    parts.append("</body></html>")
+    with open(html_path, "w") as f:
+        f.write("\n".join(parts))
+
+
+def export_reports(log_path, excel_path=None, html_path=None):
+    """
+    Parse the run log once and write every requested report format from that pass.
+    """
+    builder = ReportBuilder(excel_path=excel_path)
+    for timestamp, rec in read_log_records(log_path):
+        builder.add(timestamp, rec)
+    tables = builder.tables()
+    if excel_path:
+        builder.write_excel(excel_path, tables)
+    if html_path:
+        builder.write_html(html_path, tables)
+
 
 def export_log_to_excel(log_path, excel_path):
-    with open(log_path) as f:
-        rows = [json.loads(line.split(" | ", 1)[1]) for line in f if "{" in line]
-    df = pd.DataFrame(rows)
-    df.to_excel(excel_path, index=False)
+    export_reports(log_path, excel_path=excel_path)
+
 
 def export_log_to_html(log_path, html_path):
-    with open(log_path) as f:
-        rows = [json.loads(line.split(" | ", 1)[1]) for line in f if "{" in line]
-    df = pd.DataFrame(rows)
-    # Dale formato con Styler
-    styled = df.style.set_table_styles([
-        {'selector': 'th', 'props': [('background-color', '#101d86'), ('color', 'white'), ('font-weight', 'bold')]},
-        {'selector': 'td', 'props': [('padding', '5px')]},
-        {'selector': 'tr:nth-child(even)', 'props': [('background-color', '#f2f2f2')]}
-    ]).set_caption("PyFuzzyFlow Test Report")
-    styled.to_html(html_path)
+    export_reports(log_path, html_path=html_path)
+
+
+def export_batch_report(results, system_info=None, excel_path=None, html_path=None):
+    """
+    Aggregated report of a batch run: one row per pipeline with timings, the
+    pipelines x steps pass/fail matrix, per-step timings and the shared system info.
+
+    :param results: Pipeline summaries, each with "testcase" and the run_pipeline fields
+                    (or "error" if the pipeline could not run).
+    """
+    from modules.batch import pass_fail_matrix
+    columns, rows = pass_fail_matrix([r for r in results if not r.get("error")])
+    tables = {
+        "Pipelines": pd.DataFrame([{
+            "testcase": r["testcase"],
+            "name": r.get("name"),
+            "result": "ERROR" if r.get("error") else ("PASSED" if r["passed"] else "FAILED"),
+            "passed_steps": r.get("num_passed"),
+            "required_steps": r.get("total_required"),
+            "min_passed": r.get("min_passed"),
+            "duration_s": r.get("duration_s"),
+            "report_export_s": r.get("report_export_s"),
+            "run_dir": r.get("run_dir"),
+            "error": r.get("error")
+        } for r in results]),
+        "Matrix": pd.DataFrame(rows, columns=["testcase"] + columns).fillna(""),
+        "Step Timings": pd.DataFrame([
+            {"testcase": r["testcase"], **{k: v for k, v in step.items() if k != "phases"}}
+            for r in results if not r.get("error") for step in r["steps"]
+        ]),
+        "System Info": pd.DataFrame(
+            [{"key": k, "value": json.dumps(v, default=str) if isinstance(v, (dict, list)) else v}
+             for k, v in (system_info or {}).items()]
+        )
+    }
+    if excel_path:
+        write_excel_tables(Workbook(write_only=True), excel_path, tables)
+    if html_path:
+        write_html_tables(html_path, tables, title="PyFuzzyFlow Batch Report")
@@ -0,0 +1,187 @@
+import re
+
+import numpy as np
+
+from modules.membership import MembershipEngine
+
+INFERENCE_MODES = ("mamdani", "sugeno")
+# Label index of a sample where no rule fired (all output strengths are 0)
+NO_FIRE = -1
+
+RULE_PATTERN = re.compile(r"^\s*IF\s+(?P<cond>.+?)\s+THEN\s+(?P<out>\S+)\s+(?P<label>\S+)\s*$", re.IGNORECASE)
+
+
+def parse_rule(rule):
+    """
+    Parse a rule into a dict with "if", "op", "then" and "weight".
+
+    Accepts either a dict in that form or a string such as
+    "IF cpu_percent HIGH AND ram_percent HIGH THEN health DEGRADED".
+    AND and OR can not be mixed in one rule.
+    """
+    if isinstance(rule, dict):
+        return {
+            "if": dict(rule["if"]),
+            "op": rule.get("op", "AND").upper(),
+            "then": rule["then"],
+            "weight": float(rule.get("weight", 1.0))
+        }
+    m = RULE_PATTERN.match(rule)
+    if not m:
+        raise ValueError(f"Invalid rule: '{rule}'. Expected 'IF <metric> <LABEL> [AND|OR ...] THEN <output> <LABEL>'.")
+    tokens = re.split(r"\s+(AND|OR)\s+", m.group("cond"), flags=re.IGNORECASE)
+    ops = {t.upper() for t in tokens[1::2]}
+    if len(ops) > 1:
+        raise ValueError(f"Invalid rule: '{rule}'. AND and OR can not be mixed.")
+    conditions = {}
+    for term in tokens[0::2]:
+        parts = term.split()
+        if len(parts) != 2:
+            raise ValueError(f"Invalid condition '{term}' in rule '{rule}'.")
+        conditions[parts[0]] = parts[1]
+    return {"if": conditions, "op": ops.pop() if ops else "AND", "then": m.group("label"), "weight": 1.0}
+
+
+class FuzzyRuleEngine:
+    def __init__(self, inputs, output, rules, inference="mamdani"):
+        """
+        Multi-metric fuzzy rule engine (Mamdani or zero-order Sugeno).
+
+        :param inputs: Dict input name -> {"thresholds", "label_names", "membership_shape", "domain"}.
+        :param output: {"name", "label_names", "thresholds" (mamdani), "values" (sugeno), "domain"}.
+        :param rules: List of rules (strings or dicts, see parse_rule).
+        :param inference: "mamdani" or "sugeno".
+        """
+        if inference not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {inference}. Use one of {', '.join(INFERENCE_MODES)}.")
+        if not rules:
+            raise ValueError("At least one rule is required.")
+        self.inference = inference
+        self.input_names = list(inputs)
+        self.inputs = {}
+        self._offsets = {}
+        offset = 0
+        for name, cfg in inputs.items():
+            labels = cfg.get("label_names", ["LOW", "MED", "HIGH"])
+            engine = MembershipEngine(
+                cfg.get("thresholds", [10, 30, 70]),
+                n_labels=len(labels),
+                shape=cfg.get("membership_shape", "trapezoid"),
+                domain=cfg.get("domain", [0, 100]),
+                lut_resolution=cfg.get("lut_resolution")
+            )
+            self.inputs[name] = (labels, engine)
+            self._offsets[name] = offset
+            offset += len(labels)
+        self._n_terms = offset
+
+        self.output_name = output.get("name", "output")
+        self.output_labels = output.get("label_names", ["LOW", "MED", "HIGH"])
+        k = len(self.output_labels)
+        self.output_domain = output.get("domain", [0, 100])
+        self.output_engine = MembershipEngine(
+            output.get("thresholds", list(np.linspace(self.output_domain[0], self.output_domain[1], k + 2)[1:-1])),
+            n_labels=k,
+            shape=output.get("membership_shape", "trapezoid"),
+            domain=self.output_domain
+        )
+        self.output_values = np.asarray(
+            output.get("values", np.linspace(self.output_domain[0], self.output_domain[1], k)), dtype=float
+        )
+        self._compile([parse_rule(r) for r in rules])
+
+    def _compile(self, rules):
+        """
+        Turn the rules into index arrays so inference is a single gather + reduce.
+        Padding points at two sentinel terms: 1.0 (neutral for AND) and 0.0 (neutral for OR).
+        """
+        width = max(len(r["if"]) for r in rules)
+        one, zero = self._n_terms, self._n_terms + 1
+        self._antecedents = np.empty((len(rules), width), dtype=np.intp)
+        self._is_and = np.empty(len(rules), dtype=bool)
+        self._weights = np.empty(len(rules))
+        self._consequents = np.empty(len(rules), dtype=np.intp)
+        for r, rule in enumerate(rules):
+            if rule["op"] not in ("AND", "OR"):
+                raise ValueError(f"Unknown rule operator: {rule['op']}.")
+            is_and = rule["op"] == "AND"
+            idx = []
+            for name, label in rule["if"].items():
+                if name not in self.inputs:
+                    raise ValueError(f"Rule references unknown input '{name}'.")
+                labels = self.inputs[name][0]
+                if label not in labels:
+                    raise ValueError(f"Unknown label '{label}' for input '{name}'. Use one of {labels}.")
+                idx.append(self._offsets[name] + labels.index(label))
+            idx += [one if is_and else zero] * (width - len(idx))
+            if rule["then"] not in self.output_labels:
+                raise ValueError(f"Unknown output label '{rule['then']}'. Use one of {self.output_labels}.")
+            self._antecedents[r] = idx
+            self._is_and[r] = is_and
+            self._weights[r] = rule["weight"]
+            self._consequents[r] = self.output_labels.index(rule["then"])
+
+    def infer(self, frame):
+        """
+        Run inference over a sample frame.
+
+        :param frame: Dict input name -> value or 1-D array of N values.
+        :return: (label_indices (N,), output strengths (N, k), crisp outputs (N,)).
+                 Where no rule fired, the label index is NO_FIRE and the crisp output NaN.
+        """
+        cols = [self.inputs[name][1].evaluate(np.atleast_1d(frame[name])) for name in self.input_names]
+        n = cols[0].shape[0]
+        terms = np.hstack(cols + [np.ones((n, 1)), np.zeros((n, 1))])
+        gathered = terms[:, self._antecedents]
+        firing = np.where(self._is_and, gathered.min(axis=2), gathered.max(axis=2)) * self._weights
+
+        k = len(self.output_labels)
+        strengths = np.zeros((n, k))
+        if self.inference == "mamdani":
+            for j in range(k):
+                mask = self._consequents == j
+                if mask.any():
+                    strengths[:, j] = firing[:, mask].max(axis=1)
+            # Centroid of the output sets clipped at their strengths
+            lo, hi = self.output_domain
+            grid = np.linspace(lo, hi, 201)
+            out_mf = self.output_engine.evaluate(grid)
+            agg = np.minimum(out_mf[None, :, :], strengths[:, None, :]).max(axis=2)
+            total = agg.sum(axis=1)
+            crisp = np.where(total > 0, (agg * grid).sum(axis=1) / np.where(total > 0, total, 1), np.nan)
+        else:
+            for j in range(k):
+                mask = self._consequents == j
+                if mask.any():
+                    strengths[:, j] = firing[:, mask].sum(axis=1)
+            total = strengths.sum(axis=1)
+            crisp = np.where(total > 0, strengths @ self.output_values / np.where(total > 0, total, 1), np.nan)
+        labels = np.where(strengths.max(axis=1) > 0, np.argmax(strengths, axis=1), NO_FIRE)
+        return labels, strengths, crisp
+
+    def classify(self, frame):
+        """
+        Single-frame inference. Returns (label, strengths, crisp); label is None
+        (and crisp NaN) if no rule fired.
+        """
+        idx, strengths, crisp = self.infer(frame)
+        label = None if idx[0] == NO_FIRE else self.output_labels[idx[0]]
+        return label, list(strengths[0]), float(crisp[0])
+
+
+class SampleFrame:
+    def __init__(self, metric_funcs):
+        """
+        Collects every referenced metric once per tick.
+
+        :param metric_funcs: Dict input name -> callable returning the metric value.
+        """
+        self.metric_funcs = metric_funcs
+
+    def sample(self):
+        return {name: func() for name, func in self.metric_funcs.items()}
+
+    def close(self):
+        for func in self.metric_funcs.values():
+            if hasattr(func, "close"):
+                func.close()
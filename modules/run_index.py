@@ -0,0 +1,405 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+
+from modules.logger import LOG_FORMATS, read_log_records
+
+INDEX_FILE = "index.sqlite"
+QUERY_KINDS = ("runs", "steps", "labels")
+FILTER_KEYS = ("pipeline", "step", "host", "since", "until", "passed")
+FINGERPRINT_KEYS = ("hostname", "platform", "machine", "processor", "cpu_count_logical",
+                    "memory_total_gb", "python_version")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_dir TEXT UNIQUE NOT NULL,
+    run_hash TEXT,
+    kind TEXT,
+    pipeline TEXT,
+    started TEXT,
+    ended TEXT,
+    duration_s REAL,
+    passed INTEGER,
+    host TEXT,
+    fingerprint TEXT,
+    log_bytes INTEGER,
+    log_mtime REAL,
+    indexed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL,
+    step TEXT NOT NULL,
+    type TEXT,
+    required INTEGER,
+    runs INTEGER,
+    failures INTEGER,
+    passed INTEGER,
+    attempts INTEGER,
+    errors INTEGER,
+    duration_s REAL,
+    max_duration_s REAL
+);
+CREATE TABLE IF NOT EXISTS labels (
+    run_id INTEGER NOT NULL,
+    step TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started);
+CREATE INDEX IF NOT EXISTS runs_host ON runs(host, started);
+CREATE INDEX IF NOT EXISTS steps_run ON steps(run_id);
+CREATE INDEX IF NOT EXISTS steps_step ON steps(step);
+CREATE INDEX IF NOT EXISTS labels_run ON labels(run_id);
+"""
+
+
+def system_fingerprint(system_info):
+    """
+    Short hash of the stable host properties (hostname, platform, CPU, memory, Python),
+    so runs on the same machine/configuration can be grouped.
+    """
+    stable = {k: system_info.get(k) for k in FINGERPRINT_KEYS}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def run_log_files(run_dir):
+    """
+    Run log files of a run directory in write order: rotated files (run_<id>.<seq>.<ext>) first,
+    then the current one. console.log and reports are ignored.
+    """
+    extensions = tuple(LOG_FORMATS.values())
+    names = sorted(n for n in os.listdir(run_dir) if n.startswith("run_") and n.endswith(extensions))
+    return [os.path.join(run_dir, n) for n in names]
+
+
+def find_run_dirs(roots):
+    """
+    Recursively find run directories (containing run_<id> log files) below the given roots,
+    including the run directories of batches.
+    """
+    found = []
+    seen = set()
+    for root in roots:
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames.sort()
+            if os.path.basename(dirpath).startswith("run_") and run_log_files(dirpath):
+                if os.path.abspath(dirpath) not in seen:
+                    seen.add(os.path.abspath(dirpath))
+                    found.append(dirpath)
+                dirnames[:] = [d for d in dirnames if d != "profiles"]
+    return found
+
+
+def _log_signature(files):
+    return sum(os.path.getsize(p) for p in files), max(os.path.getmtime(p) for p in files)
+
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize_run(run_dir):
+    """
+    One pass over the run log(s) of a run directory.
+
+    Step outcomes are taken per run of the step (one "timing" record each, or the next start of
+    the step for logs written before timing records existed), so retries count once and watch
+    runs count every cycle. Label histograms count the sampled labels.
+
+    :return: Summary dict (see RunIndex.add), or None if the directory holds no run log.
+    """
+    files = run_log_files(run_dir)
+    if not files:
+        return None
+    run = {"run_dir": os.path.abspath(run_dir), "run_hash": None, "kind": "pipeline", "pipeline": None,
+           "started": None, "ended": None, "passed": None, "host": None, "fingerprint": None}
+    steps = {}
+    labels = {}
+    first_ts = last_ts = None
+
+    def step_entry(name):
+        if name not in steps:
+            steps[name] = {"type": None, "required": None, "runs": 0, "failures": 0, "passed": None,
+                           "attempts": 0, "errors": 0, "duration_s": 0.0, "max_duration_s": None,
+                           "open": False, "eval": None, "error": False, "first": None, "last": None}
+        return steps[name]
+
+    def finish(entry, duration=None, attempts=1):
+        if entry["eval"] is None and not entry["error"] and duration is None:
+            entry["open"] = False
+            return
+        if duration is None:
+            first, last = _parse_time(entry["first"]), _parse_time(entry["last"])
+            duration = (last - first).total_seconds() if first and last else None
+        passed = entry["eval"] == "[EVAL][PASSED]"
+        entry["runs"] += 1
+        entry["failures"] += 0 if passed else 1
+        entry["passed"] = int(passed)
+        entry["attempts"] += attempts
+        if duration is not None:
+            duration = round(duration, 3)
+            entry["duration_s"] += duration
+            entry["max_duration_s"] = max(entry["max_duration_s"] or 0.0, duration)
+        entry.update(open=False, eval=None, error=False, first=None)
+
+    for path in files:
+        for ts, rec in read_log_records(path):
+            if ts is not None:
+                first_ts = first_ts or ts
+                last_ts = ts
+            event = rec.get("event")
+            name = rec.get("step")
+            if name is None:
+                if event == "run_id":
+                    run["run_hash"] = rec.get("run_id")
+                elif event in ("start_pipeline", "start_watch"):
+                    run["kind"] = "watch" if event == "start_watch" else "pipeline"
+                    run["pipeline"] = rec.get("test_case")
+                    run["started"] = rec.get("start_time")
+                elif event in ("end_pipeline", "end_watch"):
+                    run["ended"] = rec.get("end_time")
+                    if "global_pass" in rec:
+                        run["passed"] = int(bool(rec["global_pass"]))
+                elif event == "system_info":
+                    info = rec.get("system_info") or {}
+                    run["host"] = info.get("hostname")
+                    run["fingerprint"] = system_fingerprint(info)
+                continue
+
+            if event == "timing":
+                finish(step_entry(name), rec.get("duration_s"), rec.get("attempts", 1))
+            elif event is not None:
+                continue
+            elif "type" in rec and "required" in rec:
+                entry = step_entry(name)
+                if entry["open"]:
+                    finish(entry)
+                entry.update(type=rec["type"], required=int(bool(rec["required"])), open=True, first=ts)
+            elif "label" in rec and "value" in rec:
+                counts = labels.setdefault(name, {})
+                counts[rec["label"]] = counts.get(rec["label"], 0) + 1
+            elif "eval" in rec:
+                if rec["eval"] == "[SKIPPED]":
+                    step_entry(name)
+                else:
+                    step_entry(name)["eval"] = rec["eval"]
+            elif "error" in rec:
+                entry = step_entry(name)
+                entry["error"] = True
+                entry["errors"] += 1
+            if name in steps:
+                steps[name]["last"] = ts
+
+    for entry in steps.values():
+        if entry["open"]:
+            finish(entry)
+        for key in ("open", "eval", "error", "first", "last"):
+            del entry[key]
+
+    run["started"] = run["started"] or first_ts
+    run["ended"] = run["ended"] or last_ts
+    started, ended = _parse_time(run["started"]), _parse_time(run["ended"])
+    run["duration_s"] = round((ended - started).total_seconds(), 3) if started and ended else None
+    run["log_bytes"], run["log_mtime"] = _log_signature(files)
+    run["steps"] = steps
+    run["labels"] = labels
+    return run
+
+
+def parse_since(value):
+    """
+    "30d", "12h", "45m" (relative to now) or an ISO date/datetime -> ISO timestamp string.
+    """
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([dhm])", value.strip())
+    if match:
+        unit = {"d": "days", "h": "hours", "m": "minutes"}[match.group(2)]
+        return (datetime.now() - timedelta(**{unit: float(match.group(1))})).isoformat()
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}': use e.g. 30d, 12h, 45m or an ISO date.")
+
+
+def parse_filters(items):
+    """
+    ["step=Disk*", "since=30d"] -> dict. Values of pipeline/step/host may use * and ? wildcards.
+    """
+    filters = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep or key not in FILTER_KEYS:
+            raise ValueError(f"Invalid filter '{item}': use KEY=VALUE with KEY in {', '.join(FILTER_KEYS)}.")
+        if key in ("since", "until"):
+            value = parse_since(value)
+        elif key == "passed":
+            value = 1 if value.lower() in ("1", "true", "yes", "passed") else 0
+        filters[key] = value
+    return filters
+
+
+class RunIndex:
+    def __init__(self, path, readonly=False):
+        """
+        SQLite index of run summaries: one row per run directory in "runs", with per-step
+        outcomes in "steps" and sampled label counts in "labels" (both keyed by runs.id).
+
+        Several processes may add runs at the same time (batch workers); writers wait on
+        the database lock for up to 30 seconds.
+
+        :param path: Database file (created with its schema if missing, unless readonly).
+        :param readonly: Open for queries only (--query-sql cannot modify the index).
+        """
+        self.path = path
+        if readonly:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+        else:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.conn = sqlite3.connect(path, timeout=30)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def is_current(self, run_dir):
+        """
+        True if run_dir is indexed and its log files have not changed since.
+        """
+        row = self.conn.execute("SELECT log_bytes, log_mtime FROM runs WHERE run_dir = ?",
+                                (os.path.abspath(run_dir),)).fetchone()
+        files = run_log_files(run_dir)
+        return row is not None and bool(files) and tuple(row) == _log_signature(files)
+
+    def add(self, summary):
+        """
+        Insert or replace the summary of one run (as returned by summarize_run).
+
+        :return: Row id of the run.
+        """
+        columns = ("run_dir", "run_hash", "kind", "pipeline", "started", "ended", "duration_s", "passed",
+                   "host", "fingerprint", "log_bytes", "log_mtime")
+        with self.conn:
+            old = self.conn.execute("SELECT id FROM runs WHERE run_dir = ?", (summary["run_dir"],)).fetchone()
+            if old is not None:
+                for table in ("steps", "labels"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE run_id = ?", old)
+                self.conn.execute("DELETE FROM runs WHERE id = ?", old)
+            cur = self.conn.execute(
+                f"INSERT INTO runs ({', '.join(columns)}, indexed_at) VALUES ({', '.join('?' * len(columns))}, ?)",
+                [summary[c] for c in columns] + [datetime.now().isoformat()]
+            )
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO steps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, name, s["type"], s["required"], s["runs"], s["failures"], s["passed"], s["attempts"],
+                  s["errors"], round(s["duration_s"], 3), s["max_duration_s"]) for name, s in summary["steps"].items()]
+            )
+            self.conn.executemany(
+                "INSERT INTO labels VALUES (?, ?, ?, ?)",
+                [(run_id, step, label, count) for step, counts in summary["labels"].items()
+                 for label, count in counts.items()]
+            )
+        return run_id
+
+    def index_run(self, run_dir):
+        """
+        Summarize and add one run directory. Returns the summary (None if it holds no run log).
+        """
+        summary = summarize_run(run_dir)
+        if summary is not None:
+            self.add(summary)
+        return summary
+
+    def backfill(self, roots, force=False):
+        """
+        Index every run directory below `roots` that is new or whose logs changed.
+
+        :return: (indexed, unchanged, failed) counts.
+        """
+        indexed = unchanged = failed = 0
+        for run_dir in find_run_dirs(roots):
+            if not force and self.is_current(run_dir):
+                unchanged += 1
+                continue
+            try:
+                self.index_run(run_dir)
+                indexed += 1
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[WARNING] Could not index '{run_dir}': {e}")
+                failed += 1
+        return indexed, unchanged, failed
+
+    def query(self, kind, filters=None, limit=50):
+        """
+        Predefined queries:
+          runs   - latest runs first
+          steps  - per step: runs, failures, failure rate, mean/max duration, last failure
+          labels - per step and label: sampled count and share
+
+        :param filters: Dict from parse_filters.
+        :return: (columns, rows).
+        """
+        if kind not in QUERY_KINDS:
+            raise ValueError(f"Unknown query '{kind}'. Use one of {', '.join(QUERY_KINDS)}.")
+        filters = filters or {}
+        where, params = [], []
+        for key, clause in (("pipeline", "r.pipeline GLOB ?"), ("host", "r.host GLOB ?"),
+                            ("since", "r.started >= ?"), ("until", "r.started < ?"), ("passed", "r.passed = ?")):
+            if key in filters:
+                where.append(clause)
+                params.append(filters[key])
+        if "step" in filters:
+            if kind == "runs":
+                where.append("EXISTS (SELECT 1 FROM steps s WHERE s.run_id = r.id AND s.step GLOB ?)")
+            else:
+                where.append(("s" if kind == "steps" else "l") + ".step GLOB ?")
+            params.append(filters["step"])
+        condition = f"WHERE {' AND '.join(where)}" if where else ""
+
+        if kind == "runs":
+            sql = f"""
+                SELECT r.started, r.pipeline, r.kind,
+                       CASE r.passed WHEN 1 THEN 'PASSED' WHEN 0 THEN 'FAILED' END AS result,
+                       r.duration_s, r.host, r.run_hash, r.run_dir
+                FROM runs r {condition}
+                ORDER BY r.started DESC LIMIT ?"""
+        elif kind == "steps":
+            sql = f"""
+                SELECT s.step, COUNT(DISTINCT r.id) AS pipelines, SUM(s.runs) AS runs, SUM(s.failures) AS failures,
+                       ROUND(100.0 * SUM(s.failures) / MAX(SUM(s.runs), 1), 1) AS fail_pct,
+                       ROUND(SUM(s.duration_s) / MAX(SUM(s.runs), 1), 3) AS mean_s,
+                       MAX(s.max_duration_s) AS max_s,
+                       MAX(CASE WHEN s.failures > 0 THEN r.started END) AS last_failure
+                FROM steps s JOIN runs r ON r.id = s.run_id {condition}
+                GROUP BY s.step ORDER BY failures DESC, s.step LIMIT ?"""
+        else:
+            sql = f"""
+                SELECT l.step, l.label, SUM(l.count) AS samples,
+                       ROUND(100.0 * SUM(l.count) / SUM(SUM(l.count)) OVER (PARTITION BY l.step), 1) AS pct
+                FROM labels l JOIN runs r ON r.id = l.run_id {condition}
+                GROUP BY l.step, l.label ORDER BY l.step, samples DESC LIMIT ?"""
+        return self.execute(sql, params + [limit])
+
+    def execute(self, sql, params=()):
+        cur = self.conn.execute(sql, params)
+        columns = [d[0] for d in cur.description or []]
+        return columns, cur.fetchall()
+
+
+def format_rows(columns, rows):
+    """
+    Aligned text table. Returns a list of lines.
+    """
+    cells = [["" if v is None else str(v) for v in row] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.upper().ljust(w) for c, w in zip(columns, widths)).rstrip()]
+    lines.extend("  ".join(v.ljust(w) for v, w in zip(r, widths)).rstrip() for r in cells)
+    return lines
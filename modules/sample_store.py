@@ -0,0 +1,131 @@
+import glob
+import json
+import os
+import re
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency
+    pa = None
+
+
+def arrow_available():
+    return pa is not None
+
+
+def sample_file_name(idx, desc):
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", desc).strip("_").lower()[:60]
+    return f"step{idx + 1:02d}_{slug}.arrow"
+
+
+class SampleStore:
+    def __init__(self, path, label_names, step=None, metric=None, chunk_size=1024):
+        """
+        Columnar store for one step's fuzzy samples (Arrow IPC file).
+
+        Columns: timestamp (float64, epoch seconds), value (float64),
+        label_index (int16) and one float32 membership column per label.
+        Samples are buffered in preallocated arrays and written as one record
+        batch per chunk while the step runs.
+
+        :param path: Output .arrow file.
+        :param label_names: Labels of the step, one membership column each.
+        :param step: Step description, stored in the schema metadata.
+        :param metric: Metric name, stored in the schema metadata.
+        :param chunk_size: Number of samples per record batch.
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required for the sample store (pip install pyarrow).")
+        self.path = path
+        self.label_names = list(label_names)
+        self.chunk_size = chunk_size
+        self._columns = ["timestamp", "value", "label_index"] + [f"m_{label}" for label in self.label_names]
+        fields = [pa.field("timestamp", pa.float64()), pa.field("value", pa.float64()), pa.field("label_index", pa.int16())]
+        fields += [pa.field(name, pa.float32()) for name in self._columns[3:]]
+        metadata = {"step": step or "", "metric": metric or "", "label_names": json.dumps(self.label_names)}
+        self.schema = pa.schema(fields, metadata=metadata)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._sink = pa.OSFile(path, "wb")
+        self._writer = pa.ipc.new_file(self._sink, self.schema)
+        self._ts = np.empty(chunk_size, dtype=np.float64)
+        self._value = np.empty(chunk_size, dtype=np.float64)
+        self._label = np.empty(chunk_size, dtype=np.int16)
+        self._members = np.empty((chunk_size, len(self.label_names)), dtype=np.float32)
+        self._n = 0
+        self.rows = 0
+
+    def append(self, timestamp, value, label_index, memberships):
+        i = self._n
+        self._ts[i] = timestamp
+        self._value[i] = value if isinstance(value, (int, float)) else np.nan
+        self._label[i] = label_index
+        self._members[i] = memberships
+        self._n += 1
+        if self._n == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._n:
+            return
+        n = self._n
+        arrays = [pa.array(self._ts[:n]), pa.array(self._value[:n]), pa.array(self._label[:n])]
+        arrays += [pa.array(np.ascontiguousarray(self._members[:n, j])) for j in range(len(self.label_names))]
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.rows += n
+        self._n = 0
+
+    def close(self):
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        self._sink.close()
+        self._writer = None
+
+
+def read_samples(path):
+    """
+    Memory-map one sample file. Returns (table, metadata); the table's numeric
+    columns are backed by the mapped file, so no data is copied.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to read the sample store (pip install pyarrow).")
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+    if "label_names" in meta:
+        meta["label_names"] = json.loads(meta["label_names"])
+    return table, meta
+
+
+def load_samples(path):
+    """
+    Load one sample file as a dict of NumPy arrays (zero-copy for single-chunk columns).
+    """
+    table, meta = read_samples(path)
+    arrays = {}
+    for name in table.column_names:
+        col = table.column(name)
+        arrays[name] = col.chunk(0).to_numpy(zero_copy_only=True) if col.num_chunks == 1 else col.to_numpy()
+    return arrays, meta
+
+
+def load_run_samples(run_dir, as_pandas=False):
+    """
+    Load every step's samples of a run.
+
+    :param run_dir: Run directory (logs/run_<id>).
+    :param as_pandas: Return pandas DataFrames instead of NumPy array dicts.
+    :return: Dict step description -> samples.
+    """
+    result = {}
+    for path in sorted(glob.glob(os.path.join(run_dir, "samples", "*.arrow"))):
+        if as_pandas:
+            table, meta = read_samples(path)
+            result[meta.get("step") or path] = table.to_pandas()
+        else:
+            arrays, meta = load_samples(path)
+            result[meta.get("step") or path] = arrays
+    return result
@@ -0,0 +1,296 @@
+import heapq
+import itertools
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class LineSafeStream:
+    def __init__(self, stream):
+        """
+        Wraps a text stream so concurrent writers never interleave within a line.
+        Each thread buffers its output until a newline, then writes whole lines under a lock.
+        """
+        self.stream = stream
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def write(self, text):
+        buf = getattr(self._local, "buf", "") + text
+        if "\n" in buf:
+            head, _, buf = buf.rpartition("\n")
+            with self._lock:
+                self.stream.write(head + "\n")
+        self._local.buf = buf
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def resolve_dependencies(steps):
+    """
+    Resolve each step's optional "depends_on" into a set of step indices.
+
+    References may be 1-based step numbers or step descriptions. Unknown
+    references are reported and ignored.
+    :return: List of sets, one per step.
+    """
+    by_desc = {step.get("description", f"Step {i+1}"): i for i, step in enumerate(steps)}
+    deps = []
+    for i, step in enumerate(steps):
+        refs = step.get("depends_on", [])
+        if not isinstance(refs, list):
+            refs = [refs]
+        resolved = set()
+        for ref in refs:
+            if isinstance(ref, int) and 1 <= ref <= len(steps):
+                resolved.add(ref - 1)
+            elif ref in by_desc:
+                resolved.add(by_desc[ref])
+            else:
+                print(f"[WARNING] Step '{step.get('description')}' depends on unknown step '{ref}'. Ignoring it.")
+        if i in resolved:
+            raise ValueError(f"Step '{step.get('description')}' depends on itself.")
+        deps.append(resolved)
+    _check_acyclic(steps, deps)
+    return deps
+
+
+def _check_acyclic(steps, deps):
+    remaining = {i: set(d) for i, d in enumerate(deps)}
+    ready = [i for i, d in remaining.items() if not d]
+    done = 0
+    while ready:
+        node = ready.pop()
+        done += 1
+        for i, d in remaining.items():
+            if node in d:
+                d.discard(node)
+                if not d:
+                    ready.append(i)
+    if done != len(steps):
+        stuck = [steps[i].get("description", f"Step {i+1}") for i, d in remaining.items() if d]
+        raise ValueError(f"Circular 'depends_on' between steps: {', '.join(stuck)}")
+
+
+def run_dag(steps, deps, func, max_workers):
+    """
+    Run func(idx, step) for every step on a thread pool, starting each step
+    as soon as all the steps it depends on have finished.
+
+    :param steps: List of step dicts.
+    :param deps: Dependencies as returned by resolve_dependencies.
+    :param func: Callable(idx, step) -> result.
+    :param max_workers: Maximum number of steps running at once.
+    :return: List of results in step order.
+    """
+    results = [None] * len(steps)
+    pending = {i: set(d) for i, d in enumerate(deps)}
+    running = {}
+    stdout = sys.stdout
+    sys.stdout = LineSafeStream(stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                for i in sorted(i for i, d in pending.items() if not d):
+                    del pending[i]
+                    running[pool.submit(func, i, steps[i])] = i
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    i = running.pop(fut)
+                    results[i] = fut.result()
+                    for d in pending.values():
+                        d.discard(i)
+    finally:
+        sys.stdout = stdout
+    return results
+
+
+class FixedRateTicker:
+    def __init__(self, interval, duration):
+        """
+        Drift-free sampling clock based on time.monotonic().
+
+        Ticks are scheduled at start + n * interval, so time spent in the loop body
+        does not push later samples back. If the body overruns one or more tick
+        slots, those ticks are skipped (and counted) and sampling resumes on the
+        next aligned slot.
+
+        :param interval: Sampling period in seconds.
+        :param duration: Sampling window in seconds (may be fractional).
+        """
+        if interval <= 0:
+            raise ValueError("Sampling interval must be positive.")
+        self.interval = float(interval)
+        self.duration = float(duration)
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.max_lateness = 0.0
+        self.total_lateness = 0.0
+        self.slept = 0.0
+        self.elapsed = 0.0
+        self._start = None
+        # Welford accumulators of the actual spacing between consecutive ticks
+        self._last_tick = None
+        self._gaps = 0
+        self._gap_mean = 0.0
+        self._gap_m2 = 0.0
+
+    def __iter__(self):
+        start = self._start = time.monotonic()
+        end = start + self.duration
+        next_tick = start
+        while next_tick < end:
+            now = time.monotonic()
+            lateness = now - next_tick
+            self.max_lateness = max(self.max_lateness, lateness)
+            self.total_lateness += lateness
+            if self._last_tick is not None:
+                gap = now - self._last_tick
+                self._gaps += 1
+                delta = gap - self._gap_mean
+                self._gap_mean += delta / self._gaps
+                self._gap_m2 += delta * (gap - self._gap_mean)
+            self._last_tick = now
+            self.ticks += 1
+            yield self.ticks
+            next_tick += self.interval
+            now = time.monotonic()
+            if now > next_tick:
+                missed = int((now - next_tick) // self.interval) + 1
+                self.overruns += 1
+                self.skipped += missed
+                next_tick += missed * self.interval
+            if next_tick >= end:
+                break
+            before = time.monotonic()
+            time.sleep(max(0.0, next_tick - before))
+            self.slept += time.monotonic() - before
+        self.elapsed = time.monotonic() - start
+
+    def stats(self):
+        """
+        Sampling statistics of the last run (also valid if the loop was left early).
+
+        Achieved rate is the inverse of the mean actual spacing between consecutive
+        samples; jitter is the standard deviation of that spacing.
+        """
+        if self._start is not None and not self.elapsed:
+            self.elapsed = time.monotonic() - self._start
+        jitter = (self._gap_m2 / self._gaps) ** 0.5 if self._gaps else 0.0
+        return {
+            "interval": self.interval,
+            "duration": self.duration,
+            "samples": self.ticks,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped,
+            "max_lateness_s": round(self.max_lateness, 6),
+            "mean_lateness_s": round(self.total_lateness / self.ticks, 6) if self.ticks else 0.0,
+            "elapsed_s": round(self.elapsed, 6),
+            "sleep_s": round(self.slept, 6),
+            "requested_rate_hz": round(1.0 / self.interval, 6),
+            "achieved_rate_hz": round(1.0 / self._gap_mean, 6) if self._gaps and self._gap_mean else None,
+            "mean_gap_s": round(self._gap_mean, 6) if self._gaps else None,
+            "jitter_ms": round(jitter * 1000, 3)
+        }
+
+
+class PeriodicScheduler:
+    def __init__(self, max_workers=1):
+        """
+        Heap-based scheduler running each job on its own period (monotonic clock).
+
+        Jobs are due at start + n * period. A job that is still running, or that
+        the scheduler reaches late, skips the missed slots (counted as overruns)
+        instead of running back-to-back to catch up. With max_workers > 1 jobs
+        run on a thread pool, otherwise inline on the scheduler thread.
+
+        Inline jobs run one at a time: while one job runs, every other job that
+        falls due waits for it and skips the slots it missed. A 0.5 s job next to
+        a job that takes 1 s therefore runs about once per second, not twice.
+        Give jobs that must keep their period a worker each (max_workers >= number of jobs).
+
+        :param max_workers: Number of jobs allowed to run at the same time.
+        """
+        self._heap = []
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        self.max_workers = max(1, max_workers or 1)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers) if max_workers and max_workers > 1 else None
+        self.jobs = []
+
+    def add(self, name, period, func, delay=0.0):
+        """
+        Schedule func() every `period` seconds, first after `delay` seconds.
+        """
+        if period <= 0:
+            raise ValueError(f"Period of '{name}' must be positive.")
+        job = {"name": name, "period": float(period), "func": func, "runs": 0, "errors": 0,
+               "overruns": 0, "skipped": 0, "running": False, "last_duration_s": None}
+        self.jobs.append(job)
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), job))
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def _execute(self, job):
+        started = time.monotonic()
+        try:
+            job["func"]()
+        except Exception as e:
+            job["errors"] += 1
+            print(f"[WARNING] Scheduled job '{job['name']}' failed: {e}")
+        finally:
+            job["runs"] += 1
+            job["last_duration_s"] = round(time.monotonic() - started, 6)
+            job["running"] = False
+
+    def run(self, duration=None):
+        """
+        Run jobs until stop() is called (or for `duration` seconds).
+        """
+        end = None if duration is None else time.monotonic() + duration
+        try:
+            while self._heap and not self._stop.is_set():
+                due, _, job = self._heap[0]
+                now = time.monotonic()
+                if end is not None and now >= end:
+                    break
+                if due > now:
+                    self._stop.wait(due - now if end is None else min(due, end) - now)
+                    continue
+                heapq.heappop(self._heap)
+                if job["running"]:
+                    job["overruns"] += 1
+                    job["skipped"] += 1
+                else:
+                    job["running"] = True
+                    if self._pool is None:
+                        self._execute(job)
+                    else:
+                        self._pool.submit(self._execute, job)
+                next_due = due + job["period"]
+                now = time.monotonic()
+                if now > next_due:
+                    missed = int((now - next_due) // job["period"]) + 1
+                    job["overruns"] += 1
+                    job["skipped"] += missed
+                    next_due += missed * job["period"]
+                heapq.heappush(self._heap, (next_due, next(self._seq), job))
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+
+    def stats(self):
+        return [{k: v for k, v in job.items() if k not in ("func", "running")} for job in self.jobs]
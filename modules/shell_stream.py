@@ -0,0 +1,182 @@
+import codecs
+import os
+import re
+import selectors
+import signal
+import subprocess
+import time
+
+CHUNK_SIZE = 65536
+
+
+class HeadTailBuffer:
+    def __init__(self, head=2000, tail=2000):
+        """
+        Keeps only the first `head` and last `tail` characters of a stream.
+        """
+        self.head_size = head
+        self.tail_size = tail
+        self.head = ""
+        self.tail = ""
+        self.total = 0
+
+    def feed(self, text):
+        self.total += len(text)
+        if len(self.head) < self.head_size:
+            take = self.head_size - len(self.head)
+            self.head += text[:take]
+            text = text[take:]
+        if text and self.tail_size:
+            self.tail = (self.tail + text)[-self.tail_size:]
+
+    def excerpt(self):
+        omitted = self.total - len(self.head) - len(self.tail)
+        if omitted > 0:
+            return f"{self.head}\n... [{omitted} chars omitted] ...\n{self.tail}"
+        return self.head + self.tail
+
+
+class StreamMatcher:
+    def __init__(self, contains=None, regex=None, regex_window=4096):
+        """
+        Incremental substring / regex matching over a chunked stream.
+
+        When both a substring and a regex are given, each is tracked separately in
+        `found` and the stream only counts as matched once both were seen.
+
+        A tail of the previous chunk is carried over so matches that straddle chunk
+        boundaries are found: len(contains) - 1 chars for substrings, `regex_window`
+        chars for regexes (regex matches longer than the window may be missed).
+        For regexes one more char is carried as context only, so ^, \b and lookbehinds
+        see the real preceding char instead of treating the cut as a line/string start.
+        """
+        self.contains = contains or None
+        self.pattern = re.compile(regex, re.MULTILINE) if regex else None
+        self.regex_window = regex_window
+        self.found = {}
+        if self.contains is not None:
+            self.found["contains"] = False
+        if self.pattern is not None:
+            self.found["regex"] = False
+        self._carry = ""
+        self._seen = 0
+
+    @property
+    def active(self):
+        return bool(self.found)
+
+    @property
+    def matched(self):
+        return self.active and all(self.found.values())
+
+    def feed(self, text):
+        if self.matched or not self.active or not text:
+            return self.matched
+        window = self._carry + text
+        # The carried context char (if any) was not at the start of the stream
+        pos = 1 if self._seen > len(self._carry) else 0
+        self._seen += len(text)
+        keep = 0
+        if self.found.get("contains") is False:
+            self.found["contains"] = self.contains in window
+            keep = len(self.contains) - 1
+        if self.found.get("regex") is False:
+            self.found["regex"] = self.pattern.search(window, pos) is not None
+            keep = max(keep, self.regex_window + 1)
+        self._carry = window[-keep:] if keep > 0 else ""
+        return self.matched
+
+
+class StreamResult:
+    def __init__(self):
+        self.returncode = None
+        self.stdout = ""
+        self.stderr = ""
+        self.stdout_chars = 0
+        self.stderr_chars = 0
+        self.matched = False
+        self.matches = {}
+        self.terminated = False
+        self.spawn_s = 0.0
+        self.wait_s = 0.0
+
+
+def _kill_group(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        proc.kill()
+
+
+def run_streaming(cmd, contains=None, regex=None, timeout=30, terminate_on_match=False, head=2000, tail=2000):
+    """
+    Run a shell command, matching its stdout/stderr incrementally as it is read.
+
+    `contains` and `regex` may each be found on stdout or stderr (but not across
+    them). With both, the command matches only if both are found; result.matches
+    tells which ones were. Only a head/tail excerpt of each stream is kept. With
+    terminate_on_match the process (group) is killed as soon as it matches.
+
+    POSIX only: the command runs in its own session (start_new_session) so the
+    whole process group can be killed, and the pipes are polled with selectors,
+    which Windows does not support for pipes.
+
+    :raises subprocess.TimeoutExpired: if the command runs longer than `timeout` seconds.
+    :return: StreamResult (spawn_s: time to start the process, wait_s: time reading/waiting for it).
+    """
+    started = time.monotonic()
+    proc = subprocess.Popen(
+        cmd, shell=True, stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        start_new_session=True
+    )
+    result = StreamResult()
+    result.spawn_s = time.monotonic() - started
+    started = time.monotonic()
+    buffers = {"stdout": HeadTailBuffer(head, tail), "stderr": HeadTailBuffer(head, tail)}
+    matchers = {"stdout": StreamMatcher(contains, regex), "stderr": StreamMatcher(contains, regex)}
+    decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace") for name in buffers}
+    result.matches = dict.fromkeys(matchers["stdout"].found, False)
+    sel = selectors.DefaultSelector()
+    sel.register(proc.stdout, selectors.EVENT_READ, "stdout")
+    sel.register(proc.stderr, selectors.EVENT_READ, "stderr")
+    deadline = time.monotonic() + timeout
+    try:
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                _kill_group(proc)
+                proc.wait()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            for key, _ in sel.select(remaining):
+                name = key.data
+                chunk = os.read(key.fileobj.fileno(), CHUNK_SIZE)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    text = decoders[name].decode(b"", final=True)
+                else:
+                    text = decoders[name].decode(chunk)
+                buffers[name].feed(text)
+                matchers[name].feed(text)
+                for kind, found in matchers[name].found.items():
+                    result.matches[kind] = result.matches[kind] or found
+                result.matched = bool(result.matches) and all(result.matches.values())
+            if result.matched and terminate_on_match:
+                _kill_group(proc)
+                result.terminated = True
+                break
+        result.returncode = proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        _kill_group(proc)
+        proc.wait()
+        raise
+    finally:
+        sel.close()
+        proc.stdout.close()
+        proc.stderr.close()
+    result.wait_s = time.monotonic() - started
+    result.stdout = buffers["stdout"].excerpt()
+    result.stderr = buffers["stderr"].excerpt()
+    result.stdout_chars = buffers["stdout"].total
+    result.stderr_chars = buffers["stderr"].total
+    return result
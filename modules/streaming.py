@@ -0,0 +1,103 @@
+import bisect
+import math
+
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, size, dtype=float):
+        """
+        Fixed-size circular buffer backed by a preallocated NumPy array.
+
+        :param size: Maximum number of values kept.
+        :param dtype: NumPy dtype of the stored values.
+        """
+        if size < 1:
+            raise ValueError("RingBuffer size must be at least 1.")
+        self.size = size
+        self._data = np.empty(size, dtype=dtype)
+        self._pos = 0
+        self._count = 0
+
+    def append(self, value):
+        """
+        Store a value in O(1). Returns the evicted value, or None if the buffer was not full.
+        """
+        evicted = self._data[self._pos].item() if self._count == self.size else None
+        self._data[self._pos] = value
+        self._pos = (self._pos + 1) % self.size
+        if self._count < self.size:
+            self._count += 1
+        return evicted
+
+    def to_array(self):
+        """
+        Return the stored values in insertion order (oldest first).
+        """
+        if self._count < self.size:
+            return self._data[:self._count].copy()
+        return np.concatenate((self._data[self._pos:], self._data[:self._pos]))
+
+    def clear(self):
+        self._pos = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.to_array()
+        return arr if dtype is None else arr.astype(dtype)
+
+
+class SlidingQuantiles:
+    def __init__(self, size):
+        """
+        Sorted sliding window giving exact percentiles over the last `size` values.
+        Insert/evict locate their slot by binary search (O(log n) comparisons) and shift
+        the list tail (an O(n) memmove, cheap for history-sized windows); percentiles are
+        read in O(1), using the same linear interpolation as np.percentile.
+        Non-finite values (NaN, +/-inf) are not kept, so percentiles are those of the
+        finite values of the window (np.nanpercentile for NaN).
+
+        :param size: Window size.
+        """
+        self.size = size
+        self._sorted = []
+
+    def update(self, value, evicted=None):
+        """
+        Add a value and drop the one that left the window (as returned by RingBuffer.append).
+        Returns False if the value is not finite and was skipped.
+        """
+        if evicted is not None and math.isfinite(evicted):
+            idx = bisect.bisect_left(self._sorted, evicted)
+            if idx < len(self._sorted) and self._sorted[idx] == evicted:
+                del self._sorted[idx]
+        value = float(value)
+        if not math.isfinite(value):
+            return False
+        bisect.insort(self._sorted, value)
+        return True
+
+    def percentile(self, q):
+        n = len(self._sorted)
+        if n == 0:
+            raise ValueError("No values in window.")
+        rank = q / 100.0 * (n - 1)
+        lo = math.floor(rank)
+        hi = min(lo + 1, n - 1)
+        frac = rank - lo
+        return self._sorted[lo] + (self._sorted[hi] - self._sorted[lo]) * frac
+
+    def percentiles(self, qs):
+        return np.array([self.percentile(q) for q in qs])
+
+    def clear(self):
+        self._sorted = []
+
+    def __len__(self):
+        return len(self._sorted)
@@ -1,9 +1,14 @@
 import psutil
 import platform
 import os
+import sys
+import json
 import time
+import shutil
+import hashlib
 import subprocess
 import socket
+import threading
 
 class SystemMetrics:
     @staticmethod
@@ -23,12 +28,10 @@ class SystemMetrics:
         return time.time() - psutil.boot_time()
     @staticmethod
     def network_stats():
-        stats = psutil.net_io_counters()
-        return {k: getattr(stats, k) for k in stats._fields}
+        return psutil.net_io_counters()._asdict()
     @staticmethod
     def disk_io():
-        io = psutil.disk_io_counters()
-        return {k: getattr(io, k) for k in io._fields}
+        return psutil.disk_io_counters()._asdict()
     @staticmethod
     def load_avg():
         if hasattr(os, "getloadavg"):
@@ -52,43 +55,427 @@ class SystemMetrics:
     def register_metric(cls, name, func):
         cls._custom_metrics[name] = func
     @classmethod
-    def get_metric_func(cls, name):
+    def get_metric_func(cls, name, device=None):
+        if name in RATE_METRICS:
+            return RateMetric(name, device=device).prime()
+        if name == "cpu_percent":
+            return CpuPercentMetric().prime()
         if hasattr(cls, name):
             return getattr(cls, name)
         if name in cls._custom_metrics:
             return cls._custom_metrics[name]
+        from modules.plugin_loader import get_registry
+        func = get_registry().get(name)
+        if func is not None:
+            return func
         raise KeyError(f"Metric '{name}' not found in SystemMetrics.")
     @classmethod
     def list_metrics(cls):
+        """
+        Built-in, rate, registered and plugin metric names. Plugin names come from the
+        plugin manifest; no plugin is imported.
+        """
+        from modules.plugin_loader import get_registry
         base_metrics = [m for m in dir(cls) if not m.startswith("_") and callable(getattr(cls, m))]
         custom_metrics = list(cls._custom_metrics.keys())
-        return base_metrics + custom_metrics
+        names = base_metrics + list(RATE_METRICS) + custom_metrics
+        return names + [m for m in get_registry().names() if m not in names]
 
-def get_extended_system_info():
-    info = {
+# Derived rate metrics: name -> (counter source, counter field, scale)
+RATE_METRICS = {
+    "net_rx_bytes_per_s": ("net", "bytes_recv", 1.0),
+    "net_tx_bytes_per_s": ("net", "bytes_sent", 1.0),
+    "net_rx_packets_per_s": ("net", "packets_recv", 1.0),
+    "net_tx_packets_per_s": ("net", "packets_sent", 1.0),
+    "disk_read_bytes_per_s": ("disk", "read_bytes", 1.0),
+    "disk_write_bytes_per_s": ("disk", "write_bytes", 1.0),
+    "disk_read_iops": ("disk", "read_count", 1.0),
+    "disk_write_iops": ("disk", "write_count", 1.0),
+    # busy_time is in ms: ms per second / 10 == percent of wall time
+    "disk_busy_percent": ("disk", "busy_time", 0.1),
+}
+
+COUNTER_WRAP = 2 ** 32
+
+
+def _read_counter(source, field, device):
+    if source == "net":
+        counters = psutil.net_io_counters(pernic=True).get(device) if device else psutil.net_io_counters()
+    else:
+        counters = psutil.disk_io_counters(perdisk=True).get(device) if device else psutil.disk_io_counters()
+    if counters is None:
+        return None
+    return getattr(counters, field, None)
+
+
+class RateMetric:
+    __slots__ = ("name", "device", "_source", "_field", "_scale", "_prime", "_last", "_last_ts", "_rate")
+
+    def __init__(self, name, device=None, prime=0.1):
+        """
+        Per-second rate of a cumulative psutil counter, computed from deltas between
+        monotonic-timestamped reads. Counter wraps (32-bit) and resets are handled.
+
+        :param name: One of RATE_METRICS.
+        :param device: Network interface or disk name (e.g. "eth0", "sda"); None for the system total.
+        :param prime: Seconds between the baseline read and the first rate read (see prime()).
+        """
+        self.name = name
+        self.device = device
+        self._source, self._field, self._scale = RATE_METRICS[name]
+        self._prime = prime
+        self._last = None
+        self._last_ts = None
+        self._rate = 0.0
+
+    def _sample(self):
+        return _read_counter(self._source, self._field, self.device), time.monotonic()
+
+    def prime(self):
+        """
+        Take the baseline read and wait `prime` seconds, so the first call already
+        returns a rate. Done when the metric function is built, outside the sampling loop.
+        """
+        value, ts = self._sample()
+        if value is not None:
+            self._last, self._last_ts = value, ts
+            time.sleep(self._prime)
+        return self
+
+    def __call__(self):
+        if self._last is None:
+            # Not primed (or the counter was unavailable then)
+            self.prime()
+        value, ts = self._sample()
+        if value is None:
+            return -1
+        if self._last is None:
+            self._last, self._last_ts = value, ts
+            return self._rate
+        elapsed = ts - self._last_ts
+        if elapsed <= 0:
+            return self._rate
+        delta = value - self._last
+        if delta < 0:
+            wrapped = delta + COUNTER_WRAP
+            if self._last < COUNTER_WRAP and 0 <= wrapped < COUNTER_WRAP // 2:
+                delta = wrapped
+            else:
+                # Counter reset (e.g. interface re-created): start over from this read
+                delta = 0
+        self._last, self._last_ts = value, ts
+        self._rate = delta / elapsed * self._scale
+        return self._rate
+
+class CpuPercentMetric:
+    __slots__ = ("_prime", "_last", "_percent")
+
+    def __init__(self, prime=0.1):
+        """
+        System CPU utilisation in percent, computed like psutil.cpu_percent() but from
+        this instance's own cpu_times() baseline. psutil.cpu_percent(interval=None) keeps
+        one global baseline, so steps sampling it concurrently would reset each other's
+        window; each step gets its own instance instead.
+
+        :param prime: Seconds between the baseline read and the first read (see prime()).
+        """
+        self._prime = prime
+        self._last = None
+        self._percent = 0.0
+
+    @staticmethod
+    def _sample():
+        times = psutil.cpu_times()
+        # guest time is already counted in user/nice on Linux
+        total = sum(times) - getattr(times, "guest", 0.0) - getattr(times, "guest_nice", 0.0)
+        busy = total - times.idle - getattr(times, "iowait", 0.0)
+        return busy, total
+
+    def prime(self):
+        """
+        Take the baseline read and wait `prime` seconds, outside the sampling loop.
+        """
+        self._last = self._sample()
+        time.sleep(self._prime)
+        return self
+
+    def __call__(self):
+        busy, total = self._sample()
+        if self._last is None:
+            self._last = (busy, total)
+            return self._percent
+        last_busy, last_total = self._last
+        if total - last_total <= 0:
+            return self._percent
+        self._last = (busy, total)
+        self._percent = round(min(100.0, max(0.0, (busy - last_busy) / (total - last_total) * 100)), 1)
+        return self._percent
+
+def _load_avg():
+    if hasattr(os, "getloadavg"):
+        return os.getloadavg()
+    return (-1, -1, -1)
+
+# Snapshot sources: one psutil call each, shared by every metric derived from it
+SNAPSHOT_SOURCES = {
+    "cpu": lambda: psutil.cpu_percent(interval=None),
+    "virtual_memory": psutil.virtual_memory,
+    "swap_memory": psutil.swap_memory,
+    "disk_usage": lambda: psutil.disk_usage("/"),
+    "net_io": psutil.net_io_counters,
+    "disk_io": psutil.disk_io_counters,
+    "load_avg": _load_avg,
+    "pids": psutil.pids,
+    "boot_time": psutil.boot_time,
+}
+
+# Metric name -> (source, extractor)
+SNAPSHOT_METRICS = {
+    "cpu_percent": ("cpu", lambda v: v),
+    "ram_percent": ("virtual_memory", lambda v: v.percent),
+    "swap_percent": ("swap_memory", lambda v: v.percent),
+    "disk_percent": ("disk_usage", lambda v: v.percent),
+    "network_stats": ("net_io", lambda v: v._asdict()),
+    "disk_io": ("disk_io", lambda v: v._asdict()),
+    "load_avg": ("load_avg", lambda v: v),
+    "processes": ("pids", len),
+    "uptime": ("boot_time", lambda v: time.time() - v),
+}
+
+
+class SnapshotSampler:
+    def __init__(self, ttl=0.5):
+        """
+        Shared metric snapshot. When a metric is read and the snapshot is older than
+        `ttl` seconds, every requested source is refreshed in a single pass; other
+        reads within the TTL are served from the snapshot without any syscall.
+
+        :param ttl: Maximum snapshot age in seconds.
+        """
+        self.ttl = ttl
+        self._requested = set()
+        self._values = {}
+        self._taken_at = None
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.source_calls = 0
+        self.cache_hits = 0
+        self.reads = 0
+
+    @staticmethod
+    def supports(name):
+        return name in SNAPSHOT_METRICS
+
+    def request(self, *names):
+        """
+        Declare metrics that will be read so they are gathered in the same pass.
+        """
+        with self._lock:
+            for name in names:
+                self._requested.add(SNAPSHOT_METRICS[name][0])
+
+    def _refresh(self):
+        for source in self._requested:
+            self._values[source] = SNAPSHOT_SOURCES[source]()
+        self.source_calls += len(self._requested)
+        self.refreshes += 1
+        self._taken_at = time.monotonic()
+
+    def get(self, name):
+        source, extract = SNAPSHOT_METRICS[name]
+        with self._lock:
+            self.reads += 1
+            if source not in self._requested:
+                self._requested.add(source)
+                self._taken_at = None
+            if self._taken_at is None or time.monotonic() - self._taken_at > self.ttl:
+                self._refresh()
+            else:
+                self.cache_hits += 1
+            value = self._values[source]
+        return extract(value)
+
+    def metric_func(self, name):
+        """
+        Return a zero-argument callable reading `name` from the snapshot.
+        """
+        self.request(name)
+        return lambda: self.get(name)
+
+    def stats(self):
+        """
+        Counters for tuning the TTL. skipped_syscalls is the number of psutil calls
+        saved compared with calling each metric directly on every read.
+        """
+        return {
+            "ttl": self.ttl,
+            "reads": self.reads,
+            "refreshes": self.refreshes,
+            "source_calls": self.source_calls,
+            "cache_hits": self.cache_hits,
+            "skipped_syscalls": max(0, self.reads - self.source_calls)
+        }
+
+
+def _platform_section():
+    return {
         "platform": platform.platform(),
         "system": platform.system(),
         "release": platform.release(),
         "machine": platform.machine(),
-        "processor": platform.processor(),
         "python_version": platform.python_version(),
+        "hostname": socket.gethostname(),
+    }
+
+def _hardware_section():
+    freq = psutil.cpu_freq()
+    return {
+        "processor": platform.processor(),
         "cpu_count_logical": psutil.cpu_count(),
         "cpu_count_physical": psutil.cpu_count(logical=False),
-        "cpu_freq": psutil.cpu_freq()._asdict() if hasattr(psutil.cpu_freq(), '_asdict') else {},
+        "cpu_freq": {k: v for k, v in freq._asdict().items() if k != "current"} if hasattr(freq, '_asdict') else {},
         "memory_total_gb": round(psutil.virtual_memory().total / 1e9, 2),
-        "memory_avail_gb": round(psutil.virtual_memory().available / 1e9, 2),
         "swap_total_gb": round(psutil.swap_memory().total / 1e9, 2),
-        "hostname": socket.gethostname(),
-        "disk_info": {
-            d.mountpoint: dict(
-                total=psutil.disk_usage(d.mountpoint).total,
-                used=psutil.disk_usage(d.mountpoint).used,
-                free=psutil.disk_usage(d.mountpoint).free,
-                percent=psutil.disk_usage(d.mountpoint).percent
-            )
-            for d in psutil.disk_partitions(all=False) if d.mountpoint
-        },
-        "net_if_addrs": {iface: [x.address for x in psutil.net_if_addrs().get(iface, [])] for iface in psutil.net_if_addrs()},
-        "pip_freeze": subprocess.getoutput("pip freeze").splitlines()
     }
-    return info
\ No newline at end of file
+
+def _hardware_live(info):
+    # The current CPU frequency changes all the time: read it on every collection, never from the cache
+    freq = psutil.cpu_freq()
+    if hasattr(freq, "current"):
+        info["cpu_freq"] = {**info.get("cpu_freq", {}), "current": freq.current}
+
+def _memory_section():
+    return {"memory_avail_gb": round(psutil.virtual_memory().available / 1e9, 2)}
+
+def _disks_section():
+    disk_info = {}
+    for d in psutil.disk_partitions(all=False):
+        if not d.mountpoint:
+            continue
+        try:
+            usage = psutil.disk_usage(d.mountpoint)
+        except OSError:
+            continue
+        disk_info[d.mountpoint] = dict(total=usage.total, used=usage.used, free=usage.free, percent=usage.percent)
+    return {"disk_info": disk_info}
+
+def _network_section():
+    addrs = psutil.net_if_addrs()
+    return {"net_if_addrs": {iface: [x.address for x in entries] for iface, entries in addrs.items()}}
+
+def _pip_section():
+    return {"pip_freeze": subprocess.getoutput("pip freeze").splitlines()}
+
+def _site_packages_key():
+    parts = [sys.executable, shutil.which("pip") or ""]
+    for entry in sys.path:
+        if "site-packages" in entry and os.path.isdir(entry):
+            parts.append(f"{entry}:{os.stat(entry).st_mtime_ns}")
+    return "|".join(parts)
+
+def _hardware_key():
+    return f"{socket.gethostname()}|{platform.platform()}|{psutil.boot_time()}"
+
+# Section name -> (collector, cache key function or None if not cached,
+#                  function updating the volatile fields of a cached section in place or None)
+SYSTEM_INFO_SECTIONS = {
+    "platform": (_platform_section, None, None),
+    "hardware": (_hardware_section, _hardware_key, _hardware_live),
+    "memory": (_memory_section, None, None),
+    "disks": (_disks_section, None, None),
+    "network": (_network_section, None, None),
+    "pip": (_pip_section, _site_packages_key, None),
+}
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pyfuzzyflow")
+
+def _cached_section(name, collect, key_func, cache_dir):
+    key = hashlib.sha256(key_func().encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"sysinfo_{name}_{key}.json")
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    data = collect()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, default=str)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return data
+
+def get_extended_system_info(sections=None, cache_dir=None):
+    """
+    Collect extended system information.
+
+    Each psutil source is queried once. Slow-changing sections ("hardware", "pip")
+    are cached on disk under a hash of what invalidates them (boot/host for
+    hardware, interpreter and site-packages mtimes for pip). Volatile fields of a
+    cached section (the current CPU frequency) are read fresh every time.
+
+    :param sections: Section names to collect (default: all of SYSTEM_INFO_SECTIONS).
+    :param cache_dir: Cache directory, or False to disable caching.
+    """
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    info = {}
+    for name in sections or SYSTEM_INFO_SECTIONS:
+        if name not in SYSTEM_INFO_SECTIONS:
+            print(f"[WARNING] Unknown system info section '{name}'. Use one of {', '.join(SYSTEM_INFO_SECTIONS)}.")
+            continue
+        collect, key_func, live = SYSTEM_INFO_SECTIONS[name]
+        if key_func is not None and cache_dir:
+            data = _cached_section(name, collect, key_func, cache_dir)
+        else:
+            data = collect()
+        if live is not None:
+            live(data)
+        info.update(data)
+    return info
+
+class SystemInfoCollector:
+    def __init__(self, sections=None, cache_dir=None):
+        """
+        Collects extended system info on a background thread so the first steps
+        do not wait for it. Call result() to get the info dict, or pass a callback
+        to start() to receive it without blocking.
+        """
+        self._result = None
+        self._error = None
+        self._on_done = None
+        self._thread = threading.Thread(target=self._run, args=(sections, cache_dir), name="SystemInfoCollector", daemon=True)
+
+    def _run(self, sections, cache_dir):
+        try:
+            self._result = get_extended_system_info(sections, cache_dir)
+        except Exception as e:
+            self._error = e
+        if self._on_done is not None:
+            try:
+                self._on_done(self._info())
+            except Exception as e:
+                print(f"[WARNING] System info callback failed: {e}")
+
+    def start(self, on_done=None):
+        """
+        :param on_done: Optional callable called with the info dict on the collector thread
+                        once collection finishes (result() waits for it to return).
+        """
+        self._on_done = on_done
+        self._thread.start()
+        return self
+
+    def _info(self):
+        if self._error is not None:
+            return {"error": str(self._error)}
+        return self._result or {}
+
+    def result(self, timeout=None):
+        self._thread.join(timeout)
+        return self._info()
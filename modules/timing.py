@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PROFILE_MODES = ("cpu", "memory", "all")
+
+# Only one cProfile profiler can be active at a time (Python 3.12+ raises otherwise), so
+# concurrently running steps take turns: a step that finds it busy is not CPU-profiled.
+_CPU_LOCK = threading.Lock()
+
+# tracemalloc is process-wide: concurrently profiled steps share one tracing session,
+# started by the first active profiler and stopped by the last one.
+_TRACE_LOCK = threading.Lock()
+_trace_users = 0
+_trace_started = False
+
+
+class PhaseTimer:
+    def __init__(self):
+        """
+        Accumulates monotonic (perf_counter) durations per named phase of a step:
+        call count, total, min and max.
+        """
+        self.phases = {}
+
+    def add(self, name, seconds, count=1):
+        """
+        Add `count` occurrences taking `seconds` in total (min/max use their mean).
+        """
+        each = seconds / count if count else seconds
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [count, seconds, each, each]
+        else:
+            entry[0] += count
+            entry[1] += seconds
+            entry[2] = min(entry[2], each)
+            entry[3] = max(entry[3], each)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, name, func, *args, **kwargs):
+        """
+        Call func(*args, **kwargs) and add its duration to `name`. Returns func's result.
+        """
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def summary(self):
+        """
+        Dict phase -> {"count", "total_s", "mean_ms", "min_ms", "max_ms"}.
+        """
+        return {
+            name: {
+                "count": count,
+                "total_s": round(total, 6),
+                "mean_ms": round(total / count * 1000, 3) if count else None,
+                "min_ms": round(shortest * 1000, 3),
+                "max_ms": round(longest * 1000, 3)
+            }
+            for name, (count, total, shortest, longest) in self.phases.items()
+        }
+
+
+def format_timing_table(rows):
+    """
+    Text table of per-step phase totals.
+
+    :param rows: List of (step, duration_s, phases) where phases is a PhaseTimer.summary() dict.
+    :return: List of lines.
+    """
+    phases = []
+    for _, _, summary in rows:
+        phases.extend(p for p in summary if p not in phases)
+    width = max([len(step) for step, _, _ in rows] + [4])
+    header = f"{'STEP'.ljust(width)}  {'TOTAL':>9}" + "".join(f"  {p[:14]:>14}" for p in phases)
+    lines = [header]
+    for step, duration, summary in rows:
+        cells = "".join(
+            f"  {summary[p]['total_s']:13.3f}s" if p in summary else f"  {'-':>14}" for p in phases
+        )
+        lines.append(f"{step[:width].ljust(width)}  {duration:8.3f}s{cells}")
+    return lines
+
+
+class StepProfiler:
+    def __init__(self, mode, out_dir, name):
+        """
+        Optional per-step profiling: cProfile ("cpu"), tracemalloc ("memory") or both ("all").
+
+        The cProfile data is written to <out_dir>/<name>.prof (open it with pstats or snakeviz).
+        Only one step is CPU-profiled at a time; a step starting while another one is profiled
+        (or while another profiling tool is active) skips CPU profiling with a warning.
+        tracemalloc is process-wide, so memory figures of concurrently running steps overlap.
+
+        :param mode: One of PROFILE_MODES, or None to disable.
+        :param out_dir: Directory for .prof files.
+        :param name: File name stem for this step.
+        """
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}. Use one of {', '.join(PROFILE_MODES)}.")
+        self.cpu = mode in ("cpu", "all")
+        self.memory = mode in ("memory", "all")
+        self.out_dir = out_dir
+        self.name = name
+        self._profile = None
+        self._tracing = False
+        self.cpu_skipped = None
+
+    def start(self):
+        if self.cpu:
+            self._start_cpu()
+        if self.memory:
+            global _trace_users, _trace_started
+            import tracemalloc
+            with _TRACE_LOCK:
+                if _trace_users == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _trace_started = True
+                _trace_users += 1
+                self._tracing = True
+            tracemalloc.reset_peak()
+            self._snapshot = tracemalloc.take_snapshot()
+        return self
+
+    def _start_cpu(self):
+        import cProfile
+        if not _CPU_LOCK.acquire(blocking=False):
+            self.cpu_skipped = "another step is being profiled"
+        else:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                self._profile = profile
+            except ValueError as e:
+                _CPU_LOCK.release()
+                self.cpu_skipped = str(e)
+        if self.cpu_skipped:
+            print(f"[WARNING] CPU profiling of {self.name} skipped: {self.cpu_skipped}.")
+
+    def stop(self, top=10):
+        """
+        Stop profiling. Returns a JSON-serializable summary (None if profiling is disabled).
+        """
+        result = {}
+        if self.cpu_skipped:
+            result["cpu_profile_skipped"] = self.cpu_skipped
+        try:
+            profile, self._profile = self._profile, None
+            if profile is not None:
+                import io
+                import pstats
+                try:
+                    profile.disable()
+                finally:
+                    _CPU_LOCK.release()
+                os.makedirs(self.out_dir, exist_ok=True)
+                path = os.path.join(self.out_dir, f"{self.name}.prof")
+                profile.dump_stats(path)
+                stream = io.StringIO()
+                pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(top)
+                result["cpu_profile"] = path
+                result["cpu_top"] = [line for line in stream.getvalue().splitlines() if line.strip()][-top:]
+        finally:
+            if self._tracing:
+                self._stop_tracing(result, top)
+        return result or None
+
+    def _stop_tracing(self, result, top):
+        global _trace_users, _trace_started
+        import tracemalloc
+        try:
+            current, peak = tracemalloc.get_traced_memory()
+            diff = tracemalloc.take_snapshot().compare_to(self._snapshot, "lineno")
+            result["memory_peak_kb"] = round(peak / 1024, 1)
+            result["memory_top"] = [str(stat) for stat in diff[:top]]
+        finally:
+            with _TRACE_LOCK:
+                self._tracing = False
+                _trace_users -= 1
+                if _trace_users == 0 and _trace_started:
+                    tracemalloc.stop()
+                    _trace_started = False
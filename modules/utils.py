@@ -6,6 +6,8 @@ import re
 import platform
 import json
 from modules.system_metrics import SystemMetrics
+from modules import coprocess
+from modules.coprocess import ShellCoprocess
 
 WHITELIST = [
     "ls", "cat", "echo", "pwd", "whoami", "uname", "date", "df", "free", "python3", "pip", "ps", "id"
@@ -27,10 +29,41 @@ def check_command_safety(cmd):
         print(f"[INFO] Command '{cmd}' is NOT in the safe WHITELIST. Use with caution.")
     return True
 
-def build_metric_func(step):
+def formula_namespace():
+    """
+    Globals a "parse_formula" is evaluated with: builtins and `re` only. The locals are
+    `match`, `result` (a CompletedProcess with returncode/stdout/stderr) and `stdout`.
+    """
+    return {"__builtins__": __builtins__, "re": re}
+
+def make_command_runner(cmd, shell_mode="spawn", timeout=15):
+    """
+    Callable running `cmd` and returning a subprocess.CompletedProcess.
+
+    :param shell_mode: "spawn" (a new shell per call) or "coprocess" (one persistent shell;
+                       stderr is discarded). Falls back to "spawn" where the coprocess is not
+                       supported (non-POSIX platforms).
+    """
+    if shell_mode not in ("spawn", "coprocess"):
+        raise ValueError(f"Unknown shell_mode '{shell_mode}'. Use 'spawn' or 'coprocess'.")
+    if shell_mode == "coprocess" and coprocess.SUPPORTED:
+        coproc = ShellCoprocess()
+
+        def run_coprocess():
+            returncode, stdout = coproc.run(cmd, timeout=timeout)
+            return subprocess.CompletedProcess(cmd, returncode, stdout, "")
+        run_coprocess.close = coproc.close
+        return run_coprocess
+
+    def run_spawn():
+        return subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=timeout)
+    return run_spawn
+
+def build_metric_func(step, snapshot=None):
     """
     Given a step dictionary, returns a callable for the metric.
     Supports custom_shell and all SystemMetrics.
+    If a SnapshotSampler is given, supported built-in metrics are read from the shared snapshot.
     """
     metric_func_name = step.get("metric_func")
     if not metric_func_name:
@@ -39,17 +72,23 @@ def build_metric_func(step):
         cmd = step.get("custom_command")
         regex = step.get("parse_regex")
         formula = step.get("parse_formula", "float(match.group(1))")
+        shell_mode = step.get("shell_mode", "spawn")
         if not cmd:
             raise ValueError("Missing 'custom_command' in custom_shell step.")
+        # Compile once per step instead of once per sample
+        pattern = re.compile(regex) if regex else None
+        code = compile(formula, "<parse_formula>", "eval")
+        run_command = make_command_runner(cmd, shell_mode)
+
         def custom_metric():
             try:
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=15)
+                result = run_command()
                 if result.returncode != 0:
                     return -1
-                if regex:
-                    match = re.search(regex, result.stdout)
+                if pattern:
+                    match = pattern.search(result.stdout)
                     if match:
-                        return eval(formula)
+                        return eval(code, formula_namespace(), {"match": match, "result": result, "stdout": result.stdout})
                     else:
                         return -1
                 else:
@@ -59,17 +98,29 @@ def build_metric_func(step):
                         return -1
             except Exception:
                 return -1
+        if hasattr(run_command, "close"):
+            custom_metric.close = run_command.close
         return custom_metric
+    elif snapshot is not None and snapshot.supports(metric_func_name) and metric_func_name not in SystemMetrics._custom_metrics:
+        return snapshot.metric_func(metric_func_name)
     else:
         try:
-            return SystemMetrics.get_metric_func(metric_func_name)
+            return SystemMetrics.get_metric_func(metric_func_name, device=step.get("device"))
         except KeyError:
             raise ValueError(f"Metric '{metric_func_name}' is not available. Use --list-metrics to see available ones.")
 
 def list_available_metrics():
-    print("Available metrics (built-in and custom):")
+    from modules.plugin_loader import get_registry
+    providers = get_registry().providers()
+    print("Available metrics (built-in, custom and plugins):")
     for m in sorted(SystemMetrics.list_metrics()):
-        print(f"  - {m}")
+        kind, target = providers.get(m, (None, None))
+        if kind == "cli":
+            print(f"  - {m} (--add-metric)")
+        elif kind is not None and not hasattr(SystemMetrics, m) and m not in SystemMetrics._custom_metrics:
+            print(f"  - {m} (plugin: {target})")
+        else:
+            print(f"  - {m}")
 
 def generate_example_testcase(filename=None):
     sysname = platform.system().lower()
@@ -102,18 +153,44 @@ def generate_example_testcase(filename=None):
         json.dump(example, f, indent=2)
     print(f"[INFO] Example testcase saved to {fname}")
 
-# Allow adding new metrics from CLI (for --add-metric)
-def register_cli_metric(name, command):
+def make_cli_metric(name, command, shell_mode="coprocess"):
     """
-    Registers a new metric in SystemMetrics class using a shell command.
+    Metric function for a shell command (--add-metric); the first token of its output is the value.
+    By default the command runs in a persistent shell coprocess, started on first use
+    (a new shell per call with shell_mode="spawn" or where the coprocess is not supported).
     """
+    run_command = make_command_runner(command, shell_mode)
+
     def custom_metric():
         try:
-            out = subprocess.check_output(command, shell=True, text=True)
-            return float(out.strip().split()[0])
+            result = run_command()
+            if result.returncode != 0:
+                raise RuntimeError(f"Command '{command}' returned {result.returncode}")
+            return float(result.stdout.strip().split()[0])
         except Exception as e:
             print(f"[ERROR] Custom metric '{name}': {e}")
             return -1
-    SystemMetrics.register_metric(name, custom_metric)
-    print(f"[INFO] Custom metric '{name}' registered.")
+    if hasattr(run_command, "close"):
+        custom_metric.close = run_command.close
+    return custom_metric
+
+# Allow adding new metrics from CLI (for --add-metric)
+def register_cli_metric(name, command, persist=True):
+    """
+    Registers a new metric in SystemMetrics class using a shell command.
+    With persist, the registration is also saved and available to later invocations.
+    """
+    SystemMetrics.register_metric(name, make_cli_metric(name, command))
+    if persist:
+        from modules.plugin_loader import save_cli_metric
+        path = save_cli_metric(name, command)
+        print(f"[INFO] Custom metric '{name}' registered and saved to {path}.")
+    else:
+        print(f"[INFO] Custom metric '{name}' registered.")
 
+def unregister_cli_metric(name):
+    from modules.plugin_loader import remove_cli_metric
+    if remove_cli_metric(name):
+        print(f"[INFO] Custom metric '{name}' removed.")
+    else:
+        print(f"[WARNING] Custom metric '{name}' is not registered.")
@@ -0,0 +1,95 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+
+from openpyxl import load_workbook
+
+from modules.batch import batch_run_id, discover_testcases, load_testcases, pass_fail_matrix
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSING = {"name": "ok", "steps": [
+    {"description": "echo", "type": "shell", "command": "echo hello", "eval_contains": "hello", "required": True}]}
+FAILING = {"name": "bad", "min_passed": 1, "steps": [
+    {"description": "echo", "type": "shell", "command": "echo hello", "eval_contains": "nope", "required": True},
+    {"description": "opt", "type": "boolean", "command": "false", "required": False},
+    {"description": "later", "type": "shell", "command": "true", "skip": True}]}
+
+
+def write_testcases(directory):
+    directory.mkdir(exist_ok=True)
+    for name, data in (("b_ok.json", PASSING), ("a_bad.json", FAILING), ("c_broken.json", {"steps": 3})):
+        (directory / name).write_text(json.dumps(data))
+    (directory / "notes.txt").write_text("not a testcase")
+    return directory
+
+
+def sheet_rows(path, name):
+    rows = list(load_workbook(path, read_only=True)[name].values)
+    return [dict(zip(rows[0], row)) for row in rows[1:]]
+
+
+def test_discover_expands_directories_and_globs_once(tmp_path):
+    cases = write_testcases(tmp_path / "cases")
+    found = discover_testcases([str(cases), str(cases / "b_*.json"), str(tmp_path / "missing.json")])
+    assert [os.path.basename(p) for p in found] == ["a_bad.json", "b_ok.json", "c_broken.json", "missing.json"]
+
+
+def test_load_testcases_separates_invalid_files(tmp_path):
+    cases = write_testcases(tmp_path / "cases")
+    (cases / "d_fuzzy.json").write_text(json.dumps({"steps": [{"type": "fuzzy"}, {"type": "nope"}, "x"]}))
+    (cases / "e_json.json").write_text("{")
+    testcases, errors = load_testcases(discover_testcases([str(cases)]))
+    assert [os.path.basename(p) for p, _ in testcases] == ["a_bad.json", "b_ok.json"]
+    errors = {os.path.basename(p): message for p, message in errors}
+    assert errors["c_broken.json"] == "'steps' must be a list"
+    assert errors["d_fuzzy.json"] == ("step 1 has no 'metric_func'; step 2 has unknown type 'nope'; "
+                                      "step 3 must be a JSON object")
+    assert "e_json.json" in errors
+    assert batch_run_id(2, "cases/Nightly Checks.json") == "03_nightly_checks"
+
+
+def test_pass_fail_matrix_unions_step_columns():
+    results = [
+        {"testcase": "a", "steps": [{"step": "x", "passed": True, "required": True},
+                                    {"step": "y", "passed": False, "required": False}], "skipped": ["z"]},
+        {"testcase": "b", "steps": [{"step": "w", "passed": False, "required": True},
+                                    {"step": "x", "passed": False, "required": True}]},
+    ]
+    columns, rows = pass_fail_matrix(results)
+    assert columns == ["x", "y", "z", "w"]
+    assert rows == [{"testcase": "a", "x": "PASS", "y": "FAIL (optional)", "z": "SKIP"},
+                    {"testcase": "b", "w": "FAIL", "x": "FAIL"}]
+
+
+def test_batch_run_aggregates_every_pipeline(tmp_path):
+    cases = write_testcases(tmp_path / "cases")
+    logdir = tmp_path / "logs"
+    proc = subprocess.run([sys.executable, "main.py", "--testcases", str(cases), "--logdir", str(logdir), "--jobs", "2"],
+                          cwd=ROOT, capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    assert "BATCH FINISHED: 1/3 pipelines passed" in proc.stdout
+
+    (batch_dir,) = glob.glob(str(logdir / "batch_*"))
+    # Each pipeline logs to its own run directory, with its console output kept out of the terminal
+    assert sorted(os.listdir(batch_dir)) == ["batch_report.html", "batch_report.xlsx", "run_01_a_bad", "run_02_b_ok"]
+    with open(os.path.join(batch_dir, "run_02_b_ok", "console.log")) as f:
+        assert "PIPELINE FINISHED" in f.read()
+    assert "PIPELINE FINISHED" not in proc.stdout
+
+    report = os.path.join(batch_dir, "batch_report.xlsx")
+    pipelines = sheet_rows(report, "Pipelines")
+    assert [(os.path.basename(r["testcase"]), r["result"]) for r in pipelines] == \
+        [("a_bad.json", "FAILED"), ("b_ok.json", "PASSED"), ("c_broken.json", "ERROR")]
+    assert (pipelines[0]["passed_steps"], pipelines[0]["required_steps"]) == (0, 1)
+    assert pipelines[2]["error"] == "'steps' must be a list"
+
+    matrix = {os.path.basename(r["testcase"]): r for r in sheet_rows(report, "Matrix")}
+    assert matrix["a_bad.json"]["echo"] == "FAIL"
+    assert matrix["a_bad.json"]["opt"] == "FAIL (optional)"
+    assert matrix["a_bad.json"]["later"] == "SKIP"
+    assert matrix["b_ok.json"]["echo"] == "PASS"
+    assert {os.path.basename(r["testcase"]) for r in sheet_rows(report, "Step Timings")} == {"a_bad.json", "b_ok.json"}
+    assert sheet_rows(report, "System Info")
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+
+import pytest
+
+from modules.coprocess import ShellCoprocess
+from modules.utils import build_metric_func, make_cli_metric
+
+
+@pytest.fixture
+def coproc():
+    shell = ShellCoprocess()
+    yield shell
+    shell.close()
+
+
+def test_output_and_exit_code_are_framed(coproc):
+    assert coproc.run("echo 42") == (0, "42\n")
+    assert coproc.run("printf 'a\\nb'") == (0, "a\nb")
+    assert coproc.run("exit 3") == (3, "")
+    assert coproc.run("echo again") == (0, "again\n")
+
+
+def test_output_without_trailing_newline_keeps_following_commands_aligned(coproc):
+    assert coproc.run("printf x") == (0, "x")
+    assert coproc.run("printf y") == (0, "y")
+
+
+def test_shell_state_does_not_leak_between_commands(coproc):
+    coproc.run("cd / && FOO=bar && set -e")
+    assert coproc.run("pwd")[1].strip() == os.getcwd()
+    assert coproc.run('echo "[$FOO]"') == (0, "[]\n")
+    assert coproc.run("false; echo still running") == (0, "still running\n")
+
+
+def test_exit_does_not_kill_the_shell(coproc):
+    coproc.run("echo 1")
+    pid = coproc.proc.pid
+    assert coproc.run("exit 0") == (0, "")
+    assert coproc.proc.pid == pid
+
+
+def test_timeout_kills_the_command_and_restarts(coproc, tmp_path):
+    pid_file = tmp_path / "pid"
+    started = time.monotonic()
+    assert coproc.run(f"sleep 30 & echo $! > {pid_file}; wait", timeout=0.5) == (None, "")
+    assert time.monotonic() - started < 5
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        try:
+            os.kill(child, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.05)
+    else:
+        pytest.fail("command of the timed out coprocess is still running")
+    assert coproc.run("echo back") == (0, "back\n")
+
+
+def test_concurrent_threads_get_their_own_output(coproc):
+    errors = []
+
+    def worker(n):
+        for i in range(30):
+            code, out = coproc.run(f"echo {n}-{i}")
+            if (code, out) != (0, f"{n}-{i}\n"):
+                errors.append((n, i, code, out))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_close_waits_for_a_running_command(coproc):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(r=coproc.run("sleep 0.3; echo done")))
+    thread.start()
+    time.sleep(0.1)
+    coproc.close()
+    thread.join()
+    assert result["r"] == (0, "done\n")
+
+
+@pytest.mark.parametrize("shell_mode", ["spawn", "coprocess"])
+def test_custom_shell_parsing(shell_mode):
+    func = build_metric_func({
+        "metric_func": "custom_shell",
+        "custom_command": "echo 'load: 1.5 2.5'",
+        "parse_regex": r"load: ([\d.]+) ([\d.]+)",
+        "parse_formula": "float(match.group(1)) + float(match.group(2))",
+        "shell_mode": shell_mode
+    })
+    try:
+        assert func() == 4.0
+    finally:
+        if hasattr(func, "close"):
+            func.close()
+
+
+def test_custom_shell_failures_return_minus_one():
+    no_match = build_metric_func({"metric_func": "custom_shell", "custom_command": "echo none",
+                                  "parse_regex": r"(\d+)"})
+    failing = build_metric_func({"metric_func": "custom_shell", "custom_command": "exit 1"})
+    not_a_number = build_metric_func({"metric_func": "custom_shell", "custom_command": "echo abc"})
+    assert no_match() == -1
+    assert failing() == -1
+    assert not_a_number() == -1
+
+
+@pytest.mark.parametrize("shell_mode", ["spawn", "coprocess"])
+def test_parse_formula_sees_the_baseline_names_only(shell_mode):
+    step = {"metric_func": "custom_shell", "custom_command": "echo 'value 7'", "parse_regex": r"value (\d+)",
+            "shell_mode": shell_mode}
+    with_result = build_metric_func(dict(step, parse_formula="float(result.stdout.split()[1]) + result.returncode"))
+    with_re = build_metric_func(dict(step, parse_formula="float(re.findall(r'\\d+', stdout)[0])"))
+    internals = build_metric_func(dict(step, parse_formula="len(WHITELIST)"))
+    try:
+        assert with_result() == 7.0
+        assert with_re() == 7.0
+        assert internals() == -1  # NameError: utils.py globals are not visible
+    finally:
+        for func in (with_result, with_re, internals):
+            if hasattr(func, "close"):
+                func.close()
+
+
+@pytest.mark.parametrize("shell_mode", ["spawn", "coprocess"])
+def test_cli_metric_shell_modes(shell_mode):
+    func = make_cli_metric("answer", "echo 42 extra", shell_mode=shell_mode)
+    try:
+        assert func() == 42.0
+    finally:
+        if hasattr(func, "close"):
+            func.close()
+    assert hasattr(func, "close") == (shell_mode == "coprocess")
+
+
+def test_coprocess_mode_falls_back_to_spawn_without_coprocess_support(monkeypatch):
+    from modules import coprocess
+    monkeypatch.setattr(coprocess, "SUPPORTED", False)
+    func = make_cli_metric("answer", "echo 42")
+    assert not hasattr(func, "close")
+    assert func() == 42.0
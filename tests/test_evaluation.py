@@ -0,0 +1,83 @@
+import pytest
+
+from modules.evaluation import LabelAggregator, expected_samples
+
+
+def feed(agg, labels):
+    """Feed labels until the aggregator asks to stop; returns the number consumed."""
+    for i, label in enumerate(labels, 1):
+        agg.update(label)
+        if agg.early_exit():
+            return i
+    return len(labels)
+
+
+def test_expected_samples_rounds_up_and_is_at_least_one():
+    assert expected_samples(10, 3) == 4
+    assert expected_samples(1, 5) == 1
+
+
+def test_any_never_exits_early():
+    agg = LabelAggregator("high", policy="any", expected_samples=5)
+    assert feed(agg, ["high", "low", "low", "low", "low"]) == 5
+    assert agg.result() is True
+
+
+def test_first_match_stops_on_the_first_match():
+    agg = LabelAggregator("high", policy="first_match", expected_samples=10)
+    assert feed(agg, ["low", "low", "high"] + ["low"] * 7) == 3
+    assert agg.result() is True
+
+
+def test_first_match_fails_when_label_never_seen():
+    agg = LabelAggregator("high", policy="first_match", expected_samples=3)
+    assert feed(agg, ["low"] * 3) == 3
+    assert agg.result() is False
+
+
+def test_fail_fast_stops_on_the_first_other_label():
+    agg = LabelAggregator("ok", policy="fail_fast", expected_samples=10)
+    assert feed(agg, ["ok", "ok", "bad"] + ["ok"] * 7) == 3
+    assert agg.result() is False
+
+
+def test_majority_decides_as_soon_as_the_outcome_is_fixed():
+    agg = LabelAggregator("high", policy="majority", expected_samples=5)
+    assert feed(agg, ["high"] * 5) == 3
+    assert agg.result() is True
+
+    agg = LabelAggregator("high", policy="majority", expected_samples=5)
+    assert feed(agg, ["low"] * 5) == 3
+    assert agg.result() is False
+
+
+def test_dwell_samples_needs_a_consecutive_run():
+    agg = LabelAggregator("high", policy="dwell", expected_samples=10, dwell_samples=3)
+    assert feed(agg, ["high", "high", "low", "high", "high", "high", "low"]) == 6
+    assert agg.result() is True
+    assert agg.summary()["longest_run"] == 3
+
+
+def test_dwell_samples_fails_once_the_run_cannot_be_reached():
+    agg = LabelAggregator("high", policy="dwell", expected_samples=5, dwell_samples=3)
+    assert feed(agg, ["high", "low", "high", "low", "high"]) == 4
+    assert agg.result() is False
+
+
+def test_dwell_fraction_counts_matches_over_the_window():
+    agg = LabelAggregator("high", policy="dwell", expected_samples=10, dwell_fraction=0.3)
+    assert feed(agg, ["high", "low", "high", "low", "high"] + ["low"] * 5) == 5
+    assert agg.result() is True
+
+
+def test_result_without_eval_label_is_none():
+    agg = LabelAggregator(None, policy="first_match", expected_samples=3)
+    assert feed(agg, ["high"] * 3) == 3
+    assert agg.result() is None
+
+
+def test_invalid_configuration_raises():
+    with pytest.raises(ValueError):
+        LabelAggregator("high", policy="sometimes")
+    with pytest.raises(ValueError):
+        LabelAggregator("high", policy="dwell")
@@ -0,0 +1,84 @@
+import threading
+import urllib.request
+
+import pytest
+
+from modules.exporter import CONTENT_TYPE, MetricsExporter, MetricsRegistry
+
+parser = pytest.importorskip("prometheus_client.openmetrics.parser")
+
+
+def parse(text):
+    return {family.name: family for family in parser.text_string_to_metric_families(text)}
+
+
+def sample_values(family):
+    return {tuple(sorted(s.labels.items())): s.value for s in family.samples}
+
+
+def make_registry():
+    registry = MetricsRegistry()
+    registry.set_info(pipeline='CPU "check"\nnightly', run_id="r1")
+    registry.step_state("Fuzzy CPU", "running", index=1)
+    for value, label in ((12.5, "LOW"), (float("nan"), "MED")):
+        registry.observe_fuzzy("Fuzzy CPU", "cpu_percent", value, label, ["LOW", "MED", "HIGH"],
+                               [0.7, 0.3, 0.0], thresholds=[10.0, 30.0, 70.0], index=1)
+    registry.step_state("Fuzzy CPU", "passed", 1.25, index=1)
+    registry.set("pipeline_passed", (), 1)
+    return registry
+
+
+def test_render_is_valid_openmetrics():
+    families = parse(make_registry().render())
+    assert families["pyfuzzyflow_pipeline"].type == "info"
+    info = families["pyfuzzyflow_pipeline"].samples[0]
+    assert info.labels["pipeline"] == 'CPU "check"\nnightly'
+
+    samples = sample_values(families["pyfuzzyflow_samples"])
+    assert samples == {(("step", "Fuzzy CPU"), ("step_index", "1")): 2}
+    assert families["pyfuzzyflow_samples"].type == "counter"
+
+    states = sample_values(families["pyfuzzyflow_step_state"])
+    passed = {labels: v for labels, v in states.items() if v == 1}
+    assert list(passed) == [(("pyfuzzyflow_step_state", "passed"), ("step", "Fuzzy CPU"), ("step_index", "1"))]
+
+    values = families["pyfuzzyflow_metric_value"].samples
+    assert len(values) == 1 and values[0].value != values[0].value  # NaN
+    thresholds = sample_values(families["pyfuzzyflow_threshold"])
+    assert sorted(thresholds.values()) == [10.0, 30.0, 70.0]
+    assert families["pyfuzzyflow_pipeline_passed"].samples[0].value == 1
+
+
+def test_steps_with_the_same_description_do_not_collide():
+    registry = MetricsRegistry()
+    for index in (1, 2):
+        registry.step_state("check", "passed", 0.5, index=index)
+    runs = sample_values(parse(registry.render())["pyfuzzyflow_step_runs"])
+    assert runs == {(("step", "check"), ("step_index", "1")): 1, (("step", "check"), ("step_index", "2")): 1}
+
+
+def test_concurrent_increments_are_not_lost():
+    registry = MetricsRegistry()
+    labels = (("step", "s"),)
+
+    def work():
+        for _ in range(2000):
+            registry.inc("samples", labels)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert registry._series[("samples", labels)] == 16000
+
+
+def test_exporter_serves_the_registry():
+    registry = make_registry()
+    exporter = MetricsExporter(registry, port=0).start()
+    try:
+        with urllib.request.urlopen(exporter.url, timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert "pyfuzzyflow_samples" in parse(response.read().decode())
+    finally:
+        exporter.stop()
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+import skfuzzy as fuzz
+
+from modules.fuzzy_validator import FuzzyValidator
+from modules.membership import SHAPES
+
+LABELS = {2: ["LOW", "HIGH"], 3: ["LOW", "MED", "HIGH"], 5: ["A", "B", "C", "D", "E"]}
+THRESHOLDS = {2: [20, 60], 3: [10, 30, 70], 5: [10, 25, 45, 65, 85]}
+
+
+def make_validator(n_labels=3, min_thresholds=None, **kwargs):
+    return FuzzyValidator(metric_func=None, thresholds=THRESHOLDS[n_labels], min_thresholds=min_thresholds, history_size=10,
+                          update_every=2, label_names=LABELS[n_labels], **kwargs)
+
+
+def legacy_classify(thresholds, value):
+    """The original per-sample three-label trapmf classification."""
+    low, med, high = np.sort(thresholds)
+    arr = np.array([value])
+    points = [sorted([0, 0, low * 0.8, low]), sorted([low * 0.8, low, med, high * 0.8]), sorted([med, high * 0.8, 100, 100])]
+    vals = [fuzz.trapmf(arr, pts)[0] for pts in points]
+    return int(np.argmax(vals)), vals
+
+
+def test_batch_matches_the_legacy_per_sample_classification():
+    values = np.linspace(-5, 105, 441)
+    idx, memberships = make_validator().classify_batch(values)
+    for value, i, row in zip(values, idx, memberships):
+        expected_idx, expected = legacy_classify([10, 30, 70], value)
+        assert i == expected_idx
+        assert np.allclose(row, expected)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@pytest.mark.parametrize("n_labels", [2, 3, 5])
+@pytest.mark.parametrize("lut_resolution", [None, 0.5])
+def test_classify_is_a_one_sample_batch(shape, n_labels, lut_resolution):
+    validator = make_validator(n_labels, shape=shape, lut_resolution=lut_resolution)
+    values = [0.0, 9.9, 10.0, 33.3, 50.0, 64.0, 99.5, 100.0, 120.0, -3.0]
+    idx, memberships = validator.classify_batch(values)
+    assert idx.shape == (len(values),)
+    assert memberships.shape == (len(values), n_labels)
+    for value, i, row in zip(values, idx, memberships):
+        label, single = validator.classify(value)
+        assert label == LABELS[n_labels][i]
+        assert np.allclose(single, row)
+
+
+def test_membership_parameters_are_rebuilt_only_when_thresholds_change(monkeypatch):
+    validator = make_validator(min_thresholds=[10, 30, 70])
+    rebuilds = []
+    set_thresholds = validator.engine.set_thresholds
+    monkeypatch.setattr(validator.engine, "set_thresholds", lambda t: rebuilds.append(list(t)) or set_thresholds(t))
+
+    for value in (5.0, 50.0, 95.0):
+        validator.classify(value)
+    validator.classify_batch(np.arange(100.0))
+    assert rebuilds == []
+
+    # Percentiles of a window below min_thresholds leave the thresholds unchanged
+    for _ in range(4):
+        validator.observe(1.0)
+    assert rebuilds == []
+
+    for value in (40.0, 50.0, 60.0, 80.0, 90.0, 95.0):
+        validator.observe(value)
+    assert len(rebuilds) >= 1
+    assert np.array_equal(rebuilds[-1], validator.thresholds)
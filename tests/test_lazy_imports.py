@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["numpy", "pandas", "openpyxl", "pyarrow", "sklearn", "skfuzzy"]
+
+# Run main() in a fresh interpreter, then report which of the heavy modules got imported
+PROBE = """
+import json, sys
+args, heavy = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+sys.argv = ["main.py"] + args
+import main
+main.main()
+print("LOADED=" + json.dumps([m for m in heavy if m in sys.modules]))
+"""
+
+
+def loaded_modules(*args):
+    proc = subprocess.run([sys.executable, "-c", PROBE, json.dumps(list(args)), json.dumps(HEAVY)], cwd=ROOT,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    output, _, loaded = proc.stdout.rpartition("LOADED=")
+    return output, json.loads(loaded)
+
+
+@pytest.mark.parametrize("args", [
+    ["--list-metrics"],
+    ["--testcase", "test_case_examples/test_case_multi.json", "--dry-run"],
+    ["--testcase", "test_case_examples/test_case_fuzzy_cpu.json", "--dry-run"],
+])
+def test_cheap_commands_do_not_import_heavy_modules(args):
+    output, loaded = loaded_modules(*args)
+    assert output.strip()
+    assert loaded == []
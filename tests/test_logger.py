@@ -0,0 +1,86 @@
+import json
+import os
+import time
+
+import pytest
+
+from modules.logger import ExecutionLogger
+
+
+def read_records(base_dir):
+    records = []
+    for name in sorted(os.listdir(base_dir)):
+        with open(os.path.join(base_dir, name)) as f:
+            records.extend(json.loads(line)["i"] for line in f)
+    return records
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_rotation_by_size_keeps_backup_count_files(tmp_path, background):
+    logger = ExecutionLogger(log_dir=str(tmp_path), run_id="t", fmt="jsonl", background=background,
+                             max_bytes=200, backup_count=2)
+    for i in range(50):
+        logger.log({"i": i, "pad": "x" * 40})
+    logger.close()
+    names = sorted(os.listdir(logger.base_dir))
+    assert logger.rotations > 2
+    assert len(names) == 3
+    assert names[-1] == "run_t.jsonl"
+    records = read_records(logger.base_dir)
+    # Oldest files were deleted; what is left is the contiguous tail of the stream
+    assert records == list(range(50 - len(records), 50))
+    for name in names:
+        assert os.path.getsize(os.path.join(logger.base_dir, name)) <= 200
+
+
+def test_rotation_keeps_all_files_without_backup_count(tmp_path):
+    logger = ExecutionLogger(log_dir=str(tmp_path), run_id="t", fmt="jsonl", background=False, max_bytes=100)
+    for i in range(20):
+        logger.log({"i": i, "pad": "x" * 40})
+    logger.close()
+    assert read_records(logger.base_dir) == list(range(20))
+    assert len(os.listdir(logger.base_dir)) == logger.rotations + 1
+
+
+def test_rotation_by_age(tmp_path):
+    logger = ExecutionLogger(log_dir=str(tmp_path), run_id="t", fmt="jsonl", background=False, max_age_s=0.01)
+    for i in range(3):
+        logger.log({"i": i})
+        time.sleep(0.02)
+    logger.close()
+    assert logger.rotations == 2
+    assert read_records(logger.base_dir) == [0, 1, 2]
+
+
+def test_background_writer_flushes_without_close(tmp_path):
+    logger = ExecutionLogger(log_dir=str(tmp_path), run_id="t", fmt="jsonl", flush_records=1000, flush_ms=20)
+    for i in range(5):
+        logger.log({"i": i})
+    deadline = time.monotonic() + 2
+    while read_records(logger.base_dir) != list(range(5)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert read_records(logger.base_dir) == list(range(5))
+    logger.close()
+
+
+def test_close_drains_the_queue_in_order(tmp_path):
+    logger = ExecutionLogger(log_dir=str(tmp_path), run_id="t", fmt="jsonl", flush_records=10 ** 6,
+                             flush_bytes=1 << 30, flush_ms=60_000)
+    for i in range(2000):
+        logger.log({"i": i})
+    logger.close()
+    assert not logger._thread.is_alive()
+    assert read_records(logger.base_dir) == list(range(2000))
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_records_after_close_are_dropped_with_a_warning(tmp_path, capsys, background):
+    logger = ExecutionLogger(log_dir=str(tmp_path), run_id="t", fmt="jsonl", background=background)
+    logger.log({"i": 0})
+    logger.close()
+    logger.log({"i": 1})
+    logger.log({"i": 2})
+    logger.close()
+    assert logger.dropped == 2
+    assert capsys.readouterr().out.count("[WARNING]") == 1
+    assert read_records(logger.base_dir) == [0]
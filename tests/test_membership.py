@@ -0,0 +1,66 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from modules.membership import SHAPES, MembershipEngine
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_lut_matches_analytic_inside_the_domain(shape):
+    analytic = MembershipEngine([10, 30, 70], 3, shape=shape)
+    lut = MembershipEngine([10, 30, 70], 3, shape=shape, lut_resolution=0.1)
+    grid = np.arange(0, 100.05, 0.1)
+    assert np.allclose(lut.evaluate(grid), analytic.evaluate(grid), atol=1e-9)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_non_finite_values_give_the_same_result_with_and_without_lut(shape):
+    values = [np.nan, np.inf, -np.inf, -5.0, 150.0, 50.0]
+    analytic = MembershipEngine([10, 30, 70], 3, shape=shape)
+    lut = MembershipEngine([10, 30, 70], 3, shape=shape, lut_resolution=1.0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        got = lut.evaluate(values)
+    expected = analytic.evaluate(values)
+    assert np.array_equal(np.isnan(got), np.isnan(expected))
+    assert np.allclose(got, expected, equal_nan=True)
+    assert not got[0].any()
+
+
+def test_set_thresholds_invalidates_the_lut():
+    engine = MembershipEngine([10, 30, 70], 3, lut_resolution=1.0)
+    before = engine.evaluate([25.0])
+    engine.set_thresholds([40, 60, 90])
+    assert not np.allclose(engine.evaluate([25.0]), before)
+    assert np.allclose(engine.evaluate([25.0]), MembershipEngine([40, 60, 90], 3).evaluate([25.0]))
+
+
+def test_threshold_count_must_match_labels():
+    with pytest.raises(ValueError):
+        MembershipEngine([10, 30], 3)
+
+
+def test_non_finite_thresholds_are_rejected():
+    with pytest.raises(ValueError):
+        MembershipEngine([10, np.nan, 70], 3)
+
+
+@pytest.mark.parametrize("lut_resolution", [None, 1.0])
+def test_validator_keeps_classifying_after_a_nan_sample(lut_resolution):
+    from modules.fuzzy_validator import FuzzyValidator
+    step = {"thresholds": [10, 30, 70], "min_thresholds": None, "history_size": 4, "update_every": 1,
+            "lut_resolution": lut_resolution}
+    validator = FuzzyValidator.from_step(step, None)
+    for value in [5.0, 50.0, float("nan"), 90.0, float("nan")]:
+        _, label, vals = validator.observe(value)
+        assert label in validator.label_names
+    assert np.isfinite(validator.thresholds).all()
+    # Restored state with a NaN in the history (e.g. an older state file) does not break it either
+    state = validator.get_state()
+    state["history"].append(float("nan"))
+    restored = FuzzyValidator.from_step(step, None)
+    restored.set_state(state)
+    restored.update_thresholds()
+    assert restored.observe(40.0)[1] in restored.label_names
+    assert np.isfinite(restored.thresholds).all()
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+
+from modules.fuzzy_validator import FuzzyValidator
+from modules.neuro_fuzzy import AnfisModel
+
+LABELS = ["LOW", "MED", "HIGH"]
+
+
+def _write_log(path, values):
+    with open(path, "w") as f:
+        for i, v in enumerate(values):
+            label = LABELS[min(2, int(v // 34))]
+            rec = {"step": "nf", "metric": "cpu_percent", "value": float(v), "label": label,
+                   "fuzzy": list(np.eye(3)[LABELS.index(label)])}
+            f.write(f"2025-01-01T00:00:{i % 60:02d} | {json.dumps(rec)}\n")
+
+
+def test_anfis_learns_classic_memberships():
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 100, 500)
+    targets = FuzzyValidator.from_step({"thresholds": [20, 50, 80]}, None).classify_batch(x)[1]
+    model = AnfisModel(n_rules=7).fit(x, targets, epochs=30)
+    agreement = (model.forward(x).argmax(axis=1) == targets.argmax(axis=1)).mean()
+    assert agreement > 0.9
+
+
+def test_log_samples_are_fitted_once_and_online_updates_use_the_history_window(tmp_path, monkeypatch):
+    log = tmp_path / "run.log"
+    _write_log(log, np.random.default_rng(1).uniform(0, 100, 3000))
+    sizes = []
+    original_fit = AnfisModel.fit
+
+    def recording_fit(self, values, targets, **kwargs):
+        sizes.append(len(values))
+        return original_fit(self, values, targets, **kwargs)
+
+    monkeypatch.setattr(AnfisModel, "fit", recording_fit)
+    step = {"type": "neuro_fuzzy", "metric_func": "cpu_percent", "history_size": 20, "update_every": 5,
+            "nf_train_logs": [str(log)]}
+    validator = FuzzyValidator.from_step(step, None)
+    assert sizes == [3000]
+    validator.replay(np.random.default_rng(2).uniform(0, 100, 200))
+    assert len(sizes) == 1 + 200 // 5
+    assert max(sizes[1:]) <= 20
+
+
+def test_online_update_keeps_the_trained_consequents_close():
+    rng = np.random.default_rng(3)
+    x = rng.uniform(0, 100, 1000)
+    targets = FuzzyValidator.from_step({}, None).classify_batch(x)[1]
+    model = AnfisModel().fit(x, targets)
+    before = model.forward(x)
+    window = rng.uniform(0, 20, 10)
+    model.fit(window, FuzzyValidator.from_step({}, None).classify_batch(window)[1], epochs=0, prior=5.0)
+    assert np.abs(model.forward(x) - before).mean() < 0.05
+
+
+def test_replay_matches_validate_in_neuro_fuzzy_mode():
+    values = np.random.default_rng(4).uniform(0, 100, 300)
+    step = {"type": "neuro_fuzzy", "history_size": 30, "update_every": 3}
+    replayed, _ = FuzzyValidator.from_step(step, None).replay(values)
+    it = iter(values)
+    live = FuzzyValidator.from_step(step, lambda: next(it))
+    labels = [live.label_names.index(live.validate()[1]) for _ in values]
+    assert labels == replayed.tolist()
+
+
+def test_model_path_without_suffix_is_saved_and_loaded_back(tmp_path):
+    step = {"type": "neuro_fuzzy", "thresholds": [20, 50, 80], "nf_model": str(tmp_path / "model")}
+    first = FuzzyValidator.from_step(step, None)
+    first.replay(np.random.default_rng(0).uniform(0, 100, 50))
+    assert first.nf_model.trained
+    first.save_neuro_fuzzy_model(step["nf_model"])
+    assert (tmp_path / "model.npz").exists()
+
+    second = FuzzyValidator.from_step(step, None)
+    assert second.nf_model.trained
+    assert np.allclose(second.nf_model.theta, first.nf_model.theta)
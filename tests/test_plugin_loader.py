@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+
+import pytest
+
+from modules.plugin_loader import PluginRegistry, save_cli_metric, scan_plugin_source
+
+PACKAGE = "fuzzyflow_test_plugins"
+
+
+@pytest.fixture
+def plugin_dir(tmp_path, monkeypatch):
+    directory = tmp_path / PACKAGE
+    directory.mkdir()
+    (directory / "__init__.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield directory
+    for name in [m for m in sys.modules if m == PACKAGE or m.startswith(PACKAGE + ".")]:
+        del sys.modules[name]
+
+
+def make_registry(plugin_dir, tmp_path, cache_dir=None):
+    return PluginRegistry(plugin_dir=str(plugin_dir), package=PACKAGE,
+                          cache_dir=str(tmp_path / "cache") if cache_dir is None else cache_dir,
+                          cli_path=str(tmp_path / "cli_metrics.json"), use_entry_points=False)
+
+
+def read_manifest(registry):
+    with open(registry.manifest_path) as f:
+        return json.load(f)
+
+
+def test_scan_reads_literal_metrics_dict():
+    source = "def a():\n    return 1\n\nMETRICS = {'alpha': a, 'beta': lambda: 2}\n"
+    assert scan_plugin_source(source) == ["alpha", "beta"]
+    assert scan_plugin_source("METRICS: dict = {'x': len}\n") == ["x"]
+    assert scan_plugin_source("import os\n") == []
+
+
+@pytest.mark.parametrize("source", [
+    "METRICS = dict(alpha=len)\n",
+    "METRICS = {NAME: len}\n",
+    "METRICS = {'a': len}\nMETRICS['b'] = len\n",
+    "METRICS = {'a': len}\nMETRICS.update(b=len)\n",
+    "METRICS = {'a': len}\nif True:\n    METRICS['b'] = len\n",
+])
+def test_scan_gives_up_on_dynamic_metrics(source):
+    assert scan_plugin_source(source) is None
+
+
+def test_manifest_lists_plugin_metrics_without_importing(plugin_dir, tmp_path):
+    (plugin_dir / "disk.py").write_text("METRICS = {'disk_a': lambda: 1.0, 'disk_b': lambda: 2.0}\n")
+    (plugin_dir / "_private.py").write_text("METRICS = {'hidden': lambda: 0.0}\n")
+    registry = make_registry(plugin_dir, tmp_path)
+
+    assert registry.names() == ["disk_a", "disk_b"]
+    assert f"{PACKAGE}.disk" not in sys.modules
+    entry = read_manifest(registry)["plugins"]["disk.py"]
+    assert entry["metrics"] == ["disk_a", "disk_b"]
+    assert entry["size"] == os.path.getsize(plugin_dir / "disk.py")
+
+    assert registry.get("disk_b")() == 2.0
+    assert f"{PACKAGE}.disk" in sys.modules
+    assert registry.get("missing") is None
+
+
+def test_dynamic_plugin_is_imported_to_list_its_metrics(plugin_dir, tmp_path):
+    (plugin_dir / "dyn.py").write_text("METRICS = {}\nfor i in range(2):\n    METRICS[f'dyn_{i}'] = lambda i=i: float(i)\n")
+    registry = make_registry(plugin_dir, tmp_path)
+    assert registry.names() == ["dyn_0", "dyn_1"]
+    assert read_manifest(registry)["plugins"]["dyn.py"]["metrics"] == ["dyn_0", "dyn_1"]
+
+
+def test_modified_plugin_rebuilds_the_manifest(plugin_dir, tmp_path):
+    path = plugin_dir / "net.py"
+    path.write_text("METRICS = {'net_rx': lambda: 1.0}\n")
+    assert make_registry(plugin_dir, tmp_path).names() == ["net_rx"]
+
+    path.write_text("METRICS = {'net_rx': lambda: 1.0, 'net_tx': lambda: 2.0}\n")
+    registry = make_registry(plugin_dir, tmp_path)
+    assert registry.names() == ["net_rx", "net_tx"]
+    entry = read_manifest(registry)["plugins"]["net.py"]
+    assert entry["metrics"] == ["net_rx", "net_tx"]
+    assert entry["size"] == os.path.getsize(path)
+    assert entry["mtime_ns"] == os.stat(path).st_mtime_ns
+
+
+def test_unchanged_manifest_entry_is_reused(plugin_dir, tmp_path):
+    path = plugin_dir / "cpu.py"
+    path.write_text("METRICS = {'cpu_x': lambda: 1.0}\n")
+    registry = make_registry(plugin_dir, tmp_path)
+    registry.names()
+
+    # A stale entry with matching mtime/size is trusted as is: no re-scan
+    manifest = read_manifest(registry)
+    manifest["plugins"]["cpu.py"]["metrics"] = ["from_manifest"]
+    with open(registry.manifest_path, "w") as f:
+        json.dump(manifest, f)
+    assert make_registry(plugin_dir, tmp_path).names() == ["from_manifest"]
+
+    # A touched file with the same content keeps its metrics via the SHA-256
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    registry = make_registry(plugin_dir, tmp_path)
+    assert registry.names() == ["from_manifest"]
+    assert read_manifest(registry)["plugins"]["cpu.py"]["mtime_ns"] == st.st_mtime_ns + 1_000_000_000
+
+
+def test_refresh_picks_up_new_plugins(plugin_dir, tmp_path):
+    registry = make_registry(plugin_dir, tmp_path)
+    assert registry.names() == []
+    (plugin_dir / "late.py").write_text("METRICS = {'late': lambda: 3.0}\n")
+    assert registry.names() == []
+    registry.refresh()
+    assert registry.names() == ["late"]
+
+
+def test_cli_metrics_take_precedence_over_plugins(plugin_dir, tmp_path, capsys):
+    (plugin_dir / "dup.py").write_text("METRICS = {'shared': lambda: 1.0, 'own': lambda: 2.0}\n")
+    save_cli_metric("shared", "echo 5", path=str(tmp_path / "cli_metrics.json"))
+    providers = make_registry(plugin_dir, tmp_path).providers()
+    assert providers["shared"] == ("cli", "echo 5")
+    assert providers["own"] == ("module", f"{PACKAGE}.dup")
+    assert "already provided" in capsys.readouterr().out
+
+
+def test_broken_plugin_is_reported_and_skipped(plugin_dir, tmp_path, capsys):
+    (plugin_dir / "broken.py").write_text("METRICS = {'a': len\n")
+    (plugin_dir / "good.py").write_text("METRICS = {'good': lambda: 1.0}\n")
+    assert make_registry(plugin_dir, tmp_path).names() == ["good"]
+    assert "could not be scanned" in capsys.readouterr().out
+
+
+def test_manifest_can_be_disabled(plugin_dir, tmp_path):
+    (plugin_dir / "m.py").write_text("METRICS = {'m': lambda: 1.0}\n")
+    registry = make_registry(plugin_dir, tmp_path, cache_dir=False)
+    assert registry.manifest_path is None
+    assert registry.names() == ["m"]
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from modules.fuzzy_validator import FuzzyValidator
+from modules.logger import ExecutionLogger
+from modules.replay import agreement_stats, expand_grid, load_recorded_samples, replay_step, run_replay
+
+STEP = {
+    "description": "cpu",
+    "type": "fuzzy",
+    "metric_func": "cpu_percent",
+    "thresholds": [10, 30, 70],
+    "history_size": 8,
+    "update_every": 3,
+    "eval_label": "HIGH",
+    "eval_policy": "majority",
+}
+
+
+def record_live_run(log_dir, run_id, step, values, fmt):
+    """Classify values with validate(), logging the samples the way a live run does."""
+    it = iter(values)
+    validator = FuzzyValidator.from_step(step, lambda: next(it))
+    logger = ExecutionLogger(log_dir=str(log_dir), run_id=run_id, fmt=fmt, background=False)
+    logger.log({"step": step["description"], "type": "fuzzy"})
+    labels = []
+    for _ in values:
+        value, label, vals = validator.validate()
+        labels.append(label)
+        logger.log({"step": step["description"], "metric": step["metric_func"], "value": value,
+                    "label": label, "fuzzy": vals})
+    logger.log({"step": step["description"], "metric": step["metric_func"], "value": "n/a", "label": "LOW"})
+    logger.close()
+    return logger.log_file, labels
+
+
+@pytest.mark.parametrize("overrides", [{}, {"membership_shape": "gaussian"}, {"lut_resolution": 0.5},
+                                       {"membership_shape": "triangle", "min_thresholds": None}])
+def test_replay_matches_the_live_classification(tmp_path, overrides):
+    step = dict(STEP, **overrides)
+    rng = np.random.default_rng(1)
+    first, live_first = record_live_run(tmp_path, "a", step, rng.uniform(0, 100, 40), "jsonl")
+    second, live_second = record_live_run(tmp_path, "b", step, rng.uniform(0, 100, 25), "binary")
+
+    recorded = load_recorded_samples([first, second])
+    assert recorded["cpu"]["runs"] == [40, 25]
+    assert recorded["cpu"]["labels"] == live_first + live_second
+
+    label_names, labels, _ = replay_step(step, recorded["cpu"]["values"], runs=recorded["cpu"]["runs"])
+    assert [label_names[i] for i in labels] == live_first + live_second
+
+    stats = run_replay([str(tmp_path / "run_a"), str(tmp_path / "run_b")], [step])["cpu"]["replay"]
+    assert stats["samples"] == 65
+    assert stats["agreement"] == 1.0
+    assert stats["kappa"] == 1.0
+
+
+def test_load_recorded_samples_filters_steps_and_skips_missing_logs(tmp_path, capsys):
+    path, _ = record_live_run(tmp_path, "a", STEP, [5, 50, 95], "text")
+    assert load_recorded_samples([path], steps={"other"}) == {}
+    recorded = load_recorded_samples([str(tmp_path / "missing.log"), path])
+    assert "not found" in capsys.readouterr().out
+    assert recorded["cpu"]["values"].tolist() == [5.0, 50.0, 95.0]
+    assert recorded["cpu"]["runs"] == [3]
+
+
+def test_agreement_stats():
+    stats = agreement_stats([0, 0, 1, 1, -1], [0, 1, 1, 1, 0], ["LOW", "HIGH"])
+    assert stats["samples"] == 4
+    assert stats["agreement"] == 0.75
+    assert stats["kappa"] == pytest.approx(0.5)
+    assert stats["confusion"] == [[1, 1], [0, 2]]
+    assert stats["labels"]["LOW"] == {"reference": 2, "predicted": 1, "recall": 0.5, "precision": 1.0}
+
+
+def test_expand_grid():
+    assert expand_grid({"update_every": [2, 5], "history_size": [10]}) == [
+        {"history_size": 10, "update_every": 2}, {"history_size": 10, "update_every": 5}]
+    with pytest.raises(ValueError):
+        expand_grid({"shape": ["gaussian"]})
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+from modules import reporting
+from modules.logger import ExecutionLogger
+from modules.reporting import SampleSummary, export_reports
+
+
+def write_log(log_dir, fmt="jsonl", samples=10):
+    logger = ExecutionLogger(log_dir=str(log_dir), run_id="r", fmt=fmt, background=False)
+    logger.log({"event": "start_pipeline", "test_case": "demo"})
+    logger.log({"step": "Echo", "type": "shell", "timestamp": "2025-01-01T10:00:00", "required": True})
+    logger.log({"step": "Echo", "command": "echo hi", "returncode": 0, "stdout": "hi\n" + "x" * 5000, "stderr": "",
+                "eval": "[EVAL][PASSED]"})
+    logger.log({"step": "Echo", "event": "timing", "attempts": 1, "duration_s": 0.1,
+                "phases": {"shell": {"count": 1, "total_s": 0.1, "mean_ms": 100.0, "min_ms": 100.0, "max_ms": 100.0}}})
+    logger.log({"step": "CPU", "type": "fuzzy", "timestamp": "2025-01-01T10:00:01", "required": False})
+    for i in range(samples):
+        logger.log({"step": "CPU", "metric": "cpu_percent", "value": float(i), "label": "LOW" if i < 7 else "HIGH",
+                    "fuzzy": {"LOW": 1.0}})
+    logger.log({"step": "CPU", "metric": "cpu_percent", "value": -1, "label": "LOW"})
+    logger.log({"step": "CPU", "eval": "[EVAL][FAILED]"})
+    logger.log({"step": "CPU", "error": "boom"})
+    logger.log({"event": "system_info", "system_info": {"hostname": "box", "cpus": [1, 2]}})
+    logger.log({"event": "end_pipeline", "global_pass": True})
+    logger.close()
+    return logger.log_file
+
+
+def sheet_rows(path, name):
+    rows = list(load_workbook(path, read_only=True)[name].values)
+    return [dict(zip(rows[0], row)) for row in rows[1:]]
+
+
+def test_sample_summary_is_exact_except_for_reservoir_percentiles():
+    summary = SampleSummary(reservoir_size=100)
+    for i in range(1000):
+        summary.add(float(i), "A" if i % 2 else "B", "m")
+    summary.add("n/a", "A")
+    summary.add(float("nan"), "A")
+    row = summary.row("step")
+    assert (row["samples"], row["invalid"], row["min"], row["max"], row["mean"]) == (1000, 2, 0.0, 999.0, 499.5)
+    assert json.loads(row["labels"]) == {"B": 500, "A": 502}
+    assert len(summary.reservoir) == 100
+    assert 300 < row["p50"] < 700
+
+
+@pytest.mark.parametrize("fmt", ["text", "jsonl", "binary"])
+def test_reports_are_built_from_a_single_pass(tmp_path, monkeypatch, fmt):
+    log_file = write_log(tmp_path, fmt=fmt)
+    reads = []
+    read = reporting.read_log_records
+    monkeypatch.setattr(reporting, "read_log_records", lambda path: reads.append(path) or read(path))
+    excel, html = str(tmp_path / "report.xlsx"), str(tmp_path / "report.html")
+    export_reports(log_file, excel_path=excel, html_path=html)
+    assert reads == [log_file]
+
+    assert load_workbook(excel, read_only=True).sheetnames == \
+        ["Samples", "Steps", "Sample Summary", "Shell", "Events", "Timings", "System Info"]
+    steps = {row["step"]: row for row in sheet_rows(excel, "Steps")}
+    assert (steps["Echo"]["type"], steps["Echo"]["eval"]) == ("shell", "[EVAL][PASSED]")
+    assert (steps["CPU"]["eval"], steps["CPU"]["error"], steps["CPU"]["required"]) == ("[EVAL][FAILED]", "boom", False)
+
+    samples = sheet_rows(excel, "Samples")
+    assert len(samples) == 11
+    assert [r["value"] for r in samples[:3]] == [0.0, 1.0, 2.0]
+    summary = sheet_rows(excel, "Sample Summary")[0]
+    assert (summary["step"], summary["samples"], summary["invalid"], summary["max"]) == ("CPU", 10, 1, 9.0)
+    assert json.loads(summary["labels"]) == {"LOW": 8, "HIGH": 3}
+
+    shell = sheet_rows(excel, "Shell")[0]
+    assert shell["stdout"].startswith("hi\n") and shell["stdout"].endswith("chars truncated]")
+    timings = sheet_rows(excel, "Timings")
+    assert [(t["step"], t["phase"]) for t in timings] == [("Echo", "shell"), ("Echo", "step total")]
+    events = [e["event"] for e in sheet_rows(excel, "Events")]
+    assert events == ["start_pipeline", "error", "system_info", "end_pipeline"]
+    assert {r["key"]: r["value"] for r in sheet_rows(excel, "System Info")} == {"hostname": "box", "cpus": "[1, 2]"}
+
+    with open(html) as f:
+        page = f.read()
+    for caption in ("Steps", "Sample Summary", "Shell", "Events", "Timings", "System Info"):
+        assert f"<caption>{caption}</caption>" in page
+
+
+def test_samples_sheet_is_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(reporting, "EXCEL_MAX_ROWS", 4)
+    log_file = write_log(tmp_path, samples=10)
+    excel = str(tmp_path / "report.xlsx")
+    export_reports(log_file, excel_path=excel)
+    assert len(sheet_rows(excel, "Samples")) == 4
+    # The summary still covers every sample
+    assert sheet_rows(excel, "Sample Summary")[0]["samples"] == 10
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+import skfuzzy as fuzz
+
+from modules.membership import MembershipEngine
+from modules.rule_engine import NO_FIRE, FuzzyRuleEngine, parse_rule
+
+INPUTS = {
+    "cpu": {"thresholds": [10, 30, 70]},
+    "ram": {"thresholds": [10, 30, 70]},
+}
+RULES = [
+    "IF cpu HIGH AND ram HIGH THEN health BAD",
+    "IF cpu HIGH AND ram LOW THEN health WARN",
+    "IF cpu MED OR ram MED THEN health WARN",
+    "IF cpu LOW THEN health OK",
+]
+OUTPUT = {"name": "health", "label_names": ["OK", "WARN", "BAD"], "values": [0, 50, 100]}
+
+
+def memberships(value):
+    return dict(zip(["LOW", "MED", "HIGH"], MembershipEngine([10, 30, 70], 3).evaluate([value])[0]))
+
+
+def test_parse_rule_string_and_dict():
+    rule = parse_rule("if cpu HIGH and ram LOW then health WARN")
+    assert rule == {"if": {"cpu": "HIGH", "ram": "LOW"}, "op": "AND", "then": "WARN", "weight": 1.0}
+    rule = parse_rule({"if": {"cpu": "LOW"}, "op": "or", "then": "OK", "weight": 0.5})
+    assert rule["op"] == "OR" and rule["weight"] == 0.5
+
+
+@pytest.mark.parametrize("rule", ["cpu HIGH THEN health BAD", "IF cpu HIGH AND ram LOW OR x MED THEN h BAD",
+                                  "IF cpu THEN health BAD"])
+def test_parse_rule_rejects_invalid_rules(rule):
+    with pytest.raises(ValueError):
+        parse_rule(rule)
+
+
+def test_unknown_labels_and_inputs_are_rejected():
+    with pytest.raises(ValueError):
+        FuzzyRuleEngine(INPUTS, OUTPUT, ["IF disk HIGH THEN health BAD"])
+    with pytest.raises(ValueError):
+        FuzzyRuleEngine(INPUTS, OUTPUT, ["IF cpu HUGE THEN health BAD"])
+    with pytest.raises(ValueError):
+        FuzzyRuleEngine(INPUTS, OUTPUT, ["IF cpu HIGH THEN health DEAD"])
+
+
+def test_sugeno_crisp_inputs():
+    engine = FuzzyRuleEngine(INPUTS, OUTPUT, RULES, inference="sugeno")
+    label, strengths, crisp = engine.classify({"cpu": 95, "ram": 5})
+    assert label == "WARN"
+    assert strengths == [0.0, 1.0, 0.0]
+    assert crisp == 50.0
+
+
+def test_sugeno_partial_memberships_use_min_max_and_weighted_average():
+    engine = FuzzyRuleEngine(INPUTS, OUTPUT, RULES, inference="sugeno")
+    cpu, ram = memberships(40), memberships(62)
+    label, strengths, crisp = engine.classify({"cpu": 40, "ram": 62})
+    bad = min(cpu["HIGH"], ram["HIGH"])
+    warn = min(cpu["HIGH"], ram["LOW"]) + max(cpu["MED"], ram["MED"])
+    ok = cpu["LOW"]
+    assert np.allclose(strengths, [ok, warn, bad])
+    assert crisp == pytest.approx((warn * 50 + bad * 100) / (ok + warn + bad))
+    assert label == ["OK", "WARN", "BAD"][int(np.argmax([ok, warn, bad]))]
+
+
+def test_mamdani_centroid_matches_skfuzzy():
+    output = {"name": "health", "label_names": ["OK", "WARN", "BAD"], "thresholds": [20, 50, 80]}
+    engine = FuzzyRuleEngine(INPUTS, output, RULES, inference="mamdani")
+    label, strengths, crisp = engine.classify({"cpu": 40, "ram": 62})
+    cpu, ram = memberships(40), memberships(62)
+    expected = [cpu["LOW"], max(min(cpu["HIGH"], ram["LOW"]), max(cpu["MED"], ram["MED"])),
+                min(cpu["HIGH"], ram["HIGH"])]
+    assert np.allclose(strengths, expected)
+    grid = np.linspace(0, 100, 201)
+    out_mf = MembershipEngine([20, 50, 80], 3).evaluate(grid)
+    aggregated = np.max(np.minimum(out_mf, expected), axis=1)
+    assert crisp == pytest.approx(fuzz.defuzz(grid, aggregated, "centroid"), abs=0.5)
+
+
+def test_rule_weights_scale_firing():
+    engine = FuzzyRuleEngine(INPUTS, OUTPUT, [{"if": {"cpu": "HIGH"}, "then": "BAD", "weight": 0.25}],
+                             inference="sugeno")
+    _, strengths, crisp = engine.classify({"cpu": 95, "ram": 0})
+    assert strengths == [0.0, 0.0, 0.25]
+    assert crisp == 100.0
+
+
+@pytest.mark.parametrize("inference", ["mamdani", "sugeno"])
+def test_no_rule_fires_gives_no_label_and_nan_output(inference):
+    engine = FuzzyRuleEngine(INPUTS, OUTPUT, ["IF cpu HIGH THEN health BAD"], inference=inference)
+    label, strengths, crisp = engine.classify({"cpu": 5, "ram": 5})
+    assert label is None
+    assert not any(strengths)
+    assert np.isnan(crisp)
+    labels, _, _ = engine.infer({"cpu": [5, 95], "ram": [5, 5]})
+    assert labels.tolist() == [NO_FIRE, 2]
+
+
+@pytest.mark.parametrize("inference", ["mamdani", "sugeno"])
+def test_batch_inference_matches_single_frames(inference):
+    engine = FuzzyRuleEngine(INPUTS, OUTPUT, RULES, inference=inference)
+    rng = np.random.default_rng(0)
+    frame = {"cpu": rng.uniform(0, 100, 50), "ram": rng.uniform(0, 100, 50)}
+    labels, strengths, crisp = engine.infer(frame)
+    for i in range(50):
+        label, s, c = engine.classify({"cpu": frame["cpu"][i], "ram": frame["ram"][i]})
+        assert label == (None if labels[i] == NO_FIRE else engine.output_labels[labels[i]])
+        assert np.allclose(s, strengths[i])
+        assert np.allclose(c, crisp[i], equal_nan=True)
@@ -0,0 +1,118 @@
+import sqlite3
+
+import pytest
+
+from modules.logger import ExecutionLogger
+from modules.run_index import RunIndex, find_run_dirs, format_rows, parse_filters, summarize_run
+
+
+def write_run(log_dir, run_id, pipeline="nightly", cpu_passes=(True,), host="box1", fmt="text"):
+    """Write a run log shaped like a pipeline run: one shell step and one fuzzy step per cpu_passes entry."""
+    logger = ExecutionLogger(log_dir=str(log_dir), run_id=run_id, fmt=fmt, background=False)
+    logger.log({"event": "run_id", "run_id": f"hash_{run_id}"})
+    logger.log({"event": "start_pipeline", "test_case": pipeline, "start_time": "2025-01-01T10:00:00"})
+    logger.log({"step": "Python version", "type": "shell", "timestamp": "2025-01-01T10:00:00", "required": True})
+    logger.log({"step": "Python version", "eval": "[EVAL][PASSED]"})
+    logger.log({"step": "Python version", "event": "timing", "attempts": 1, "duration_s": 0.25, "phases": {}})
+    for passed in cpu_passes:
+        logger.log({"step": "CPU", "type": "fuzzy", "timestamp": "2025-01-01T10:00:01", "required": True})
+        for label in ("LOW", "LOW", "HIGH"):
+            logger.log({"step": "CPU", "metric": "cpu_percent", "value": 5.0, "label": label})
+        logger.log({"step": "CPU", "eval": "[EVAL][PASSED]" if passed else "[EVAL][FAILED]"})
+        logger.log({"step": "CPU", "event": "timing", "attempts": 2, "duration_s": 1.5, "phases": {}})
+    logger.log({"event": "system_info", "system_info": {"hostname": host, "platform": "Linux"}})
+    logger.log({"event": "end_pipeline", "end_time": "2025-01-01T10:00:05", "global_pass": all(cpu_passes)})
+    logger.close()
+    return logger.base_dir
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = RunIndex(str(tmp_path / "index.sqlite"))
+    yield idx
+    idx.close()
+
+
+def test_summarize_run(tmp_path):
+    summary = summarize_run(write_run(tmp_path, "a", cpu_passes=(True, False), fmt="jsonl"))
+    assert summary["pipeline"] == "nightly"
+    assert summary["run_hash"] == "hash_a"
+    assert summary["passed"] == 0
+    assert summary["duration_s"] == 5.0
+    assert summary["host"] == "box1"
+    cpu = summary["steps"]["CPU"]
+    assert (cpu["runs"], cpu["failures"], cpu["attempts"], cpu["duration_s"]) == (2, 1, 4, 3.0)
+    assert summary["labels"] == {"CPU": {"LOW": 4, "HIGH": 2}}
+
+
+def test_index_and_query_runs_back(tmp_path, index):
+    logs = tmp_path / "logs"
+    write_run(logs, "a", cpu_passes=(True,))
+    write_run(logs, "b", pipeline="weekly", cpu_passes=(False,), host="box2")
+    assert index.backfill([str(logs)]) == (2, 0, 0)
+    assert index.backfill([str(logs)]) == (0, 2, 0)
+
+    columns, rows = index.query("runs")
+    assert columns[:4] == ["started", "pipeline", "kind", "result"]
+    assert sorted((r[1], r[3]) for r in rows) == [("nightly", "PASSED"), ("weekly", "FAILED")]
+
+    _, rows = index.query("runs", parse_filters(["pipeline=week*"]))
+    assert [r[1] for r in rows] == ["weekly"]
+    _, rows = index.query("runs", parse_filters(["passed=true", "host=box1"]))
+    assert [r[1] for r in rows] == ["nightly"]
+
+    columns, rows = index.query("steps")
+    steps = {r[0]: dict(zip(columns, r)) for r in rows}
+    assert steps["CPU"]["runs"] == 2 and steps["CPU"]["failures"] == 1 and steps["CPU"]["fail_pct"] == 50.0
+    assert steps["Python version"]["failures"] == 0
+
+    _, rows = index.query("labels", parse_filters(["step=CPU"]))
+    assert rows == [("CPU", "LOW", 4, 66.7), ("CPU", "HIGH", 2, 33.3)]
+    assert format_rows(["step", "label"], [("CPU", None)]) == ["STEP  LABEL", "CPU"]
+
+
+def test_reindexing_a_changed_run_replaces_its_rows(tmp_path, index):
+    run_dir = write_run(tmp_path, "a")
+    first = index.index_run(run_dir)
+    assert index.is_current(run_dir)
+    write_run(tmp_path, "a", cpu_passes=(False,))  # appends a second pipeline to the same log
+    assert not index.is_current(run_dir)
+    index.index_run(run_dir)
+    _, rows = index.execute("SELECT COUNT(*) FROM runs")
+    assert rows == [(1,)]
+    _, rows = index.execute("SELECT runs FROM steps WHERE step = 'CPU'")
+    assert rows == [(first["steps"]["CPU"]["runs"] + 1,)]
+
+
+def test_readonly_index_rejects_writes(tmp_path, index):
+    index.index_run(write_run(tmp_path / "logs", "a"))
+    readonly = RunIndex(index.path, readonly=True)
+    try:
+        assert readonly.execute("SELECT pipeline FROM runs")[1] == [("nightly",)]
+        for sql in ("DELETE FROM runs", "DROP TABLE steps", "INSERT INTO labels VALUES (1, 's', 'l', 1)"):
+            with pytest.raises(sqlite3.OperationalError):
+                readonly.execute(sql)
+    finally:
+        readonly.close()
+    assert index.execute("SELECT COUNT(*) FROM runs")[1] == [(1,)]
+
+
+def test_readonly_index_does_not_create_a_missing_database(tmp_path):
+    with pytest.raises(sqlite3.OperationalError):
+        RunIndex(str(tmp_path / "missing.sqlite"), readonly=True)
+    assert not (tmp_path / "missing.sqlite").exists()
+
+
+def test_invalid_filters_and_queries(index):
+    with pytest.raises(ValueError):
+        parse_filters(["colour=red"])
+    with pytest.raises(ValueError):
+        parse_filters(["since=yesterday"])
+    with pytest.raises(ValueError):
+        index.query("hosts")
+
+
+def test_find_run_dirs_skips_directories_without_logs(tmp_path):
+    write_run(tmp_path / "logs", "a")
+    (tmp_path / "logs" / "run_empty").mkdir()
+    assert [d.rsplit("/", 1)[-1] for d in find_run_dirs([str(tmp_path / "logs")])] == ["run_a"]
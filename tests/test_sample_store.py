@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from modules.sample_store import SampleStore, load_run_samples, load_samples, read_samples, sample_file_name
+
+
+def write_store(path, n, chunk_size=4, step="CPU load", labels=("LOW", "HIGH")):
+    store = SampleStore(str(path), labels, step=step, metric="cpu_percent", chunk_size=chunk_size)
+    for i in range(n):
+        store.append(1000.0 + i, float(i) if i != 2 else "n/a", i % 2, [1.0 - i / n, i / n])
+    store.close()
+    return store
+
+
+def test_samples_round_trip_across_chunks(tmp_path):
+    path = tmp_path / "s.arrow"
+    store = write_store(path, 10)
+    assert store.rows == 10
+    store.close()  # closing twice is harmless
+
+    arrays, meta = load_samples(str(path))
+    assert meta == {"step": "CPU load", "metric": "cpu_percent", "label_names": ["LOW", "HIGH"]}
+    assert list(arrays) == ["timestamp", "value", "label_index", "m_LOW", "m_HIGH"]
+    assert arrays["timestamp"].tolist() == [1000.0 + i for i in range(10)]
+    assert np.isnan(arrays["value"][2])
+    assert arrays["value"][[0, 1, 9]].tolist() == [0.0, 1.0, 9.0]
+    assert arrays["label_index"].dtype == np.int16 and arrays["label_index"].tolist() == [i % 2 for i in range(10)]
+    assert arrays["m_HIGH"].dtype == np.float32
+    np.testing.assert_allclose(arrays["m_HIGH"], np.arange(10) / 10, rtol=1e-6)
+
+    table, _ = read_samples(str(path))
+    assert table.column("value").num_chunks == 3  # 4 + 4 + 2
+
+
+def test_single_chunk_columns_are_not_copied(tmp_path):
+    path = tmp_path / "s.arrow"
+    write_store(path, 3, chunk_size=8)
+    arrays, _ = load_samples(str(path))
+    assert not arrays["value"].flags.owndata
+    assert not arrays["value"].flags.writeable
+
+
+def test_empty_store_has_schema_and_no_rows(tmp_path):
+    path = tmp_path / "s.arrow"
+    SampleStore(str(path), ["A"], step="x").close()
+    table, meta = read_samples(str(path))
+    assert table.num_rows == 0
+    assert table.column_names == ["timestamp", "value", "label_index", "m_A"]
+    assert meta["label_names"] == ["A"]
+
+
+def test_load_run_samples_by_step(tmp_path):
+    samples_dir = tmp_path / "samples"
+    write_store(samples_dir / sample_file_name(0, "CPU load!"), 5, step="CPU load")
+    write_store(samples_dir / sample_file_name(1, "RAM"), 2, step="RAM")
+    assert sample_file_name(0, "CPU load!") == "step01_cpu_load.arrow"
+
+    run = load_run_samples(str(tmp_path))
+    assert list(run) == ["CPU load", "RAM"]
+    assert len(run["RAM"]["value"]) == 2
+    frames = load_run_samples(str(tmp_path), as_pandas=True)
+    assert list(frames["CPU load"].columns) == ["timestamp", "value", "label_index", "m_LOW", "m_HIGH"]
+    assert len(frames["CPU load"]) == 5
@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from modules.scheduler import PeriodicScheduler
+
+
+def recorder(log, name, work=0.0):
+    def job():
+        log.append((name, time.monotonic()))
+        if work:
+            time.sleep(work)
+    return job
+
+
+def times_of(log, name):
+    return [t for n, t in log if n == name]
+
+
+def test_rejects_non_positive_period():
+    with pytest.raises(ValueError):
+        PeriodicScheduler().add("bad", 0, lambda: None)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_jobs_keep_their_period_without_drift(max_workers):
+    log = []
+    scheduler = PeriodicScheduler(max_workers=max_workers)
+    start = time.monotonic()
+    scheduler.add("fast", 0.05, recorder(log, "fast"))
+    scheduler.add("slow", 0.12, recorder(log, "slow"))
+    scheduler.run(duration=0.6)
+
+    for name, period, expected in (("fast", 0.05, 12), ("slow", 0.12, 5)):
+        times = times_of(log, name)
+        assert expected - 2 <= len(times) <= expected
+        # Runs stay on start + n * period: lateness does not accumulate
+        lateness = [t - (start + n * period) for n, t in enumerate(times)]
+        assert min(lateness) >= 0
+        assert max(lateness) < 0.04
+    assert all(job["overruns"] == 0 for job in scheduler.stats())
+
+
+def test_jobs_run_in_due_order_and_ties_in_insertion_order():
+    log = []
+    scheduler = PeriodicScheduler()
+    scheduler.add("c", 10, recorder(log, "c"), delay=0.03)
+    scheduler.add("a", 10, recorder(log, "a"), delay=0.01)
+    scheduler.add("b", 10, recorder(log, "b"), delay=0.02)
+    scheduler.add("tie1", 10, recorder(log, "tie1"), delay=0.04)
+    scheduler.add("tie2", 10, recorder(log, "tie2"), delay=0.04)
+    scheduler.run(duration=0.1)
+    assert [name for name, _ in log] == ["a", "b", "c", "tie1", "tie2"]
+
+
+def test_inline_jobs_delay_each_other():
+    log = []
+    scheduler = PeriodicScheduler(max_workers=1)
+    scheduler.add("fast", 0.05, recorder(log, "fast"))
+    scheduler.add("busy", 0.1, recorder(log, "busy", work=0.1))
+    scheduler.run(duration=0.5)
+    fast = {job["name"]: job for job in scheduler.stats()}["fast"]
+    # The busy job occupies the scheduler thread: fast runs about once per 0.1 s instead of every 0.05 s
+    assert fast["runs"] <= 7
+    assert fast["overruns"] > 0 and fast["skipped"] > 0
+
+
+def test_pool_jobs_do_not_delay_each_other():
+    log = []
+    scheduler = PeriodicScheduler(max_workers=2)
+    scheduler.add("fast", 0.05, recorder(log, "fast"))
+    scheduler.add("busy", 0.1, recorder(log, "busy", work=0.1))
+    scheduler.run(duration=0.5)
+    fast = {job["name"]: job for job in scheduler.stats()}["fast"]
+    assert fast["runs"] >= 9
+    assert fast["overruns"] == 0
+
+
+def test_running_job_skips_slots_instead_of_overlapping():
+    active, overlaps = [0], []
+    lock = threading.Lock()
+
+    def slow():
+        with lock:
+            active[0] += 1
+            overlaps.append(active[0])
+        time.sleep(0.12)
+        with lock:
+            active[0] -= 1
+
+    scheduler = PeriodicScheduler(max_workers=2)
+    scheduler.add("slow", 0.05, slow)
+    scheduler.run(duration=0.4)
+    stats = scheduler.stats()[0]
+    assert max(overlaps) == 1
+    assert 2 <= stats["runs"] <= 4
+    assert stats["skipped"] > 0
+
+
+def test_failing_job_is_counted_and_keeps_running(capsys):
+    def boom():
+        raise RuntimeError("boom")
+
+    scheduler = PeriodicScheduler()
+    scheduler.add("boom", 0.05, boom)
+    scheduler.run(duration=0.22)
+    stats = scheduler.stats()[0]
+    assert stats["runs"] >= 3
+    assert stats["errors"] == stats["runs"]
+    assert "failed: boom" in capsys.readouterr().out
+
+
+def test_stop_from_a_job_ends_the_run():
+    scheduler = PeriodicScheduler()
+    scheduler.add("stopper", 0.01, scheduler.stop, delay=0.02)
+    started = time.monotonic()
+    scheduler.run()
+    assert time.monotonic() - started < 1
+    assert scheduler.stopped
+    assert scheduler.stats()[0]["runs"] == 1
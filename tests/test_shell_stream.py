@@ -0,0 +1,98 @@
+import subprocess
+
+import pytest
+
+from modules.shell_stream import HeadTailBuffer, StreamMatcher, run_streaming
+
+
+def feed_chunks(matcher, text, size):
+    for i in range(0, len(text), size):
+        matcher.feed(text[i:i + size])
+    return matcher.matched
+
+
+def test_substring_straddling_chunks_is_found():
+    assert feed_chunks(StreamMatcher(contains="needle"), "hay" * 10 + "needle" + "hay" * 10, 4)
+
+
+def test_regex_straddling_chunks_is_found():
+    assert feed_chunks(StreamMatcher(regex=r"err(or)? \d+"), "line\nerror 42\n", 3)
+
+
+def test_anchor_does_not_match_at_a_carry_cut_inside_a_line():
+    matcher = StreamMatcher(regex=r"^ERROR", regex_window=5)
+    assert not matcher.feed("xxxERROR")
+    assert not matcher.feed("yyy")
+    matcher = StreamMatcher(regex=r"^ERROR", regex_window=5)
+    assert not matcher.feed("xxx\nERR")
+    assert matcher.feed("OR")
+
+
+def test_anchor_matches_at_the_start_of_the_stream():
+    assert StreamMatcher(regex=r"^ERROR").feed("ERROR at start")
+
+
+def test_word_boundary_sees_the_char_before_the_carry():
+    matcher = StreamMatcher(regex=r"\bfail", regex_window=4)
+    assert not feed_chunks(matcher, "aaaaaaaafail", 6)
+
+
+def test_substring_and_regex_must_both_be_found():
+    matcher = StreamMatcher(contains="ready", regex=r"^port \d+$")
+    assert not matcher.feed("server ready\n")
+    assert matcher.found == {"contains": True, "regex": False}
+    assert not matcher.feed("port x\n")
+    assert matcher.feed("port 80\n")
+    assert matcher.found == {"contains": True, "regex": True}
+
+
+def test_matcher_without_patterns_never_matches():
+    matcher = StreamMatcher()
+    assert not matcher.active
+    assert not matcher.feed("anything")
+
+
+def test_head_tail_buffer_keeps_both_ends():
+    buf = HeadTailBuffer(head=3, tail=3)
+    buf.feed("abcdefghij")
+    assert buf.total == 10
+    assert buf.excerpt() == "abc\n... [4 chars omitted] ...\nhij"
+
+
+def test_run_streaming_matches_stderr_and_returncode():
+    result = run_streaming("echo out; echo needle >&2; exit 3", contains="needle")
+    assert result.matched
+    assert result.returncode == 3
+    assert result.stdout.strip() == "out"
+
+
+def test_run_streaming_terminates_on_match():
+    result = run_streaming("echo ready; sleep 10", contains="ready", terminate_on_match=True, timeout=5)
+    assert result.matched and result.terminated
+    assert result.wait_s < 5
+
+
+def test_run_streaming_timeout_kills_the_command():
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_streaming("sleep 10", timeout=0.3)
+
+
+def test_run_streaming_reports_which_pattern_was_found():
+    result = run_streaming("echo ready; echo 'port 80' >&2", contains="ready", regex=r"port \d+")
+    assert result.matched
+    assert result.matches == {"contains": True, "regex": True}
+
+    result = run_streaming("echo ready", contains="ready", regex=r"port \d+")
+    assert not result.matched
+    assert result.matches == {"contains": True, "regex": False}
+
+    result = run_streaming("true", contains="ready")
+    assert result.matches == {"contains": False}
+    assert run_streaming("echo x").matches == {}
+
+
+def test_run_streaming_terminates_only_once_both_patterns_are_found():
+    result = run_streaming("echo ready; sleep 0.2; echo 'port 80'; sleep 10", contains="ready", regex=r"port \d+",
+                           terminate_on_match=True, timeout=5)
+    assert result.terminated
+    assert "port 80" in result.stdout
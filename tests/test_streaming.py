@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from modules.streaming import RingBuffer, SlidingQuantiles
+
+
+def test_ring_buffer_keeps_the_last_values_in_order():
+    buf = RingBuffer(3)
+    assert [buf.append(v) for v in (1, 2, 3, 4, 5)] == [None, None, None, 1.0, 2.0]
+    assert len(buf) == 3
+    assert buf.to_array().tolist() == [3.0, 4.0, 5.0]
+    assert list(buf) == [3.0, 4.0, 5.0]
+    assert np.asarray(buf, dtype=int).tolist() == [3, 4, 5]
+    buf.clear()
+    assert len(buf) == 0 and buf.to_array().size == 0
+
+
+def test_ring_buffer_rejects_empty_size():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 50])
+def test_sliding_quantiles_match_np_percentile(size):
+    rng = np.random.default_rng(size)
+    # Rounded values so the window holds duplicates, which eviction must handle
+    values = np.round(rng.normal(50, 20, 400), 1)
+    buf = RingBuffer(size)
+    quantiles = SlidingQuantiles(size)
+    qs = [0, 10, 30, 50, 60, 85, 100]
+    for value in values:
+        quantiles.update(value, buf.append(value))
+        window = buf.to_array()
+        assert len(quantiles) == len(window)
+        assert np.allclose(quantiles.percentiles(qs), np.percentile(window, qs))
+
+
+def test_sliding_quantiles_empty_window_raises():
+    with pytest.raises(ValueError):
+        SlidingQuantiles(5).percentile(50)
+
+
+def test_sliding_quantiles_skip_non_finite_values():
+    buf = RingBuffer(4)
+    quantiles = SlidingQuantiles(4)
+    for value in [1.0, float("nan"), 2.0, 3.0, float("inf"), 20.0, 40.0, float("nan"), 5.0]:
+        quantiles.update(value, buf.append(value))
+        window = buf.to_array()
+        finite = window[np.isfinite(window)]
+        assert len(quantiles) == len(finite)
+        assert np.allclose(quantiles.percentiles([0, 50, 100]), np.percentile(finite, [0, 50, 100]))
+    assert quantiles.update(float("nan")) is False
+
+
+def test_validator_keeps_non_finite_samples_out_of_the_history():
+    from modules.fuzzy_validator import FuzzyValidator
+    step = {"thresholds": [10, 30, 70], "history_size": 4, "update_every": 2}
+    values = [5.0, float("nan"), 50.0, float("inf"), 80.0, 20.0, float("nan"), 60.0]
+    live = FuzzyValidator.from_step(step, None)
+    labels = [live.observe(v)[1] for v in values]
+    assert live.history.to_array().tolist() == [50.0, 80.0, 20.0, 60.0]
+    assert np.isfinite(live.thresholds).all()
+    replayed = FuzzyValidator.from_step(step, None)
+    idx, _ = replayed.replay(values)
+    assert [replayed.label_names[i] for i in idx] == labels
@@ -0,0 +1,180 @@
+import itertools
+import threading
+
+import pytest
+
+from modules import system_metrics
+from modules.system_metrics import (COUNTER_WRAP, RateMetric, SnapshotSampler, SystemInfoCollector, SystemMetrics,
+                                    get_extended_system_info)
+
+
+@pytest.fixture
+def fake_counter(monkeypatch):
+    """Counter read from a list of (value, monotonic timestamp) pairs."""
+    def install(values):
+        it = iter(values)
+        monkeypatch.setattr(RateMetric, "_sample", lambda self: next(it))
+    return install
+
+
+def test_get_metric_func_primes_rate_metrics(monkeypatch):
+    sleeps = []
+    counter = itertools.count(0, 1000)
+    monkeypatch.setattr(system_metrics, "_read_counter", lambda *a: next(counter))
+    monkeypatch.setattr(system_metrics.time, "sleep", sleeps.append)
+    func = SystemMetrics.get_metric_func("net_rx_bytes_per_s")
+    assert sleeps == [0.1]
+    func()
+    assert sleeps == [0.1]  # the first read in the sampling loop does not wait
+
+
+def test_first_read_after_prime_is_a_rate(fake_counter, monkeypatch):
+    monkeypatch.setattr(system_metrics.time, "sleep", lambda s: None)
+    fake_counter([(100, 0.0), (400, 0.5), (1400, 1.5)])
+    metric = RateMetric("net_rx_bytes_per_s").prime()
+    assert metric() == 600.0
+    assert metric() == 1000.0
+
+
+def test_counter_wrap_and_reset(fake_counter, monkeypatch):
+    monkeypatch.setattr(system_metrics.time, "sleep", lambda s: None)
+    fake_counter([(COUNTER_WRAP - 100, 0.0), (50, 1.0), (10, 2.0)])
+    metric = RateMetric("net_rx_bytes_per_s").prime()
+    assert metric() == 150.0
+    assert metric() == 0.0  # went backwards by a small amount: reset, not a wrap
+
+
+def test_unavailable_counter_returns_minus_one(fake_counter, monkeypatch):
+    monkeypatch.setattr(system_metrics.time, "sleep", lambda s: None)
+    fake_counter([(None, 0.0), (None, 1.0), (None, 2.0)])
+    metric = RateMetric("disk_read_iops", device="missing").prime()
+    assert metric() == -1
+
+
+def test_cpu_percent_instances_keep_their_own_baseline(monkeypatch):
+    from collections import namedtuple
+    from modules.system_metrics import CpuPercentMetric
+    times = namedtuple("scputimes", "user system idle iowait guest")
+    # guest time is part of user and must not be counted twice
+    reads = iter([times(10, 0, 90, 0, 5), times(10, 0, 90, 0, 5),
+                  times(60, 0, 140, 0, 5), times(110, 0, 140, 0, 5)])
+    monkeypatch.setattr(system_metrics.psutil, "cpu_times", lambda: next(reads))
+    monkeypatch.setattr(system_metrics.time, "sleep", lambda s: None)
+    first = CpuPercentMetric().prime()
+    second = CpuPercentMetric().prime()
+    assert first() == 50.0
+    # A read by `first` in between does not shorten the window of `second`
+    assert second() == 66.7
+
+
+@pytest.fixture
+def fake_sources(monkeypatch):
+    """Snapshot sources counting their calls, and a manual monotonic clock."""
+    from collections import namedtuple
+    memory = namedtuple("svmem", "percent")
+    calls = {"cpu": 0, "virtual_memory": 0}
+
+    def source(name, make):
+        def read():
+            calls[name] += 1
+            return make(calls[name])
+        return read
+
+    monkeypatch.setitem(system_metrics.SNAPSHOT_SOURCES, "cpu", source("cpu", float))
+    monkeypatch.setitem(system_metrics.SNAPSHOT_SOURCES, "virtual_memory", source("virtual_memory", lambda n: memory(n * 10.0)))
+    clock = [100.0]
+    monkeypatch.setattr(system_metrics.time, "monotonic", lambda: clock[0])
+    return calls, clock
+
+
+def test_snapshot_reads_within_ttl_reuse_one_refresh(fake_sources):
+    calls, clock = fake_sources
+    sampler = SnapshotSampler(ttl=0.5)
+    cpu = sampler.metric_func("cpu_percent")
+    ram = sampler.metric_func("ram_percent")
+
+    assert (cpu(), ram(), cpu()) == (1.0, 10.0, 1.0)
+    assert calls == {"cpu": 1, "virtual_memory": 1}
+    clock[0] += 0.5
+    assert (cpu(), ram()) == (1.0, 10.0)
+    assert calls == {"cpu": 1, "virtual_memory": 1}
+
+    # Past the TTL every requested source is refreshed in the same pass
+    clock[0] += 0.01
+    assert ram() == 20.0
+    assert calls == {"cpu": 2, "virtual_memory": 2}
+    assert cpu() == 2.0
+    assert sampler.stats() == {"ttl": 0.5, "reads": 7, "refreshes": 2, "source_calls": 4,
+                               "cache_hits": 5, "skipped_syscalls": 3}
+
+
+def test_snapshot_refreshes_when_an_unrequested_metric_is_read(fake_sources):
+    calls, clock = fake_sources
+    sampler = SnapshotSampler(ttl=10)
+    cpu = sampler.metric_func("cpu_percent")
+    assert cpu() == 1.0
+    assert sampler.get("ram_percent") == 10.0
+    assert calls == {"cpu": 2, "virtual_memory": 1}
+    assert (cpu(), sampler.get("ram_percent")) == (2.0, 10.0)
+    assert sampler.refreshes == 2
+
+
+@pytest.fixture
+def counted_section(monkeypatch):
+    """A cached "hardware" section counting its collections, with a settable cache key."""
+    state = {"calls": 0, "key": "boot1"}
+
+    def collect():
+        state["calls"] += 1
+        return {"collected": state["calls"]}
+
+    monkeypatch.setitem(system_metrics.SYSTEM_INFO_SECTIONS, "hardware", (collect, lambda: state["key"], None))
+    return state
+
+
+def test_cached_section_is_reused_until_its_key_changes(tmp_path, counted_section):
+    cache = str(tmp_path)
+    assert get_extended_system_info(["hardware"], cache_dir=cache) == {"collected": 1}
+    assert get_extended_system_info(["hardware"], cache_dir=cache) == {"collected": 1}
+    counted_section["key"] = "boot2"
+    assert get_extended_system_info(["hardware"], cache_dir=cache) == {"collected": 2}
+    counted_section["key"] = "boot1"
+    assert get_extended_system_info(["hardware"], cache_dir=cache) == {"collected": 1}
+    assert counted_section["calls"] == 2
+    assert get_extended_system_info(["hardware"], cache_dir=False) == {"collected": 3}
+
+
+def test_corrupt_cache_file_is_recollected(tmp_path, counted_section):
+    get_extended_system_info(["hardware"], cache_dir=str(tmp_path))
+    for path in tmp_path.iterdir():
+        path.write_text("{not json")
+    assert get_extended_system_info(["hardware"], cache_dir=str(tmp_path)) == {"collected": 2}
+    assert get_extended_system_info(["hardware"], cache_dir=str(tmp_path)) == {"collected": 2}
+
+
+def test_current_cpu_frequency_is_not_cached(tmp_path, monkeypatch):
+    from collections import namedtuple
+    freq = namedtuple("scpufreq", "current min max")
+    reads = iter([freq(1000.0, 800.0, 3000.0), freq(1000.0, 800.0, 3000.0), freq(2500.0, 800.0, 3000.0)])
+    monkeypatch.setattr(system_metrics.psutil, "cpu_freq", lambda: next(reads))
+    first = get_extended_system_info(["hardware"], cache_dir=str(tmp_path))["cpu_freq"]
+    second = get_extended_system_info(["hardware"], cache_dir=str(tmp_path))["cpu_freq"]
+    assert first == {"min": 800.0, "max": 3000.0, "current": 1000.0}
+    assert second == {"min": 800.0, "max": 3000.0, "current": 2500.0}
+
+
+def test_collector_runs_in_background_and_reports_errors(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(system_metrics, "get_extended_system_info",
+                        lambda sections, cache_dir: release.wait() and {"sections": sections})
+    received = []
+    collector = SystemInfoCollector(["platform"], cache_dir=False).start(on_done=received.append)
+    assert collector.result(timeout=0.01) == {}
+    release.set()
+    assert collector.result() == {"sections": ["platform"]}
+    assert received == [{"sections": ["platform"]}]
+
+    def fail(sections, cache_dir):
+        raise OSError("no /proc")
+    monkeypatch.setattr(system_metrics, "get_extended_system_info", fail)
+    assert SystemInfoCollector().start().result() == {"error": "no /proc"}
@@ -0,0 +1,93 @@
+import pytest
+
+from modules import scheduler
+from modules.scheduler import FixedRateTicker
+
+
+class FakeClock:
+    """Stand-in for the time module: sleep() and work() advance a manual monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    work = sleep
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler, "time", fake)
+    return fake
+
+
+def run(ticker, clock, work=lambda tick: 0.0):
+    times = []
+    for tick in ticker:
+        times.append(clock.now - 1000.0)
+        clock.work(work(tick))
+    return times
+
+
+def test_ticks_stay_on_the_grid_whatever_the_body_takes(clock):
+    ticker = FixedRateTicker(0.1, 1.0)
+    times = run(ticker, clock, work=lambda tick: 0.03 if tick % 2 else 0.07)
+    assert times == pytest.approx([i * 0.1 for i in range(10)])
+    stats = ticker.stats()
+    assert (stats["samples"], stats["overruns"], stats["skipped_ticks"]) == (10, 0, 0)
+    assert stats["max_lateness_s"] == 0.0
+    assert stats["achieved_rate_hz"] == pytest.approx(10.0)
+    assert stats["jitter_ms"] == pytest.approx(0.0, abs=1e-6)
+    # Sleeps fill the rest of every slot but the last: 0.9 s minus the work of ticks 1-9
+    assert stats["sleep_s"] == pytest.approx(0.9 - (5 * 0.03 + 4 * 0.07))
+
+
+def test_overrun_skips_missed_slots_and_resumes_aligned(clock):
+    ticker = FixedRateTicker(0.1, 1.0)
+    times = run(ticker, clock, work=lambda tick: 0.25 if tick == 3 else 0.0)
+    # Tick 3 at 0.2 runs until 0.45: slots 0.3 and 0.4 are skipped, sampling resumes at 0.5
+    assert times == pytest.approx([0.0, 0.1, 0.2, 0.5, 0.6, 0.7, 0.8, 0.9])
+    stats = ticker.stats()
+    assert (stats["overruns"], stats["skipped_ticks"]) == (1, 2)
+    assert stats["mean_gap_s"] == pytest.approx(0.9 / 7, abs=1e-6)
+
+
+def test_fractional_duration_and_exact_end(clock):
+    assert run(FixedRateTicker(0.02, 0.05), clock) == pytest.approx([0.0, 0.02, 0.04])
+    # A tick falling exactly on the end of the window is not taken
+    assert len(run(FixedRateTicker(0.25, 1.0), clock)) == 4
+
+
+def test_stats_are_valid_when_the_loop_is_left_early(clock):
+    ticker = FixedRateTicker(0.1, 10.0)
+    for tick in ticker:
+        if tick == 3:
+            break
+    stats = ticker.stats()
+    assert stats["samples"] == 3
+    assert stats["elapsed_s"] == pytest.approx(0.2)
+    assert stats["requested_rate_hz"] == 10.0
+
+
+def test_lateness_is_measured_against_the_schedule(monkeypatch):
+    fake = FakeClock()
+    # Every sleep oversleeps by 10 ms, as a loaded system would
+    monkeypatch.setattr(scheduler, "time", fake)
+    monkeypatch.setattr(fake, "sleep", lambda seconds: setattr(fake, "now", fake.now + seconds + 0.01))
+    ticker = FixedRateTicker(0.1, 0.5)
+    times = run(ticker, fake)
+    # Oversleeping does not accumulate: every tick is 10 ms late, not 10 ms more than the previous one
+    assert times == pytest.approx([0.0, 0.11, 0.21, 0.31, 0.41])
+    stats = ticker.stats()
+    assert stats["max_lateness_s"] == pytest.approx(0.01)
+    assert stats["mean_lateness_s"] == pytest.approx(0.008)
+
+
+def test_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        FixedRateTicker(0, 1)
@@ -0,0 +1,96 @@
+import threading
+import tracemalloc
+
+from modules.timing import PhaseTimer, StepProfiler
+
+
+def test_phase_timer_min_max_use_per_occurrence_mean():
+    timer = PhaseTimer()
+    timer.add("sleep", 1.0, count=4)
+    timer.add("sleep", 0.5)
+    summary = timer.summary()["sleep"]
+    assert summary["count"] == 5
+    assert summary["total_s"] == 1.5
+    assert summary["min_ms"] == 250.0
+    assert summary["max_ms"] == 500.0
+
+
+def test_memory_profilers_share_tracing_until_the_last_one_stops(tmp_path):
+    assert not tracemalloc.is_tracing()
+    first = StepProfiler("memory", str(tmp_path), "first").start()
+    second = StepProfiler("memory", str(tmp_path), "second").start()
+    assert "memory_peak_kb" in first.stop()
+    assert tracemalloc.is_tracing()
+    assert "memory_peak_kb" in second.stop()
+    assert not tracemalloc.is_tracing()
+
+
+def test_overlapping_memory_profilers_in_threads(tmp_path):
+    results = {}
+    started = threading.Barrier(2)
+    release = threading.Event()
+
+    def profile(name, wait_for_release):
+        profiler = StepProfiler("memory", str(tmp_path), name).start()
+        started.wait()
+        if wait_for_release:
+            release.wait(5)
+        results[name] = profiler.stop()
+        if not wait_for_release:
+            release.set()
+
+    threads = [threading.Thread(target=profile, args=("short", False)),
+               threading.Thread(target=profile, args=("long", True))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert "memory_peak_kb" in results["short"]
+    assert "memory_peak_kb" in results["long"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_cpu_profile_is_written(tmp_path):
+    profile = StepProfiler("cpu", str(tmp_path), "step01").start().stop()
+    assert (tmp_path / "step01.prof").exists()
+    assert profile["cpu_profile"].endswith("step01.prof")
+
+
+def test_concurrent_cpu_profilers_take_turns(tmp_path, capsys):
+    results = {}
+    started = threading.Barrier(2)
+    first_started = threading.Event()
+
+    def profile(name):
+        if name == "second":
+            first_started.wait(5)
+        profiler = StepProfiler("cpu", str(tmp_path), name).start()
+        if name == "first":
+            first_started.set()
+        started.wait(5)
+        results[name] = profiler.stop()
+
+    threads = [threading.Thread(target=profile, args=(name,)) for name in ("first", "second")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results["first"]["cpu_profile"].endswith("first.prof")
+    assert results["second"] == {"cpu_profile_skipped": "another step is being profiled"}
+    assert "CPU profiling of second skipped" in capsys.readouterr().out
+    # The profiler slot is free again
+    assert "cpu_profile" in StepProfiler("cpu", str(tmp_path), "third").start().stop()
+
+
+def test_cpu_profiler_skips_when_another_tool_is_active(tmp_path, monkeypatch):
+    import cProfile
+
+    def busy(self):
+        raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(cProfile.Profile, "enable", busy)
+    profiler = StepProfiler("all", str(tmp_path), "step01").start()
+    result = profiler.stop()
+    assert result["cpu_profile_skipped"] == "Another profiling tool is already active"
+    assert "memory_peak_kb" in result
+    assert not tracemalloc.is_tracing()